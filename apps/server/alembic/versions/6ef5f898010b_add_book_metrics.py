@@ -0,0 +1,58 @@
+"""Add book_metrics
+
+Revision ID: 6ef5f898010b
+Revises: 4a769cc8eb37
+Create Date: 2026-10-18 09:12:44.503118
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6ef5f898010b"
+down_revision: Union[str, Sequence[str], None] = "4a769cc8eb37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "book_metrics",
+        sa.Column("security_id", sa.UUID(), nullable=False),
+        sa.Column("timestamp", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("mid_price", sa.BigInteger(), nullable=False),
+        sa.Column("microprice", sa.BigInteger(), nullable=False),
+        sa.Column("spread_ticks", sa.Integer(), nullable=False),
+        sa.Column("imbalance", sa.REAL(), nullable=False),
+        sa.Column("bid_depth", sa.BigInteger(), nullable=False),
+        sa.Column("ask_depth", sa.BigInteger(), nullable=False),
+        sa.Column("bid_added", sa.BigInteger(), nullable=True),
+        sa.Column("bid_canceled", sa.BigInteger(), nullable=True),
+        sa.Column("ask_added", sa.BigInteger(), nullable=True),
+        sa.Column("ask_canceled", sa.BigInteger(), nullable=True),
+        sa.ForeignKeyConstraint(["security_id"], ["securities.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("security_id", "timestamp"),
+        postgresql_partition_by="RANGE (timestamp)",
+    )
+    op.create_index(
+        "ix_book_metrics_timestamp_brin",
+        "book_metrics",
+        ["timestamp"],
+        unique=False,
+        postgresql_using="brin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_book_metrics_timestamp_brin",
+        table_name="book_metrics",
+        postgresql_using="brin",
+    )
+    op.drop_table("book_metrics")
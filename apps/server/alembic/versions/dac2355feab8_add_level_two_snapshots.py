@@ -0,0 +1,72 @@
+"""Add level_two_snapshots
+
+Revision ID: dac2355feab8
+Revises: 6ef5f898010b
+Create Date: 2026-10-18 11:37:05.281940
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "dac2355feab8"
+down_revision: Union[str, Sequence[str], None] = "6ef5f898010b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "level_two_snapshots",
+        sa.Column("security_id", sa.UUID(), nullable=False),
+        sa.Column("book", sa.String(length=10), nullable=False),
+        sa.Column("side", sa.String(length=3), nullable=False),
+        sa.Column("timestamp", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("is_keyframe", sa.Boolean(), nullable=False),
+        sa.Column("prices", postgresql.ARRAY(sa.BigInteger()), nullable=False),
+        sa.Column("sizes", postgresql.ARRAY(sa.BigInteger()), nullable=False),
+        sa.Column("order_counts", postgresql.ARRAY(sa.BigInteger()), nullable=False),
+        sa.CheckConstraint(
+            "cardinality(prices) = cardinality(sizes) "
+            "AND cardinality(prices) = cardinality(order_counts)",
+            name="ck_level_two_snapshot_array_lengths",
+        ),
+        sa.ForeignKeyConstraint(["security_id"], ["securities.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("security_id", "book", "side", "timestamp"),
+        postgresql_partition_by="RANGE (timestamp)",
+    )
+    op.create_index(
+        "ix_level_two_snapshot_keyframes",
+        "level_two_snapshots",
+        ["security_id", "book", "side", "timestamp"],
+        unique=False,
+        postgresql_where=sa.text("is_keyframe"),
+    )
+    op.create_index(
+        "ix_level_two_snapshot_timestamp_brin",
+        "level_two_snapshots",
+        ["timestamp"],
+        unique=False,
+        postgresql_using="brin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_level_two_snapshot_timestamp_brin",
+        table_name="level_two_snapshots",
+        postgresql_using="brin",
+    )
+    op.drop_index(
+        "ix_level_two_snapshot_keyframes",
+        table_name="level_two_snapshots",
+        postgresql_where=sa.text("is_keyframe"),
+    )
+    op.drop_table("level_two_snapshots")
@@ -1,7 +1,14 @@
 import base64
 import json
 
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import (
+    Depends,
+    HTTPException,
+    Request,
+    WebSocket,
+    WebSocketException,
+    status,
+)
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from axiom.config import supabase
@@ -132,6 +139,33 @@ async def get_current_active_user(current_user=Depends(get_current_user)):
     return current_user
 
 
+async def get_current_user_from_websocket(websocket: WebSocket):
+    """
+    Validate a WebSocket client. Browsers cannot set headers on WebSocket
+    requests, so the token comes from the ?token= query parameter, falling
+    back to the Supabase SSR session cookie.
+    """
+    token = websocket.query_params.get("token")
+    if not token:
+        try:
+            return await get_current_user_from_cookies(websocket)
+        except HTTPException as e:
+            raise WebSocketException(
+                code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail)
+            )
+    try:
+        user_response = supabase.auth.get_user(token)
+        user = user_response.user
+    except Exception:
+        user = None
+    if not user:
+        raise WebSocketException(
+            code=status.WS_1008_POLICY_VIOLATION,
+            reason="Invalid authentication credentials",
+        )
+    return user
+
+
 async def get_current_active_user_from_cookies(request: Request):
     """
     Get active user from cookies
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+from sqlalchemy import TextClause, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def copy_records(
+    db: AsyncSession,
+    table: str,
+    columns: Sequence[str],
+    records: Sequence[tuple],
+) -> int:
+    """
+    Write plain tuples into table with asyncpg's binary COPY protocol.
+
+    COPY goes to the driver connection directly, past SQLAlchemy. If the
+    session has already executed a statement, the driver is in the
+    session's transaction and the COPY commits or rolls back with it.
+    Otherwise (SQLAlchemy only sends BEGIN with its first statement) the
+    COPY runs in a transaction of its own and is committed when this
+    returns; a later session rollback does not undo it. Column defaults
+    defined on the ORM model (ids, created_at) are not applied and must be
+    present in records.
+    """
+    if not records:
+        return 0
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    driver = raw.driver_connection
+    if driver.is_in_transaction():
+        await driver.copy_records_to_table(
+            table, records=records, columns=list(columns)
+        )
+    else:
+        async with driver.transaction():
+            await driver.copy_records_to_table(
+                table, records=records, columns=list(columns)
+            )
+    return len(records)
+
+
+@lru_cache(maxsize=32)
+def _unnest_upsert_statement(
+    table: str,
+    columns: Tuple[Tuple[str, str], ...],
+    conflict_columns: Tuple[str, ...],
+    update_columns: Tuple[str, ...],
+) -> TextClause:
+    names = ", ".join(f'"{name}"' for name, _ in columns)
+    arrays = ", ".join(f"CAST(:{name} AS {pg_type}[])" for name, pg_type in columns)
+    target = ", ".join(f'"{name}"' for name in conflict_columns)
+    assignments = ", ".join(f'"{name}" = EXCLUDED."{name}"' for name in update_columns)
+    return text(
+        f'INSERT INTO "{table}" ({names}) SELECT * FROM unnest({arrays}) '
+        f"ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+    )
+
+
+async def upsert_records(
+    db: AsyncSession,
+    table: str,
+    columns: Sequence[Tuple[str, str]],
+    records: Sequence[tuple],
+    *,
+    conflict_columns: Sequence[str],
+    update_columns: Sequence[str],
+) -> int:
+    """
+    Insert-or-update records in a single statement by passing one array per
+    column to unnest(), so the SQL text (and its prepared statement) is the
+    same regardless of batch size.
+
+    columns pairs each column name with its Postgres type, e.g.
+    ("volume", "bigint"). records must not contain two rows with the same
+    conflict key, since Postgres rejects updating a row twice per statement.
+    """
+    if not records:
+        return 0
+    stmt = _unnest_upsert_statement(
+        table, tuple(columns), tuple(conflict_columns), tuple(update_columns)
+    )
+    params = {
+        name: list(values)
+        for (name, _), values in zip(columns, zip(*records), strict=True)
+    }
+    await db.execute(stmt, params)
+    return len(records)
+
+
+__all__ = ["copy_records", "upsert_records"]
@@ -1,5 +1,6 @@
 from axiom.db.client import Base
 from axiom.db.models.account import Account
+from axiom.db.models.book_metrics import BookMetrics
 from axiom.db.models.chart import Chart
 from axiom.db.models.enums import (
     AssetSubType,
@@ -17,6 +18,7 @@ from axiom.db.models.enums import (
 from axiom.db.models.exchange import Exchange
 from axiom.db.models.level_one import LevelOne
 from axiom.db.models.level_two import LevelTwo
+from axiom.db.models.level_two_snapshot import LevelTwoSnapshot
 from axiom.db.models.oauth import OAuthState
 from axiom.db.models.option_contract import OptionContract
 from axiom.db.models.option_quote import OptionQuote
@@ -29,6 +31,7 @@ __all__ = [
     "AssetSubType",
     "AssetType",
     "Base",
+    "BookMetrics",
     "Chart",
     "ContractType",
     "Exchange",
@@ -37,6 +40,7 @@ __all__ = [
     "InstrumentType",
     "LevelOne",
     "LevelTwo",
+    "LevelTwoSnapshot",
     "OAuthState",
     "OptionContract",
     "OptionQuote",
@@ -0,0 +1,65 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (
+    DDL,
+    REAL,
+    TIMESTAMP,
+    BigInteger,
+    ForeignKey,
+    Index,
+    Integer,
+    event,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from axiom.db.client import Base
+
+
+# Metrics sampled from the live consolidated order book (axiom.mdata.metrics)
+class BookMetrics(Base):
+    __tablename__ = "book_metrics"
+
+    security_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("securities.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    timestamp: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, primary_key=True
+    )
+    mid_price: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    microprice: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    spread_ticks: Mapped[int] = mapped_column(Integer, nullable=False)
+    imbalance: Mapped[float] = mapped_column(REAL, nullable=False)
+    bid_depth: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    ask_depth: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # Estimated order flow since the previous sample; NULL on the first one
+    bid_added: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    bid_canceled: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    ask_added: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    ask_canceled: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+
+    security = relationship("Security", back_populates="book_metrics")
+
+    __table_args__ = (
+        Index(
+            "ix_book_metrics_timestamp_brin",
+            "timestamp",
+            postgresql_using="brin",
+        ),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+
+# Create DEFAULT partition at table create time (idempotent)
+event.listen(
+    BookMetrics.__table__,
+    "after_create",
+    DDL(
+        'CREATE TABLE IF NOT EXISTS "book_metrics_default" '
+        'PARTITION OF "book_metrics" DEFAULT'
+    ),
+)
@@ -19,7 +19,6 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from axiom.db.client import Base
-from axiom.db.models._partitions import ensure_partition_for_timestamp
 from axiom.db.models.enums import InstrumentType, Timeframe
 
 
@@ -94,9 +93,3 @@ event.listen(
     "after_create",
     DDL('CREATE TABLE IF NOT EXISTS "charts_default" PARTITION OF "charts" DEFAULT'),
 )
-
-
-@event.listens_for(Chart, "before_insert")
-def chart_before_insert(mapper, connection, target):  # type: ignore[no-redef]
-    ts = getattr(target, "timestamp", None) or datetime.now(timezone.utc)
-    ensure_partition_for_timestamp(connection, "charts", ts)
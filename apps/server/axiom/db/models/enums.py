@@ -40,6 +40,8 @@ class OrderSide(str, Enum):
 
 
 class Timeframe(str, Enum):
+    FIVE_SECOND = "5s"
+    FIFTEEN_SECOND = "15s"
     ONE_MINUTE = "1m"
     FIVE_MINUTE = "5m"
     FIFTEEN_MINUTE = "15m"
@@ -19,7 +19,6 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from axiom.db.client import Base
-from axiom.db.models._partitions import ensure_partition_for_timestamp
 from axiom.db.models.enums import InstrumentType, SecurityStatus
 
 
@@ -108,10 +107,3 @@ event.listen(
         'PARTITION OF "level_one_quotes" DEFAULT'
     ),
 )
-
-
-# Create daily partition right before insert (idempotent)
-@event.listens_for(LevelOne, "before_insert")
-def level_one_before_insert(mapper, connection, target):  # type: ignore[no-redef]
-    ts = getattr(target, "timestamp", None) or datetime.now(timezone.utc)
-    ensure_partition_for_timestamp(connection, "level_one_quotes", ts)
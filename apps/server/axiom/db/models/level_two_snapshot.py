@@ -0,0 +1,79 @@
+import uuid
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import (
+    DDL,
+    TIMESTAMP,
+    BigInteger,
+    Boolean,
+    CheckConstraint,
+    ForeignKey,
+    Index,
+    String,
+    event,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from axiom.db.client import Base
+from axiom.db.models.enums import OrderSide
+
+
+# One side of one book per row, as packed arrays ordered best price first.
+# Keyframes hold the whole side; deltas hold only the changed levels, with
+# size 0 for removed ones (see axiom.mdata.snapshots)
+class LevelTwoSnapshot(Base):
+    __tablename__ = "level_two_snapshots"
+
+    security_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("securities.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    book: Mapped[str] = mapped_column(String(10), primary_key=True)
+    side: Mapped[OrderSide] = mapped_column(String(3), primary_key=True)
+    timestamp: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, primary_key=True
+    )
+    is_keyframe: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    prices: Mapped[List[int]] = mapped_column(ARRAY(BigInteger), nullable=False)
+    sizes: Mapped[List[int]] = mapped_column(ARRAY(BigInteger), nullable=False)
+    order_counts: Mapped[List[int]] = mapped_column(ARRAY(BigInteger), nullable=False)
+
+    security = relationship("Security", back_populates="level_two_snapshots")
+
+    __table_args__ = (
+        CheckConstraint(
+            "cardinality(prices) = cardinality(sizes) "
+            "AND cardinality(prices) = cardinality(order_counts)",
+            name="ck_level_two_snapshot_array_lengths",
+        ),
+        # Finds the keyframe a reconstruction starts from
+        Index(
+            "ix_level_two_snapshot_keyframes",
+            "security_id",
+            "book",
+            "side",
+            "timestamp",
+            postgresql_where=text("is_keyframe"),
+        ),
+        Index(
+            "ix_level_two_snapshot_timestamp_brin",
+            "timestamp",
+            postgresql_using="brin",
+        ),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+
+# Create DEFAULT partition at table create time (idempotent)
+event.listen(
+    LevelTwoSnapshot.__table__,
+    "after_create",
+    DDL(
+        'CREATE TABLE IF NOT EXISTS "level_two_snapshots_default" '
+        'PARTITION OF "level_two_snapshots" DEFAULT'
+    ),
+)
@@ -19,7 +19,6 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from axiom.db.client import Base
-from axiom.db.models._partitions import ensure_partition_for_timestamp
 from axiom.db.models.enums import SecurityStatus
 
 
@@ -120,9 +119,3 @@ event.listen(
         'PARTITION OF "option_quotes" DEFAULT'
     ),
 )
-
-
-@event.listens_for(OptionQuote, "before_insert")
-def option_quote_before_insert(mapper, connection, target):  # type: ignore[no-redef]
-    ts = getattr(target, "timestamp", None) or datetime.now(timezone.utc)
-    ensure_partition_for_timestamp(connection, "option_quotes", ts)
@@ -66,6 +66,8 @@ class Security(Base):
     charts = relationship("Chart", back_populates="security")
     level_one_quotes = relationship("LevelOne", back_populates="security")
     level_two_quotes = relationship("LevelTwo", back_populates="security")
+    level_two_snapshots = relationship("LevelTwoSnapshot", back_populates="security")
+    book_metrics = relationship("BookMetrics", back_populates="security")
     option_contracts = relationship(
         "OptionContract", back_populates="underlying_security"
     )
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional, Sequence, Set
+
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+# Tables partitioned by RANGE (timestamp) with one partition per UTC day
+PARTITIONED_TABLES = (
+    "level_one_quotes",
+    "level_two_quotes",
+    "level_two_snapshots",
+    "charts",
+    "option_quotes",
+    "book_metrics",
+)
+
+
+_DAY_SUFFIX = re.compile(r"^_(\d{4})_(\d{2})_(\d{2})$")
+
+
+def partition_name(base_table: str, day: date) -> str:
+    return f"{base_table}_{day.year:04d}_{day.month:02d}_{day.day:02d}"
+
+
+def partition_day(base_table: str, relname: str) -> Optional[date]:
+    """The day of a daily partition of base_table, None for other tables."""
+    match = _DAY_SUFFIX.match(relname[len(base_table) :])
+    if not relname.startswith(base_table) or match is None:
+        return None
+    return date(*map(int, match.groups()))
+
+
+def _day_bounds(day: date) -> tuple[str, str]:
+    start = datetime.combine(day, time(), tzinfo=timezone.utc)
+    return start.isoformat(), (start + timedelta(days=1)).isoformat()
+
+
+class PartitionManager:
+    """
+    Creates daily partitions ahead of time so write paths never run DDL.
+
+        manager = PartitionManager(engine, days_ahead=3)
+        await manager.start()  # runs now, then every interval seconds
+
+    Each run creates the partitions from days_behind days ago to days_ahead
+    days from now (UTC). Rows that landed in a table's DEFAULT partition,
+    because their day had no partition yet, are moved into a new partition
+    for that day; Postgres refuses to create a partition whose range
+    overlaps rows in DEFAULT, so without this the day could never be added.
+    A failure on one table is logged and counted, and the other tables are
+    still maintained.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        tables: Sequence[str] = PARTITIONED_TABLES,
+        *,
+        days_ahead: int = 3,
+        days_behind: int = 1,
+        interval: float = 3600.0,
+        name: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self._engine = engine
+        self._tables = tuple(tables)
+        self._days_ahead = days_ahead
+        self._days_behind = days_behind
+        self._interval = interval
+        self._name = name or "PartitionManager"
+        self._logger = logger or logging.getLogger(self._name)
+        self._task: Optional[asyncio.Task] = None
+        # table -> days with a partition, as of the last run
+        self._days: Dict[str, Set[date]] = {t: set() for t in self._tables}
+        self._last_run: Optional[datetime] = None
+        self._created = 0
+        self._moved_rows = 0
+        self._errors = 0
+
+    async def start(self) -> None:
+        """Run once, then keep running in the background; idempotent."""
+        if self._task is not None:
+            return
+        try:
+            await self.run_once()
+        except Exception as e:
+            self._errors += 1
+            self._logger.warning("Partition maintenance failed: %s", e)
+        self._task = asyncio.create_task(self._run(), name=self._name)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_once(self, today: Optional[date] = None) -> None:
+        today = today or datetime.now(timezone.utc).date()
+        window = [
+            today + timedelta(days=d)
+            for d in range(-self._days_behind, self._days_ahead + 1)
+        ]
+        for table in self._tables:
+            try:
+                await self._maintain(table, window)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._errors += 1
+                self._logger.warning("Partition maintenance of %s failed: %s", table, e)
+        self._last_run = datetime.now(timezone.utc)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._errors += 1
+                self._logger.warning("Partition maintenance failed: %s", e)
+
+    async def _maintain(self, table: str, window: Iterable[date]) -> None:
+        async with self._engine.begin() as conn:
+            await conn.exec_driver_sql(
+                f'CREATE TABLE IF NOT EXISTS "{table}_default" '
+                f'PARTITION OF "{table}" DEFAULT'
+            )
+            existing = await self._existing_days(conn, table)
+            stray = await self._default_days(conn, table)
+
+        for day in sorted(stray.union(window) - existing):
+            await self._create(table, day)
+            existing.add(day)
+        self._days[table] = existing
+
+    async def _existing_days(self, conn: AsyncConnection, table: str) -> Set[date]:
+        result = await conn.exec_driver_sql(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            f"WHERE p.relname = '{table}'"
+        )
+        days = set()
+        for (relname,) in result:
+            day = partition_day(table, relname)
+            if day is not None:
+                days.add(day)
+        return days
+
+    async def _default_days(self, conn: AsyncConnection, table: str) -> Set[date]:
+        result = await conn.exec_driver_sql(
+            "SELECT DISTINCT (timestamp AT TIME ZONE 'UTC')::date "
+            f'FROM "{table}_default"'
+        )
+        return {day for (day,) in result}
+
+    async def _create(self, table: str, day: date) -> None:
+        name = partition_name(table, day)
+        lo, hi = _day_bounds(day)
+        async with self._engine.begin() as conn:
+            # Serialize with other managers touching this table
+            await conn.exec_driver_sql(
+                f"SELECT pg_advisory_xact_lock(hashtext('partitions:{table}'))"
+            )
+            exists = await conn.exec_driver_sql(
+                f"SELECT to_regclass('\"{name}\"') IS NOT NULL"
+            )
+            if exists.scalar():
+                return
+            # Keep writers from adding rows of the day to DEFAULT between the
+            # check below and the DDL
+            await conn.exec_driver_sql(
+                f'LOCK TABLE "{table}_default" IN SHARE ROW EXCLUSIVE MODE'
+            )
+            stray = await conn.exec_driver_sql(
+                f'SELECT EXISTS (SELECT 1 FROM "{table}_default" '
+                f"WHERE timestamp >= '{lo}' AND timestamp < '{hi}')"
+            )
+            if not stray.scalar():
+                await conn.exec_driver_sql(
+                    f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+                    f"FOR VALUES FROM ('{lo}') TO ('{hi}')"
+                )
+                self._created += 1
+                return
+            # Build the partition detached, move the day's rows out of
+            # DEFAULT into it, then attach it; all in one transaction
+            await conn.exec_driver_sql(
+                f'CREATE TABLE "{name}" '
+                f'(LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+            )
+            result = await conn.exec_driver_sql(
+                f'WITH moved AS (DELETE FROM "{table}_default" '
+                f"WHERE timestamp >= '{lo}' AND timestamp < '{hi}' RETURNING *) "
+                f'INSERT INTO "{name}" SELECT * FROM moved'
+            )
+            await conn.exec_driver_sql(
+                f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" '
+                f"FOR VALUES FROM ('{lo}') TO ('{hi}')"
+            )
+            self._created += 1
+            moved = result.rowcount or 0
+        self._moved_rows += moved
+        self._logger.warning(
+            "Moved %d rows of %s from %s_default into a new partition",
+            moved,
+            day,
+            table,
+        )
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        today = datetime.now(timezone.utc).date()
+        return {
+            "last_run": self._last_run.isoformat() if self._last_run else None,
+            "days_ahead": {
+                table: sum(1 for d in days if d > today)
+                for table, days in self._days.items()
+            },
+            "created": self._created,
+            "moved_rows": self._moved_rows,
+            "errors": self._errors,
+        }
+
+
+__all__ = [
+    "PARTITIONED_TABLES",
+    "PartitionManager",
+    "partition_day",
+    "partition_name",
+]
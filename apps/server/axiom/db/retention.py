@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import msgspec
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from axiom.db.partitions import partition_day
+
+_ARROW_TYPES = {
+    "uuid": pa.binary(16),
+    "timestamptz": pa.timestamp("us", tz="UTC"),
+    "timestamp": pa.timestamp("us"),
+    "int8": pa.int64(),
+    "int4": pa.int32(),
+    "int2": pa.int16(),
+    "float8": pa.float64(),
+    "float4": pa.float32(),
+    "bool": pa.bool_(),
+    "varchar": pa.string(),
+    "text": pa.string(),
+    "bpchar": pa.string(),
+    "_int8": pa.list_(pa.int64()),
+}
+
+
+def parse_retention(spec: str) -> Dict[str, int]:
+    """
+    Parse "table=days; table=days" into {table: days}: the days of history
+    kept in Postgres per table. Tables not listed are never archived.
+    """
+    horizons: Dict[str, int] = {}
+    for entry in filter(None, (e.strip() for e in spec.split(";"))):
+        table, _, days = entry.partition("=")
+        try:
+            horizons[table.strip()] = int(days)
+        except ValueError:
+            raise ValueError(f"Invalid retention entry: {entry!r}") from None
+        if horizons[table.strip()] < 1:
+            raise ValueError(f"Retention must be at least one day: {entry!r}")
+    return horizons
+
+
+class ArchivedDay(msgspec.Struct):
+    """One Parquet file holding archived rows of a day."""
+
+    path: str  # relative to the archive directory
+    rows: int
+    bytes: int
+    min_timestamp: Optional[datetime]
+    max_timestamp: Optional[datetime]
+    archived_at: datetime
+
+
+class ArchiveManifest:
+    """
+    Which archived days live in which Parquet files, persisted as JSON:
+
+        {"level_one_quotes": {"2025-01-02": [{"path": ..., "rows": ...}]}}
+
+    A day can have several files. Rows that reach a table after its day
+    was archived (late writes, a spill journal replayed after an outage)
+    land in the default partition, the partition manager moves them into a
+    new partition for the day, and the next archiver run adds them as
+    another file.
+    """
+
+    FILENAME = "manifest.json"
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._path = os.path.join(directory, self.FILENAME)
+        self._entries: Dict[str, Dict[date, List[ArchivedDay]]] = {}
+        try:
+            with open(self._path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        try:
+            self._entries = msgspec.json.decode(
+                data, type=Dict[str, Dict[date, List[ArchivedDay]]]
+            )
+        except msgspec.ValidationError:
+            # Manifests written before a day could have several files
+            single = msgspec.json.decode(data, type=Dict[str, Dict[date, ArchivedDay]])
+            self._entries = {
+                table: {day: [entry] for day, entry in days.items()}
+                for table, days in single.items()
+            }
+
+    def get(self, table: str, day: date) -> List[ArchivedDay]:
+        """The files holding table's archived rows for day, oldest first."""
+        return self._entries.get(table, {}).get(day, [])
+
+    def days(self, table: str) -> List[date]:
+        return sorted(self._entries.get(table, ()))
+
+    def rows(self, table: str, day: date) -> int:
+        return sum(entry.rows for entry in self.get(table, day))
+
+    def paths_for(self, table: str, day: date) -> List[str]:
+        """Absolute paths of the Parquet files holding table's rows for day."""
+        return [os.path.join(self.directory, e.path) for e in self.get(table, day)]
+
+    def add(self, table: str, day: date, entry: ArchivedDay) -> None:
+        self._entries.setdefault(table, {}).setdefault(day, []).append(entry)
+        self._save()
+
+    def _save(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(msgspec.json.encode(self._entries))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._path)
+
+
+class PartitionArchiver:
+    """
+    Moves daily partitions older than a per-table horizon out of Postgres:
+
+        archiver = PartitionArchiver(engine, {"level_one_quotes": 7}, "data/archive")
+        await archiver.run_once()
+
+    Each expired partition is detached from its table, exported to
+    <archive>/<table>/<year>/<partition>.parquet (zstd, rows sorted by
+    security_id, timestamp), recorded in the manifest, and only then
+    dropped. A day archived again gets <partition>.<n>.parquet, so earlier
+    files are never overwritten. A partition left detached by an
+    interrupted run is picked up again by the next one.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        horizons: Dict[str, int],
+        archive_dir: str,
+        *,
+        batch_rows: int = 100_000,
+        compression_level: int = 9,
+        name: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self._engine = engine
+        self._horizons = dict(horizons)
+        self._batch_rows = batch_rows
+        self._compression_level = compression_level
+        self._name = name or "PartitionArchiver"
+        self._logger = logger or logging.getLogger(self._name)
+        self.manifest = ArchiveManifest(archive_dir)
+        self._archived = 0
+        self._rows = 0
+        self._bytes = 0
+
+    async def run_once(self, today: Optional[date] = None) -> None:
+        today = today or datetime.now(timezone.utc).date()
+        for table, days in self._horizons.items():
+            cutoff = today - timedelta(days=days)
+            for relname, day, attached in await self._partitions(table):
+                if day >= cutoff:
+                    continue
+                if attached:
+                    await self._detach(table, relname)
+                await self._archive(table, relname, day)
+
+    async def _partitions(self, table: str) -> List[Tuple[str, date, bool]]:
+        """Daily partitions of table, attached or left detached, oldest first."""
+        async with self._engine.connect() as conn:
+            result = await conn.exec_driver_sql(
+                "SELECT relname, relispartition FROM pg_class "
+                f"WHERE relkind = 'r' AND relname LIKE '{table}\\_%'"
+            )
+            found = []
+            for relname, attached in result:
+                day = partition_day(table, relname)
+                if day is not None:
+                    found.append((relname, day, attached))
+        return sorted(found, key=lambda p: p[1])
+
+    async def _detach(self, table: str, relname: str) -> None:
+        async with self._engine.begin() as conn:
+            await conn.exec_driver_sql(
+                f'ALTER TABLE "{table}" DETACH PARTITION "{relname}"'
+            )
+
+    async def _archive(self, table: str, relname: str, day: date) -> None:
+        # The name depends only on the files already recorded, so a run
+        # interrupted before the manifest update rewrites the same file
+        part = len(self.manifest.get(table, day))
+        filename = f"{relname}.{part}.parquet" if part else f"{relname}.parquet"
+        relative = os.path.join(table, f"{day.year:04d}", filename)
+        path = os.path.join(self.manifest.directory, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+
+        async with self._engine.connect() as conn:
+            raw = (await conn.get_raw_connection()).driver_connection
+            schema = await self._schema(raw, relname)
+            rows = 0
+            lo: Optional[datetime] = None
+            hi: Optional[datetime] = None
+            writer = pq.ParquetWriter(
+                tmp,
+                schema,
+                compression="zstd",
+                compression_level=self._compression_level,
+            )
+            try:
+                async with raw.transaction(readonly=True):
+                    cursor = await raw.cursor(
+                        f'SELECT * FROM "{relname}" ORDER BY security_id, timestamp'
+                    )
+                    while True:
+                        records = await cursor.fetch(self._batch_rows)
+                        if not records:
+                            break
+                        batch = _record_batch(records, schema)
+                        await asyncio.to_thread(writer.write_batch, batch)
+                        rows += len(records)
+                        stamps = [r["timestamp"] for r in records]
+                        lo = min(stamps) if lo is None else min(lo, min(stamps))
+                        hi = max(stamps) if hi is None else max(hi, max(stamps))
+            finally:
+                await asyncio.to_thread(writer.close)
+
+        written = (await asyncio.to_thread(pq.read_metadata, tmp)).num_rows
+        if written != rows:
+            raise RuntimeError(
+                f"Archive of {relname} has {written} rows, expected {rows}"
+            )
+        await asyncio.to_thread(_fsync_file, tmp)
+        os.replace(tmp, path)
+        size = os.path.getsize(path)
+        self.manifest.add(
+            table,
+            day,
+            ArchivedDay(
+                path=relative,
+                rows=rows,
+                bytes=size,
+                min_timestamp=lo,
+                max_timestamp=hi,
+                archived_at=datetime.now(timezone.utc),
+            ),
+        )
+
+        async with self._engine.begin() as conn:
+            await conn.exec_driver_sql(f'DROP TABLE "{relname}"')
+        self._archived += 1
+        self._rows += rows
+        self._bytes += size
+        self._logger.info(
+            "Archived %s (%d rows, %d bytes) to %s", relname, rows, size, path
+        )
+
+    async def _schema(self, raw: Any, relname: str) -> pa.Schema:
+        columns = await raw.fetch(
+            "SELECT column_name, udt_name FROM information_schema.columns "
+            "WHERE table_name = $1 ORDER BY ordinal_position",
+            relname,
+        )
+        return pa.schema(
+            [
+                (c["column_name"], _ARROW_TYPES.get(c["udt_name"], pa.string()))
+                for c in columns
+            ]
+        )
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "horizons": self._horizons,
+            "archived_partitions": self._archived,
+            "archived_rows": self._rows,
+            "archived_bytes": self._bytes,
+        }
+
+
+def _record_batch(records: List[Any], schema: pa.Schema) -> pa.RecordBatch:
+    arrays = []
+    for i, field in enumerate(schema):
+        values = [r[i] for r in records]
+        if field.type == pa.binary(16):
+            values = [v.bytes if isinstance(v, uuid.UUID) else v for v in values]
+        elif field.type == pa.string():
+            values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _fsync_file(path: str) -> None:
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+
+__all__ = ["ArchiveManifest", "ArchivedDay", "PartitionArchiver", "parse_retention"]
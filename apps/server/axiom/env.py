@@ -52,6 +52,49 @@ class Environment(BaseModel):
         ..., min_length=1, description="Owner user ID for access control"
     )
 
+    # Local Storage
+    DATA_DIR: str = Field(
+        default="data",
+        description="Directory for local market data files (spill journals, etc.)",
+    )
+
+    # Retention
+    RETENTION_POLICY: str = Field(
+        default="level_one_quotes=7; level_two_quotes=3",
+        description=(
+            "Days of history kept in Postgres per table before partitions are "
+            "archived to Parquet, e.g. 'level_one_quotes=7; level_two_quotes=3'"
+        ),
+    )
+
+    # Streaming
+    STREAM_FAST_DECODE: bool = Field(
+        default=True,
+        description="Decode raw stream frames straight into records (msgspec)",
+    )
+    L1_PERSIST_POLICY: str = Field(
+        default="latest",
+        description=(
+            "L1 persistence policy spec, e.g. "
+            "'on_change:0.01; SPY,QQQ=every_tick; AAPL=sample:1'"
+        ),
+    )
+    L2_STORAGE: str = Field(
+        default="rows",
+        description=(
+            "Where L2 books are persisted: 'rows' (level_two_quotes), "
+            "'snapshots' (packed keyframe/delta level_two_snapshots) or 'both'"
+        ),
+    )
+    LIVE_DISTRIBUTION: bool = Field(
+        default=True,
+        description="Share live quotes/bars between processes via Postgres NOTIFY",
+    )
+    LIVE_CHANNEL: str = Field(
+        default="axiom_live",
+        description="Postgres NOTIFY channel for live data distribution",
+    )
+
     # Environment Settings
     ENVIRONMENT: str = Field(default="development", description="Current environment")
     DEBUG: bool = Field(default=True, description="Enable debug mode")
@@ -75,14 +118,23 @@ class Environment(BaseModel):
             return f"{base_url}/api/auth/schwab/callback"
         return v
 
-    @field_validator("DEBUG", mode="before")
+    @field_validator("DEBUG", "STREAM_FAST_DECODE", "LIVE_DISTRIBUTION", mode="before")
     @classmethod
     def parse_debug(cls, v):
-        """Parse DEBUG from string to boolean."""
+        """Parse boolean flags (DEBUG, STREAM_FAST_DECODE, ...) from strings."""
         if isinstance(v, str):
             return v.lower() in ("true", "1", "yes", "on")
         return v
 
+    @field_validator("L2_STORAGE")
+    @classmethod
+    def validate_l2_storage(cls, v):
+        """Validate L2 storage is one of expected values."""
+        valid_storage = ["rows", "snapshots", "both"]
+        if v not in valid_storage:
+            raise ValueError(f"L2 storage must be one of {valid_storage}")
+        return v
+
     @field_validator("ENVIRONMENT")
     @classmethod
     def validate_environment(cls, v):
@@ -131,6 +183,15 @@ def create_env() -> Environment:
             SCHWAB_APP_SECRET=os.getenv("SCHWAB_APP_SECRET"),
             SCHWAB_CALLBACK_URL=os.getenv("SCHWAB_CALLBACK_URL"),
             OWNER_ID=os.getenv("OWNER_ID"),
+            DATA_DIR=os.getenv("DATA_DIR", "data"),
+            RETENTION_POLICY=os.getenv(
+                "RETENTION_POLICY", "level_one_quotes=7; level_two_quotes=3"
+            ),
+            STREAM_FAST_DECODE=os.getenv("STREAM_FAST_DECODE", "true"),
+            L1_PERSIST_POLICY=os.getenv("L1_PERSIST_POLICY", "latest"),
+            L2_STORAGE=os.getenv("L2_STORAGE", "rows"),
+            LIVE_DISTRIBUTION=os.getenv("LIVE_DISTRIBUTION", "true"),
+            LIVE_CHANNEL=os.getenv("LIVE_CHANNEL", "axiom_live"),
             ENVIRONMENT=os.getenv("ENVIRONMENT", "development"),
             DEBUG=os.getenv("DEBUG", "true"),
         )
@@ -5,8 +5,41 @@ Beque accumulates items in-memory and flushes them to an async sink when either:
 • max_batch_size items are queued, or
 • flush_interval seconds have passed since the last successful flush.
 
-Flushing is serialized and items are never lost: on failure the batch
-is re-queued in original order.
+Flushing is serialized by default and items are never lost: on failure
+the batch is re-queued in original order. Batches rejected because of bad
+items can instead be bisected so only the offending items are set aside
+in a dead letter sink. With max_inflight > 1 up to N
+batches flush concurrently; an optional order_key keeps all items of a key
+in a single in-flight batch at a time, so a key's items are never reordered.
+
+In adaptive mode, max_batch_size and flush_interval are retuned from the
+observed arrival rate and on_flush latency so that items reach the sink
+within target_latency, within configured bounds.
+
+An optional SpillJournal turns Beque into a disk-backed queue: once the
+in-memory queue reaches spill_threshold, or while the sink is failing, new
+items are appended to the journal instead of memory. They are replayed in
+order once flushes succeed again, including after a process restart.
+Replayed records are acknowledged to the journal only once every one of
+them has left the queue (flushed, dead-lettered or dropped); a crash before
+that replays them again, so delivery is at-least-once.
+
+Beques that share a database can draw flush slots from one BequeScheduler,
+which splits its budget across them by weight and latency target.
+
+CoalescingBeque keeps a single slot per key instead of every item: a newer
+item replaces (or, with a merge function, is merged into) the queued item
+of the same key, so batches are bounded by the number of keys rather than
+the arrival rate.
+
+The queue can be bounded with max_queue_size. When full, the overflow
+policy decides what happens: block the producer, drop the oldest or newest
+items, or coalesce queued items by key (latest wins). Dropped items are
+counted in stats.
+
+All queue mutations happen on the event loop thread without awaiting in
+between, so producers can enqueue synchronously via put_nowait/extend_nowait
+(e.g. from stream message callbacks) without taking a lock.
 """
 
 from __future__ import annotations
@@ -14,15 +47,45 @@ from __future__ import annotations
 import asyncio
 import logging
 import time
-from collections import deque
-from typing import Awaitable, Callable, Deque, Generic, List, Optional, TypeVar
+from collections import OrderedDict, deque
+from enum import Enum
+from typing import (
+    Awaitable,
+    Callable,
+    Deque,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from axiom.lib.journal import SpillJournal
+from axiom.lib.scheduler import BequeScheduler
 
 __version__ = "0.1.0"
-__all__ = ["Beque"]
+__all__ = ["Beque", "BequeFull", "CoalescingBeque", "OverflowPolicy"]
 
 T = TypeVar("T")
 
 
+class OverflowPolicy(str, Enum):
+    """What a bounded Beque does when an item arrives while it is full."""
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    COALESCE = "coalesce"
+
+
+class BequeFull(Exception):
+    """Raised by put_nowait/extend_nowait when a BLOCK-policy Beque is full."""
+
+
 class Beque(Generic[T]):
     """
     Beque (Batch Queue) accumulates items in-memory and flushes them to
@@ -33,10 +96,57 @@ class Beque(Generic[T]):
     Flushing is serialized and items are never lost: on failure the batch
     is re-queued in original order.
 
+    With max_inflight > 1, up to that many batches are handed to on_flush
+    concurrently (each call should use its own session/connection). If
+    order_key is given, a key that is part of an in-flight batch is held
+    back until that batch settles, so per-key order is preserved even
+    across failures and re-queues.
+
+    With max_queue_size set, the queue is bounded and overflow decides what
+    happens when it is full:
+      • BLOCK: add()/add_many() wait for space; the nowait variants raise
+        BequeFull.
+      • DROP_OLDEST / DROP_NEWEST: discard items from the head / the
+        incoming items.
+      • COALESCE: keep only the newest queued item per key(item), then drop
+        the oldest if that still does not free space.
+
+    With a journal, items spill to disk instead of memory while the queue
+    is at spill_threshold (default: max_queue_size, else 10 batches), while
+    the sink is failing, or while older items are still on disk. Spilled
+    items are replayed into memory, oldest first, whenever the sink is
+    healthy and the queue has room. Journal writes are small synchronous
+    appends on the event loop thread. The journal is closed on stop().
+
+    With adaptive=True, max_batch_size and flush_interval become starting
+    points. After each flush they are retuned from EWMAs of the arrival
+    rate and on_flush latency: a batch should fill in roughly
+    target_latency minus the flush latency, but never be so small that
+    flushing falls behind the arrival rate. Both values are clamped to
+    batch_size_bounds / flush_interval_bounds and reported in stats.
+
+    With is_poison, a failed batch whose error it classifies as caused by
+    the data (e.g. a constraint violation) is bisected instead of re-queued:
+    halves that flush are committed right away and each offending item is
+    handed to dead_letter(items, error), or logged and discarded if no
+    dead_letter sink is given. Other errors still re-queue with backoff.
+    With poison_key, items that only make sense after their predecessors
+    (e.g. deltas) go with them: once an item is dead-lettered, every other
+    item of its poison_key in the batch or the queue is dead-lettered too.
+    Items of a poison_key must share an order_key, so none are in flight
+    in another batch.
+
+    With a scheduler, flush slots come from a BequeScheduler shared with
+    other Beques instead of a private semaphore; weight sets this Beque's
+    share of the scheduler's budget and latency_target how long a ready
+    batch may wait for a slot before it is served ahead of its share.
+    max_inflight still caps this Beque's own concurrent flushes.
+
     Use as an async context manager:
 
         async with Beque(on_flush=my_handler) as q:
             await q.add(item)
+            q.put_nowait(item)  # from synchronous callbacks
     """
 
     def __init__(
@@ -47,11 +157,50 @@ class Beque(Generic[T]):
         flush_interval: float = 10.0,
         name: Optional[str] = None,
         logger: Optional[logging.Logger] = None,
+        max_queue_size: Optional[int] = None,
+        overflow: Union[OverflowPolicy, str] = OverflowPolicy.BLOCK,
+        key: Optional[Callable[[T], Hashable]] = None,
+        max_inflight: int = 1,
+        order_key: Optional[Callable[[T], Hashable]] = None,
+        journal: Optional[SpillJournal[T]] = None,
+        spill_threshold: Optional[int] = None,
+        adaptive: bool = False,
+        target_latency: float = 2.0,
+        batch_size_bounds: Tuple[int, int] = (1, 10_000),
+        flush_interval_bounds: Tuple[float, float] = (0.05, 60.0),
+        is_poison: Optional[Callable[[BaseException], bool]] = None,
+        dead_letter: Optional[
+            Callable[[List[T], BaseException], Awaitable[None]]
+        ] = None,
+        poison_key: Optional[Callable[[T], Hashable]] = None,
+        scheduler: Optional[BequeScheduler] = None,
+        weight: float = 1.0,
+        latency_target: Optional[float] = None,
     ) -> None:
         if max_batch_size < 1:
             raise ValueError("max_batch_size must be >= 1")
         if flush_interval <= 0:
             raise ValueError("flush_interval must be > 0")
+        if max_queue_size is not None and max_queue_size < max_batch_size:
+            raise ValueError("max_queue_size must be >= max_batch_size")
+        overflow = OverflowPolicy(overflow)
+        if overflow is OverflowPolicy.COALESCE and key is None:
+            raise ValueError("key is required for the coalesce overflow policy")
+        if max_inflight < 1:
+            raise ValueError("max_inflight must be >= 1")
+        if adaptive:
+            if target_latency <= 0:
+                raise ValueError("target_latency must be > 0")
+            if not 1 <= batch_size_bounds[0] <= batch_size_bounds[1]:
+                raise ValueError("batch_size_bounds must be 1 <= min <= max")
+            if not 0 < flush_interval_bounds[0] <= flush_interval_bounds[1]:
+                raise ValueError("flush_interval_bounds must be 0 < min <= max")
+        if spill_threshold is None:
+            spill_threshold = max_queue_size or 10 * max_batch_size
+        if spill_threshold < max_batch_size:
+            raise ValueError("spill_threshold must be >= max_batch_size")
+        if max_queue_size is not None and spill_threshold > max_queue_size:
+            raise ValueError("spill_threshold must be <= max_queue_size")
 
         self._on_flush = on_flush
         self._max_batch_size = int(max_batch_size)
@@ -61,10 +210,34 @@ class Beque(Generic[T]):
         self._logger = logger or logging.getLogger(self._name)
 
         self._queue: Deque[T] = deque()
-        self._queue_lock = asyncio.Lock()
-        self._consume_lock = asyncio.Lock()
         self._flush_event = asyncio.Event()
 
+        self._max_inflight = int(max_inflight)
+        self._order_key = order_key
+        # Flush slots: private, or a lane of a scheduler shared with others
+        self._slots = (
+            scheduler.lane(
+                self._name,
+                weight=weight,
+                latency_target=latency_target,
+                max_inflight=self._max_inflight,
+            )
+            if scheduler is not None
+            else asyncio.Semaphore(self._max_inflight)
+        )
+        self._inflight: set[asyncio.Task[None]] = set()
+        self._inflight_keys: dict[Hashable, int] = {}
+
+        self._max_queue_size = int(max_queue_size) if max_queue_size else None
+        self._overflow = overflow
+        self._key = key
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._overflowing = False
+        # Overflowing puts since the last coalescing pass; starts "due" so the
+        # first overflow coalesces before anything is dropped
+        self._puts_since_coalesce = self._max_queue_size or 0
+
         self._task: Optional[asyncio.Task[None]] = None
         self._running = False
         self._last_flush_time: Optional[float] = None
@@ -72,6 +245,39 @@ class Beque(Generic[T]):
         self._total_flushes = 0
         self._total_items = 0
         self._failed_flushes = 0
+        self._dropped_items = 0
+        self._coalesced_items = 0
+        self._rejected_items = 0
+        self._blocked_puts = 0
+
+        self._journal = journal
+        self._spill_threshold = int(spill_threshold)
+        self._consecutive_failures = 0
+        self._spilled_items = 0
+        self._replayed_items = 0
+
+        self._adaptive = adaptive
+        self._target_latency = float(target_latency)
+        # Never tune the batch past what the queue (or spill threshold) holds
+        batch_cap = min(
+            batch_size_bounds[1], self._max_queue_size or batch_size_bounds[1]
+        )
+        if journal is not None:
+            batch_cap = min(batch_cap, self._spill_threshold)
+        self._batch_size_bounds = (min(batch_size_bounds[0], batch_cap), batch_cap)
+        self._flush_interval_bounds = (
+            float(flush_interval_bounds[0]),
+            float(flush_interval_bounds[1]),
+        )
+        self._arrivals = 0
+        self._last_tune_time: Optional[float] = None
+        self._arrival_rate: Optional[float] = None
+        self._flush_latency: Optional[float] = None
+
+        self._is_poison = is_poison
+        self._dead_letter = dead_letter
+        self._poison_key = poison_key
+        self._dead_lettered_items = 0
 
     async def start(self) -> None:
         """Start the background consumer loop."""
@@ -81,9 +287,10 @@ class Beque(Generic[T]):
         self._last_flush_time = time.monotonic()
         self._task = asyncio.create_task(self._run(), name=f"{self._name}-consumer")
         self._logger.info(
-            "Started (max_batch_size=%d, flush_interval=%.2fs)",
+            "Started (max_batch_size=%d, flush_interval=%.2fs, max_inflight=%d)",
             self._max_batch_size,
             self._flush_interval,
+            self._max_inflight,
         )
 
     async def stop(self) -> None:
@@ -96,6 +303,18 @@ class Beque(Generic[T]):
             await self._task
             self._task = None
         await self.flush(force=True)
+        if self._journal is not None:
+            if self._queue:
+                # Keep undelivered items across restarts rather than losing them
+                self._logger.warning(
+                    "Spilling %d undelivered items to journal on shutdown",
+                    len(self._queue),
+                )
+                self._spilled_items += self._journal.append_many(self._queue)
+                self._queue.clear()
+            # Replayed items still queued were just journaled again
+            self._journal.ack(self._journal.unacked)
+            self._journal.close()
         self._logger.info(
             "Stopped (flushes=%d, items=%d, failures=%d)",
             self._total_flushes,
@@ -114,29 +333,85 @@ class Beque(Generic[T]):
             self._logger.exception("Error during Beque shutdown")
             # Don't suppress the original exception
 
-    async def add(self, item: T) -> None:
-        """Enqueue a single item."""
+    def put_nowait(self, item: T) -> None:
+        """Enqueue a single item without awaiting (event loop thread only)."""
         if not self._running:
             raise RuntimeError("Beque is not running")
-        async with self._queue_lock:
+        self._arrivals += 1
+        if self._journal is not None and self._should_spill(1):
+            self._spilled_items += self._journal.append_many((item,))
+            return
+        if self._max_queue_size is None:
             self._queue.append(item)
-            if len(self._queue) >= self._max_batch_size:
-                self._flush_event.set()
+        else:
+            if not self._make_room(1):
+                return
+            self._queue.append(item)
+            self._enforce_bound()
+        self._after_put()
 
-    async def add_many(self, items: List[T]) -> None:
-        """Enqueue multiple items atomically."""
-        if not items:
-            return
+    def extend_nowait(self, items: Iterable[T]) -> None:
+        """Enqueue items in order without awaiting (event loop thread only)."""
         if not self._running:
             raise RuntimeError("Beque is not running")
-        async with self._queue_lock:
+        if not isinstance(items, (list, tuple)):
+            items = list(items)
+        self._arrivals += len(items)
+        if self._journal is not None and self._should_spill(len(items)):
+            self._spilled_items += self._journal.append_many(items)
+            return
+        if self._max_queue_size is None:
             self._queue.extend(items)
-            if len(self._queue) >= self._max_batch_size:
-                self._flush_event.set()
+        else:
+            if not self._make_room(len(items)):
+                return
+            self._queue.extend(items)
+            self._enforce_bound()
+        self._after_put()
+
+    async def add(self, item: T) -> None:
+        """Enqueue a single item, waiting for space under the BLOCK policy."""
+        if self._overflow is OverflowPolicy.BLOCK:
+            await self._wait_for_space()
+        self.put_nowait(item)
+
+    async def add_many(self, items: List[T]) -> None:
+        """
+        Enqueue multiple items in order. Atomic unless the BLOCK policy has
+        to wait for space, in which case items are enqueued as room frees up.
+        """
+        if not items:
+            return
+        if (
+            self._overflow is not OverflowPolicy.BLOCK
+            or self._max_queue_size is None
+            or self._journal is not None
+        ):
+            # With a journal, whatever does not fit spills to disk
+            self.extend_nowait(items)
+            return
+        start = 0
+        while start < len(items):
+            await self._wait_for_space()
+            room = self._max_queue_size - len(self._queue)
+            if room <= 0:
+                continue
+            self.extend_nowait(items[start : start + room])
+            start += room
 
     async def flush(self, *, force: bool = True) -> None:
-        """Flush immediately (force=True flushes all items)."""
+        """
+        Flush immediately (force=True flushes all items) and wait for every
+        in-flight batch to settle.
+        """
+        failures = self._failed_flushes
         await self._flush_if_needed(force=force)
+        while self._inflight:
+            await asyncio.wait(set(self._inflight))
+            # Items held back by order_key become eligible once their batch
+            # settles; keep draining unless the sink is failing.
+            if force and self._queue and self._failed_flushes == failures:
+                await self._flush_if_needed(force=True)
 
     def size(self) -> int:
         """Get the current queue size (non-blocking)."""
@@ -160,12 +435,194 @@ class Beque(Generic[T]):
             "failed_flushes": self._failed_flushes,
             "queue_size": len(self._queue),
             "is_running": self._running,
+            "max_queue_size": self._max_queue_size,
+            "overflow_policy": self._overflow.value,
+            "dropped_items": self._dropped_items,
+            "coalesced_items": self._coalesced_items,
+            "rejected_items": self._rejected_items,
+            "blocked_puts": self._blocked_puts,
+            "inflight": len(self._inflight),
+            "max_inflight": self._max_inflight,
+            "max_batch_size": self._max_batch_size,
+            "flush_interval": self._flush_interval,
+            "dead_lettered_items": self._dead_lettered_items,
         }
+        if self._adaptive:
+            stats["adaptive"] = {
+                "target_latency": self._target_latency,
+                "arrival_rate": self._arrival_rate,
+                "flush_latency": self._flush_latency,
+                "batch_size_bounds": self._batch_size_bounds,
+                "flush_interval_bounds": self._flush_interval_bounds,
+            }
+        if self._journal is not None:
+            stats["spill_threshold"] = self._spill_threshold
+            stats["spilled_items"] = self._spilled_items
+            stats["replayed_items"] = self._replayed_items
+            stats["journal_pending"] = len(self._journal)
+            stats["journal_unacked"] = self._journal.unacked
         if self._last_flush_time is not None:
             stats["last_flush_time"] = self._last_flush_time
             stats["seconds_since_last_flush"] = time.monotonic() - self._last_flush_time
         return stats
 
+    def _after_put(self) -> None:
+        size = len(self._queue)
+        if size >= self._max_batch_size:
+            self._flush_event.set()
+        if self._max_queue_size is not None and size >= self._max_queue_size:
+            self._not_full.clear()
+
+    def _on_space_freed(self) -> None:
+        if self._max_queue_size is None:
+            return
+        if len(self._queue) < self._max_queue_size:
+            self._not_full.set()
+            if self._overflowing:
+                self._overflowing = False
+                self._logger.info("Queue below capacity again (%d)", len(self._queue))
+
+    async def _wait_for_space(self) -> None:
+        if self._max_queue_size is None or self._journal is not None:
+            # With a journal, overflow spills to disk instead of blocking
+            return
+        if len(self._queue) >= self._max_queue_size:
+            self._blocked_puts += 1
+            self._flush_event.set()
+            while len(self._queue) >= self._max_queue_size:
+                self._not_full.clear()
+                await self._not_full.wait()
+
+    def _make_room(self, incoming: int) -> bool:
+        """
+        Apply the overflow policy before enqueuing `incoming` items into a
+        bounded queue. Returns False if the items must not be enqueued.
+        """
+        free = self._max_queue_size - len(self._queue)
+        if free >= incoming:
+            return True
+        if not self._overflowing:
+            self._overflowing = True
+            self._logger.warning(
+                "Queue full (%d items), applying %s policy",
+                len(self._queue),
+                self._overflow.value,
+            )
+        self._flush_event.set()
+        if self._overflow is OverflowPolicy.BLOCK:
+            self._rejected_items += incoming
+            raise BequeFull(f"{self._name} is full ({len(self._queue)} items)")
+        if self._overflow is OverflowPolicy.DROP_NEWEST:
+            if free <= 0:
+                self._dropped_items += incoming
+                return False
+            # Partially fits: the caller enqueues everything and the bound
+            # trims the newest excess.
+            return True
+        # DROP_OLDEST and COALESCE make room at the head after enqueuing
+        return True
+
+    def _enforce_bound(self) -> None:
+        """Trim the queue back to max_queue_size according to the policy."""
+        if self._max_queue_size is None:
+            return
+        excess = len(self._queue) - self._max_queue_size
+        if excess <= 0:
+            return
+        if self._overflow is OverflowPolicy.COALESCE:
+            excess = self._coalesce(excess)
+            if excess <= 0:
+                return
+        if self._overflow is OverflowPolicy.DROP_NEWEST:
+            for _ in range(excess):
+                self._queue.pop()
+        elif self._overflow is not OverflowPolicy.BLOCK:
+            for _ in range(excess):
+                self._queue.popleft()
+        else:
+            # BLOCK never drops; producers wait until the queue drains
+            return
+        self._dropped_items += excess
+
+    def _coalesce(self, excess: int) -> int:
+        """
+        Collapse the queue to the newest item per key, keeping each key at the
+        position of its newest item. The O(n) pass runs at most once per
+        quarter-queue of puts; in between, overflow falls back to dropping
+        the oldest items. Returns the remaining excess.
+        """
+        threshold = max(1, self._max_queue_size // 4)
+        self._puts_since_coalesce += excess
+        if self._puts_since_coalesce < threshold:
+            return excess
+        key = self._key
+        seen = set()
+        kept: List[T] = []
+        for item in reversed(self._queue):
+            k = key(item)
+            if k in seen:
+                continue
+            seen.add(k)
+            kept.append(item)
+        removed = len(self._queue) - len(kept)
+        if removed:
+            kept.reverse()
+            self._queue.clear()
+            self._queue.extend(kept)
+            self._coalesced_items += removed
+        # Stay eligible while coalescing frees space; back off once it doesn't
+        self._puts_since_coalesce = threshold if removed >= excess else 0
+        return len(self._queue) - self._max_queue_size
+
+    def _should_spill(self, incoming: int) -> bool:
+        # Spill a batch that would cross the threshold as a whole, so a
+        # BLOCK-policy queue never has to reject it
+        return (
+            len(self._journal) > 0
+            or self._consecutive_failures > 0
+            or len(self._queue) + incoming > self._spill_threshold
+        )
+
+    def _replay_pending(self) -> bool:
+        return (
+            self._journal is not None
+            and len(self._journal) > 0
+            and not self._consecutive_failures
+        )
+
+    def _ack_replayed(self) -> None:
+        """
+        Acknowledge replayed records once they have all settled. Items are not
+        tracked one by one: the queue and in-flight batches being empty is
+        what proves nothing from the last refill is still pending.
+        """
+        if (
+            self._journal is not None
+            and self._journal.unacked
+            and not self._queue
+            and not self._inflight
+        ):
+            self._journal.ack(self._journal.unacked)
+
+    def _refill_from_journal(self) -> None:
+        """Move spilled items back into memory while the sink is healthy."""
+        self._ack_replayed()
+        if not self._replay_pending() or self._journal.unacked:
+            # Wait for the previous refill to settle before reading more
+            return
+        room = self._spill_threshold - len(self._queue)
+        if room <= 0:
+            return
+        items = self._journal.read(room)
+        if items:
+            self._queue.extend(items)
+            self._replayed_items += len(items)
+            self._logger.info(
+                "Replayed %d spilled items (%d still on disk)",
+                len(items),
+                len(self._journal),
+            )
+
     async def _run(self) -> None:
         try:
             while self._running:
@@ -180,6 +637,10 @@ class Beque(Generic[T]):
                     triggered_by_event = False
                 if triggered_by_event:
                     self._flush_event.clear()
+                elif self._adaptive:
+                    # Keep the rate estimate current when traffic slows down
+                    # and batches stop filling
+                    self._retune()
 
                 await self._flush_if_needed(force=not triggered_by_event)
         except Exception:
@@ -188,60 +649,376 @@ class Beque(Generic[T]):
             await self._flush_if_needed(force=True)
 
     async def _flush_if_needed(self, *, force: bool) -> None:
-        batch: List[T] = []
-        async with self._queue_lock:
-            queue_size = len(self._queue)
-            if not self._queue:
-                # If timer-based flush and queue is empty, still update last flush time
-                if force:
-                    self._last_flush_time = time.monotonic()
-                return
+        self._refill_from_journal()
+        queue_size = len(self._queue)
+        if not self._queue:
+            # If timer-based flush and queue is empty, still update last flush time
             if force:
-                # Timer-based flush: take all items
-                batch.extend(self._queue)
-                self._queue.clear()
-                self._logger.info(
-                    "Timer flush: taking %d items (force=True)", len(batch)
-                )
-            elif queue_size >= self._max_batch_size:
-                # Size-based flush: take max_batch_size items
-                for _ in range(self._max_batch_size):
-                    if self._queue:
-                        batch.append(self._queue.popleft())
-                self._logger.info(
-                    "Size flush: taking %d items from queue of %d (force=False)",
-                    len(batch),
-                    queue_size,
-                )
+                self._last_flush_time = time.monotonic()
+            return
+        if not force and queue_size < self._max_batch_size:
+            self._logger.info(
+                "No flush: queue=%d, max_batch_size=%d, force=%s",
+                queue_size,
+                self._max_batch_size,
+                force,
+            )
+            return
+
+        if self._max_inflight == 1:
+            # Serial mode: a timer flush takes everything, a size flush one batch
+            batch = self._take_batch(queue_size if force else self._max_batch_size)
+            self._log_take(batch, queue_size, force)
+            async with self._slots:
+                await self._flush_batch(batch)
+            self._ack_replayed()
+            if len(self._queue) >= self._max_batch_size or self._replay_pending():
+                self._flush_event.set()
+            return
+
+        # Pipelined mode: hand out max_batch_size batches while slots are free
+        while self._queue and (force or len(self._queue) >= self._max_batch_size):
+            await self._slots.acquire()
+            queue_size = len(self._queue)
+            batch = self._take_batch(self._max_batch_size)
+            if not batch:
+                # Everything left is held back behind in-flight keys
+                self._slots.release()
+                break
+            self._log_take(batch, queue_size, force)
+            task = asyncio.create_task(
+                self._flush_in_slot(batch), name=f"{self._name}-flush"
+            )
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    def _log_take(self, batch: List[T], queue_size: int, force: bool) -> None:
+        if force:
+            self._logger.info("Timer flush: taking %d items (force=True)", len(batch))
+        else:
+            self._logger.info(
+                "Size flush: taking %d items from queue of %d (force=False)",
+                len(batch),
+                queue_size,
+            )
+
+    def _take_batch(self, limit: int) -> List[T]:
+        """
+        Pop up to limit items from the head. With an order_key in pipelined
+        mode, items whose key is in flight (and every later item of that key)
+        are skipped and stay queued in order; their keys are reserved for
+        the returned batch.
+        """
+        queue = self._queue
+        if self._order_key is None or self._max_inflight == 1:
+            batch = [queue.popleft() for _ in range(min(limit, len(queue)))]
+        else:
+            order_key = self._order_key
+            busy = self._inflight_keys
+            held: set = set()
+            skipped: List[T] = []
+            batch = []
+            # Bound the scan so a queue dominated by busy keys stays cheap
+            max_skipped = 4 * limit
+            while queue and len(batch) < limit and len(skipped) < max_skipped:
+                item = queue.popleft()
+                k = order_key(item)
+                if k in busy or k in held:
+                    held.add(k)
+                    skipped.append(item)
+                else:
+                    batch.append(item)
+            queue.extendleft(reversed(skipped))
+            for k in {order_key(item) for item in batch}:
+                busy[k] = busy.get(k, 0) + 1
+        if batch:
+            self._on_space_freed()
+        return batch
+
+    def _release_keys(self, batch: List[T]) -> None:
+        if self._order_key is None or self._max_inflight == 1:
+            return
+        busy = self._inflight_keys
+        for k in {self._order_key(item) for item in batch}:
+            remaining = busy.get(k, 0) - 1
+            if remaining > 0:
+                busy[k] = remaining
             else:
-                self._logger.info(
-                    "No flush: queue=%d, max_batch_size=%d, force=%s",
-                    queue_size,
-                    self._max_batch_size,
-                    force,
-                )
-                return
-        if not batch:
+                busy.pop(k, None)
+
+    async def _flush_in_slot(self, batch: List[T]) -> None:
+        try:
+            await self._flush_batch(batch)
+        finally:
+            self._release_keys(batch)
+            self._slots.release()
+            # Settled: don't hold back the replay acknowledgement until the
+            # done callback runs
+            self._inflight.discard(asyncio.current_task())
+            self._ack_replayed()
+            if len(self._queue) >= self._max_batch_size or self._replay_pending():
+                self._flush_event.set()
+
+    def _retune(self, flush_latency: Optional[float] = None) -> None:
+        """Update rate/latency EWMAs and derive batch size and flush interval."""
+        now = time.monotonic()
+        if flush_latency is not None:
+            self._flush_latency = (
+                flush_latency
+                if self._flush_latency is None
+                else 0.7 * self._flush_latency + 0.3 * flush_latency
+            )
+        if self._last_tune_time is None:
+            self._last_tune_time = now
+            self._arrivals = 0
             return
+        elapsed = now - self._last_tune_time
+        if elapsed < 0.25:
+            # Too short a window for a meaningful rate sample
+            return
+        rate = self._arrivals / elapsed
+        self._arrivals = 0
+        self._last_tune_time = now
+        self._arrival_rate = (
+            rate
+            if self._arrival_rate is None
+            else 0.7 * self._arrival_rate + 0.3 * rate
+        )
 
+        latency = self._flush_latency or 0.0
+        # Time left for a batch to fill, leaving room for the flush itself
+        fill_budget = max(self._target_latency - latency, 0.1 * self._target_latency)
+        by_latency = self._arrival_rate * fill_budget
+        # Flushing must keep up: N in-flight batches per flush latency >= rate
+        by_throughput = 1.2 * self._arrival_rate * latency / self._max_inflight
+        lo, hi = self._batch_size_bounds
+        self._max_batch_size = int(min(max(by_latency, by_throughput, lo), hi))
+        lo_i, hi_i = self._flush_interval_bounds
+        self._flush_interval = min(max(fill_budget, lo_i), hi_i)
+
+    async def _flush_batch(self, batch: List[T]) -> None:
+        started = time.monotonic()
         try:
-            async with self._consume_lock:
-                await self._on_flush(batch)
-            self._total_flushes += 1
-            self._total_items += len(batch)
-            self._last_flush_time = time.monotonic()
-            self._logger.info("Flushed %d items", len(batch))
+            await self._on_flush(batch)
         except Exception as e:
+            if self._is_poison is not None and self._is_poison(e):
+                self._logger.warning(
+                    "Batch of %d items rejected by sink, bisecting: %s",
+                    len(batch),
+                    str(e),
+                )
+                batch, e = await self._isolate_poison(batch, e)
+                if not batch:
+                    self._consecutive_failures = 0
+                    self._last_flush_time = time.monotonic()
+                    return
             self._failed_flushes += 1
-            self._logger.exception(
+            self._consecutive_failures += 1
+            self._logger.error(
                 "Flush failed after %d successful flushes, re-queuing %d items: %s",
                 self._total_flushes,
                 len(batch),
                 str(e),
+                exc_info=e,
             )
-            async with self._queue_lock:
-                for item in reversed(batch):
-                    self._queue.appendleft(item)
+            self._queue.extendleft(reversed(batch))
+            self._enforce_bound()
+            if self._max_queue_size is not None:
+                if len(self._queue) >= self._max_queue_size:
+                    self._not_full.clear()
             # Exponential backoff on repeated failures, capped at 5 seconds
             backoff = min(0.5 * (2 ** min(self._failed_flushes - 1, 3)), 5.0)
             await asyncio.sleep(backoff)
+            return
+        self._total_flushes += 1
+        self._consecutive_failures = 0
+        self._total_items += len(batch)
+        self._last_flush_time = time.monotonic()
+        self._logger.info("Flushed %d items", len(batch))
+        if self._adaptive:
+            self._retune(self._last_flush_time - started)
+
+    async def _isolate_poison(
+        self,
+        batch: List[T],
+        error: BaseException,
+        tainted: Optional[set] = None,
+    ) -> Tuple[List[T], BaseException]:
+        """
+        Bisect a batch that failed with a poison error: halves that flush are
+        committed, single failing items go to the dead letter sink. Stops at
+        the first non-poison (transient) failure and returns the unflushed
+        remainder, in order, with that error; ([], error) if nothing is left.
+        tainted collects the poison_keys dead-lettered so far.
+        """
+        if tainted is None:
+            tainted = set()
+        if len(batch) == 1:
+            await self._send_to_dead_letter(batch, error, tainted)
+            return [], error
+        mid = len(batch) // 2
+        halves = (batch[:mid], batch[mid:])
+        for i, half in enumerate(halves):
+            half = await self._drop_tainted(half, error, tainted)
+            if not half:
+                continue
+            try:
+                await self._on_flush(half)
+            except Exception as e:
+                rest = halves[1] if i == 0 else []
+                if self._is_poison(e):
+                    remaining, e = await self._isolate_poison(half, e, tainted)
+                    if not remaining:
+                        continue
+                    half = remaining
+                return await self._drop_tainted(half + rest, error, tainted), e
+            self._total_flushes += 1
+            self._total_items += len(half)
+        return [], error
+
+    async def _drop_tainted(
+        self, items: List[T], error: BaseException, tainted: set
+    ) -> List[T]:
+        """Dead-letter the items whose poison_key was dead-lettered before."""
+        if not tainted:
+            return items
+        key = self._poison_key
+        dropped = [item for item in items if key(item) in tainted]
+        if not dropped:
+            return items
+        await self._send_to_dead_letter(dropped, error, tainted)
+        return [item for item in items if key(item) not in tainted]
+
+    async def _send_to_dead_letter(
+        self, items: List[T], error: BaseException, tainted: Optional[set] = None
+    ) -> None:
+        key = self._poison_key
+        if key is not None and tainted is not None:
+            new = {key(item) for item in items} - tainted
+            if new:
+                # Take the keys' queued items out before awaiting, so nothing
+                # enqueued from here on is mistaken for their successors
+                tainted |= new
+                queued = [item for item in self._queue if key(item) in new]
+                if queued:
+                    kept = [item for item in self._queue if key(item) not in new]
+                    self._queue.clear()
+                    self._queue.extend(kept)
+                    self._on_space_freed()
+                    items = items + queued
+        self._dead_lettered_items += len(items)
+        if self._dead_letter is None:
+            self._logger.error(
+                "Discarding %d poison items: %s: %r", len(items), str(error), items
+            )
+            return
+        self._logger.warning("Dead-lettering %d poison items: %s", len(items), error)
+        try:
+            await self._dead_letter(items, error)
+        except Exception:
+            self._logger.exception(
+                "Dead letter sink failed, discarding %d items: %r", len(items), items
+            )
+
+
+class _KeyedQueue(Generic[T]):
+    """
+    The subset of the deque interface Beque uses, holding one item per key.
+    A key keeps the queue position of its first pending item; its value is
+    the newest item, or merge(previous, new) when a merge function is set.
+    """
+
+    def __init__(
+        self,
+        key: Callable[[T], Hashable],
+        merge: Optional[Callable[[T, T], T]] = None,
+    ) -> None:
+        self._key = key
+        self._merge = merge
+        self._items: OrderedDict[Hashable, T] = OrderedDict()
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._items.values())
+
+    def __reversed__(self) -> Iterator[T]:
+        return reversed(self._items.values())
+
+    def append(self, item: T) -> None:
+        k = self._key(item)
+        items = self._items
+        if k in items:
+            items[k] = self._merge(items[k], item) if self._merge else item
+            self.coalesced += 1
+        else:
+            items[k] = item
+
+    def extend(self, items: Iterable[T]) -> None:
+        for item in items:
+            self.append(item)
+
+    def appendleft(self, item: T) -> None:
+        # Re-queued items are older than anything already pending for their key
+        k = self._key(item)
+        items = self._items
+        if k in items:
+            if self._merge:
+                items[k] = self._merge(item, items[k])
+            self.coalesced += 1
+        else:
+            items[k] = item
+        items.move_to_end(k, last=False)
+
+    def extendleft(self, items: Iterable[T]) -> None:
+        for item in items:
+            self.appendleft(item)
+
+    def popleft(self) -> T:
+        return self._items.popitem(last=False)[1]
+
+    def pop(self) -> T:
+        return self._items.popitem(last=True)[1]
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+class CoalescingBeque(Beque[T]):
+    """
+    A Beque that keeps only the latest pending item per key(item).
+
+        async with CoalescingBeque(
+            on_flush=write_quotes,
+            key=lambda q: q["symbol"],
+            merge=lambda old, new: {**old, **new},
+        ) as q:
+            q.put_nowait(quote)
+
+    Without merge, a newer item replaces the pending one; with merge, the
+    pending item becomes merge(previous, new), e.g. to fold partial field
+    updates into the previous snapshot. Each key keeps its place in the
+    queue, so keys are flushed in the order they first became pending.
+    Replaced items are counted as coalesced_items in stats.
+
+    Size-triggered flushes fire once max_batch_size distinct keys are
+    pending; otherwise batches go out on the flush_interval timer.
+    """
+
+    def __init__(
+        self,
+        *,
+        key: Callable[[T], Hashable],
+        merge: Optional[Callable[[T, T], T]] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(key=key, **kwargs)
+        self._queue = _KeyedQueue(key, merge)
+
+    @property
+    def stats(self) -> dict:
+        stats = super().stats
+        stats["coalesced_items"] += self._queue.coalesced
+        return stats
@@ -0,0 +1,76 @@
+"""
+DeadLetterFile - JSON Lines Sink for Rejected Items
+
+Items a sink refused to accept (e.g. rows violating a check constraint) are
+appended to a .jsonl file, one record per item:
+
+    {"time": "2025-01-02T14:30:00+00:00", "error": "...", "item": {...}}
+
+so they can be inspected and replayed by hand. Dataclass records are
+written as objects; other values that are not JSON serializable
+(datetimes, UUIDs, Decimals) are written with str().
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Iterable, Optional
+
+__all__ = ["DeadLetterFile"]
+
+
+def _json_default(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return str(value)
+
+
+class DeadLetterFile:
+    """
+    Append-only JSON Lines file of rejected items. Usable directly as a
+    Beque dead_letter sink:
+
+        Beque(on_flush=..., is_poison=..., dead_letter=DeadLetterFile(path))
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        name: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self._path = path
+        self._name = name or "DeadLetterFile"
+        self._logger = logger or logging.getLogger(self._name)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    async def __call__(self, items: Iterable[Any], error: BaseException) -> None:
+        self.write(items, error)
+
+    def write(self, items: Iterable[Any], error: BaseException) -> int:
+        """Append one line per item. Returns the number of items written."""
+        now = datetime.now(timezone.utc).isoformat()
+        reason = f"{type(error).__name__}: {error}"
+        lines = [
+            json.dumps(
+                {"time": now, "error": reason, "item": item}, default=_json_default
+            )
+            for item in items
+        ]
+        if not lines:
+            return 0
+        with open(self._path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        self._logger.info("Wrote %d items to %s", len(lines), self._path)
+        return len(lines)
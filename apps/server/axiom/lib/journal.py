@@ -0,0 +1,354 @@
+"""
+SpillJournal - Append-only On-Disk Record Log
+
+SpillJournal persists items as length-prefixed records in numbered segment
+files inside a directory:
+
+    <directory>/0000000000000001.seg
+    <directory>/0000000000000002.seg
+    <directory>/checkpoint
+
+Each record is an 8-byte header (payload length, CRC32) followed by the
+serialized payload. Writes go to the newest segment, which is rotated once
+it reaches segment_bytes. Reads memory-map segments from the read position
+forward. Records stay on disk until they are acknowledged with ack(): only
+then is the checkpoint advanced, and segments are deleted once every record
+in them has been acknowledged.
+
+On open, pending segments left by a previous process are recovered: the
+checkpoint is restored, so records that were read but never acknowledged
+are read again, and a torn record at the tail of the last segment (from a
+crash mid-write) is truncated away.
+
+Like Beque, the journal is meant to be used from a single thread.
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import pickle
+import struct
+import zlib
+from collections import deque
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+__all__ = ["SpillJournal"]
+
+T = TypeVar("T")
+
+_HEADER = struct.Struct("<II")
+_CHECKPOINT = struct.Struct("<QQ")
+_SUFFIX = ".seg"
+
+
+def _pickle_dumps(item: Any) -> bytes:
+    return pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class SpillJournal(Generic[T]):
+    """
+    Append-only, segment-rotated journal of items.
+
+        journal = SpillJournal("/var/lib/axiom/spill/l1")
+        journal.append_many(items)
+        replayed = journal.read(1000)  # oldest first
+        ...  # store replayed
+        journal.ack(len(replayed))
+
+    Items are serialized with pickle by default; pass dumps/loads to use a
+    different encoding. With fsync=True every append is fsynced, otherwise
+    appends are only guaranteed to survive a process (not host) crash.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        segment_bytes: int = 64 * 1024 * 1024,
+        dumps: Callable[[T], bytes] = _pickle_dumps,
+        loads: Callable[[bytes], T] = pickle.loads,
+        fsync: bool = False,
+        name: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        if segment_bytes < _HEADER.size:
+            raise ValueError("segment_bytes is too small")
+
+        self._directory = directory
+        self._segment_bytes = int(segment_bytes)
+        self._dumps = dumps
+        self._loads = loads
+        self._fsync = fsync
+
+        self._name = name or "SpillJournal"
+        self._logger = logger or logging.getLogger(self._name)
+
+        self._read_seq = 0
+        self._read_offset = 0
+        self._ack_seq = 0
+        self._ack_offset = 0
+        # (segment, end offset) of each record read but not yet acknowledged
+        self._unacked: Deque[Tuple[int, int]] = deque()
+        self._write_seq = 0
+        self._write_fd: Optional[int] = None
+        self._write_size = 0
+        self._pending = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+    # ---------- Public API ----------
+    def __len__(self) -> int:
+        """Number of records written but not yet read."""
+        return self._pending
+
+    @property
+    def unacked(self) -> int:
+        """Number of records read but not yet acknowledged."""
+        return len(self._unacked)
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def append(self, item: T) -> None:
+        """Append a single item."""
+        self.append_many((item,))
+
+    def append_many(self, items: Iterable[T]) -> int:
+        """Append items in order with a single write per segment. Returns count."""
+        buf = bytearray()
+        count = 0
+        for item in items:
+            payload = self._dumps(item)
+            if self._write_size + len(buf) >= self._segment_bytes and (
+                buf or self._write_size
+            ):
+                self._write(buf)
+                buf = bytearray()
+                self._rotate()
+            buf += _HEADER.pack(len(payload), zlib.crc32(payload))
+            buf += payload
+            count += 1
+        if buf:
+            self._write(buf)
+        self._pending += count
+        return count
+
+    def read(self, max_items: int) -> List[T]:
+        """
+        Return up to max_items of the oldest unread records. They stay on
+        disk, and are read again after a reopen, until acknowledged.
+        """
+        out: List[T] = []
+        while len(out) < max_items and self._pending:
+            path = self._segment_path(self._read_seq)
+            exhausted = self._read_segment(path, max_items - len(out), out)
+            if not exhausted:
+                break
+            if self._read_seq >= self._write_seq:
+                # Everything written has been read; records skipped as
+                # corrupt are no longer pending either
+                self._pending = len(out)
+                break
+            self._read_seq += 1
+            self._read_offset = 0
+        self._pending -= len(out)
+        if not self._unacked:
+            self._retire_if_drained()
+        return out
+
+    def ack(self, count: int) -> None:
+        """
+        Acknowledge the oldest count records returned by read(). The
+        checkpoint is advanced (and persisted) past them, and segments whose
+        records are all acknowledged are deleted.
+        """
+        count = min(count, len(self._unacked))
+        if count <= 0:
+            return
+        for _ in range(count - 1):
+            self._unacked.popleft()
+        seq, offset = self._unacked.popleft()
+        if seq < self._write_seq and offset >= os.path.getsize(self._segment_path(seq)):
+            # The segment is complete and fully acknowledged
+            seq, offset = seq + 1, 0
+        for old in range(self._ack_seq, seq):
+            path = self._segment_path(old)
+            if os.path.exists(path):
+                os.remove(path)
+        self._ack_seq, self._ack_offset = seq, offset
+        if not self._unacked:
+            self._retire_if_drained()
+        self._save_checkpoint()
+
+    def close(self) -> None:
+        """Close the active segment. The journal can be reopened later."""
+        if self._write_fd is not None:
+            os.close(self._write_fd)
+            self._write_fd = None
+
+    # ---------- Internals ----------
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self._directory, f"{seq:016d}{_SUFFIX}")
+
+    def _checkpoint_path(self) -> str:
+        return os.path.join(self._directory, "checkpoint")
+
+    def _write(self, buf: bytearray) -> None:
+        if self._write_fd is None:
+            self._open_writer()
+        os.write(self._write_fd, buf)
+        if self._fsync:
+            os.fsync(self._write_fd)
+        self._write_size += len(buf)
+
+    def _open_writer(self) -> None:
+        path = self._segment_path(self._write_seq)
+        self._write_fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._write_size = os.fstat(self._write_fd).st_size
+
+    def _rotate(self) -> None:
+        self.close()
+        self._write_seq += 1
+        self._open_writer()
+        self._logger.debug("Rotated to segment %d", self._write_seq)
+
+    def _retire_if_drained(self) -> None:
+        """
+        Once everything written is read and acknowledged, retire the active
+        segment instead of letting consumed records accumulate until rotation.
+        """
+        if self._pending or self._read_seq != self._write_seq:
+            return
+        self.close()
+        for seq in range(self._ack_seq, self._write_seq + 1):
+            path = self._segment_path(seq)
+            if os.path.exists(path):
+                os.remove(path)
+        self._write_seq += 1
+        self._read_seq, self._read_offset = self._write_seq, 0
+        self._ack_seq, self._ack_offset = self._write_seq, 0
+        self._write_size = 0
+        self._save_checkpoint()
+
+    def _read_segment(self, path: str, limit: int, out: List[T]) -> bool:
+        """Read up to limit records into out; True if the segment is exhausted."""
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            return True
+        if size <= self._read_offset:
+            return True
+        loads = self._loads
+        unacked = self._unacked
+        seq = self._read_seq
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                offset = self._read_offset
+                read = 0
+                while read < limit and offset + _HEADER.size <= size:
+                    length, crc = _HEADER.unpack_from(mm, offset)
+                    start = offset + _HEADER.size
+                    end = start + length
+                    if end > size:
+                        break
+                    payload = mm[start:end]
+                    if zlib.crc32(payload) != crc:
+                        self._logger.error(
+                            "Corrupt record in %s at offset %d, "
+                            "skipping rest of segment",
+                            path,
+                            offset,
+                        )
+                        offset = size
+                        break
+                    out.append(loads(payload))
+                    unacked.append((seq, end))
+                    offset = end
+                    read += 1
+                self._read_offset = offset
+        return self._read_offset >= size
+
+    def _save_checkpoint(self) -> None:
+        tmp = self._checkpoint_path() + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_CHECKPOINT.pack(self._ack_seq, self._ack_offset))
+        os.replace(tmp, self._checkpoint_path())
+
+    def _load_checkpoint(self) -> None:
+        try:
+            with open(self._checkpoint_path(), "rb") as f:
+                data = f.read(_CHECKPOINT.size)
+            if len(data) == _CHECKPOINT.size:
+                self._read_seq, self._read_offset = _CHECKPOINT.unpack(data)
+        except FileNotFoundError:
+            pass
+
+    def _scan(self, path: str, start: int) -> tuple[int, int]:
+        """Count valid records from start; returns (records, end of last valid)."""
+        size = os.path.getsize(path)
+        if size <= start:
+            return 0, start
+        count = 0
+        offset = start
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                while offset + _HEADER.size <= size:
+                    length, crc = _HEADER.unpack_from(mm, offset)
+                    end = offset + _HEADER.size + length
+                    if end > size:
+                        break
+                    if zlib.crc32(mm[offset + _HEADER.size : end]) != crc:
+                        break
+                    offset = end
+                    count += 1
+        return count, offset
+
+    def _recover(self) -> None:
+        self._load_checkpoint()
+        seqs = sorted(
+            int(name[: -len(_SUFFIX)])
+            for name in os.listdir(self._directory)
+            if name.endswith(_SUFFIX) and name[: -len(_SUFFIX)].isdigit()
+        )
+        pending = 0
+        for seq in seqs:
+            path = self._segment_path(seq)
+            if seq < self._read_seq:
+                os.remove(path)
+                continue
+            start = self._read_offset if seq == self._read_seq else 0
+            count, valid_end = self._scan(path, start)
+            if valid_end < os.path.getsize(path):
+                self._logger.warning(
+                    "Truncating torn tail of %s at offset %d", path, valid_end
+                )
+                os.truncate(path, valid_end)
+            pending += count
+        live = [seq for seq in seqs if seq >= self._read_seq]
+        if live and self._read_seq < live[0]:
+            self._read_seq, self._read_offset = live[0], 0
+        elif not live:
+            self._read_seq = max(self._read_seq, 1)
+            self._read_offset = 0
+        self._ack_seq, self._ack_offset = self._read_seq, self._read_offset
+        # Always append to a fresh segment after recovery
+        self._write_seq = (live[-1] + 1) if live else self._read_seq
+        self._pending = pending
+        if pending:
+            self._logger.info(
+                "Recovered %d pending records in %d segments", pending, len(live)
+            )
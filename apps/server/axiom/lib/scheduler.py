@@ -0,0 +1,247 @@
+"""
+BequeScheduler - Weighted-Fair Flush Slots Shared Across Beques
+
+Several Beques flushing to the same database compete for one connection
+pool. A BequeScheduler owns a fixed budget of flush slots and hands them
+out to lanes (one per Beque):
+
+• Weighted fairness: each lane is charged the time it holds a slot divided
+  by its weight, and a free slot goes to the waiting lane that has been
+  charged least. A lane with weight 3 gets about three times the
+  connection time of a lane with weight 1 while both are busy.
+• Latency targets: a lane whose batch has waited longer than its
+  latency_target is served first (earliest deadline first), regardless of
+  its share.
+
+Idle lanes do not bank credit: a lane that becomes busy again starts at
+the scheduler's current virtual time.
+
+Like Beque, the scheduler is meant to be used from a single event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+__all__ = ["BequeScheduler", "SchedulerLane"]
+
+
+class SchedulerLane:
+    """
+    A lane's view of the scheduler, usable like an asyncio.Semaphore:
+
+        async with lane:
+            await write(batch)
+
+    At most max_inflight slots are held by the lane at a time. Requests
+    beyond that wait in the scheduler, so a busy lane competes for the
+    slots it frees instead of losing them to whoever else is waiting.
+    """
+
+    def __init__(
+        self,
+        scheduler: BequeScheduler,
+        name: str,
+        *,
+        weight: float,
+        latency_target: Optional[float],
+        max_inflight: int,
+    ) -> None:
+        self._scheduler = scheduler
+        self.name = name
+        self.weight = float(weight)
+        self.latency_target = latency_target
+        self.max_inflight = int(max_inflight)
+        self._held_since: Deque[float] = deque()
+
+        self.vtime = 0.0
+        self.waiting = 0
+        self.grants = 0
+        self.urgent_grants = 0
+        self.total_wait = 0.0
+        self.total_held = 0.0
+
+    @property
+    def inflight(self) -> int:
+        return len(self._held_since)
+
+    async def acquire(self) -> None:
+        await self._scheduler._acquire(self)
+
+    def release(self) -> None:
+        self._scheduler._release(self)
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
+
+
+class _Waiter:
+    __slots__ = ("lane", "future", "since")
+
+    def __init__(self, lane: SchedulerLane, future: asyncio.Future) -> None:
+        self.lane = lane
+        self.future = future
+        self.since = time.monotonic()
+
+
+class BequeScheduler:
+    """
+    Hands out `budget` flush slots across lanes with weighted fairness and
+    per-lane latency targets.
+
+        scheduler = BequeScheduler(budget=4)
+        l1 = Beque(on_flush=..., scheduler=scheduler, weight=2.0, latency_target=1.0)
+        l2 = Beque(on_flush=..., scheduler=scheduler, max_inflight=3)
+
+    Size the budget below the connection pool so the application keeps
+    connections for other work.
+    """
+
+    def __init__(
+        self,
+        budget: int,
+        *,
+        name: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        if budget < 1:
+            raise ValueError("budget must be >= 1")
+        self._budget = int(budget)
+        self._free = int(budget)
+        self._name = name or "BequeScheduler"
+        self._logger = logger or logging.getLogger(self._name)
+        self._lanes: Dict[str, SchedulerLane] = {}
+        self._waiters: List[_Waiter] = []
+        self._vclock = 0.0
+        self._dispatch_scheduled = False
+
+    def lane(
+        self,
+        name: str,
+        *,
+        weight: float = 1.0,
+        latency_target: Optional[float] = None,
+        max_inflight: int = 1,
+    ) -> SchedulerLane:
+        """Register a lane. Names must be unique per scheduler."""
+        if weight <= 0:
+            raise ValueError("weight must be > 0")
+        if latency_target is not None and latency_target <= 0:
+            raise ValueError("latency_target must be > 0")
+        if name in self._lanes:
+            raise ValueError(f"Lane {name!r} is already registered")
+        lane = SchedulerLane(
+            self,
+            name,
+            weight=weight,
+            latency_target=latency_target,
+            max_inflight=max_inflight,
+        )
+        self._lanes[name] = lane
+        return lane
+
+    @property
+    def stats(self) -> dict:
+        """Slot usage and per-lane fairness counters."""
+        return {
+            "budget": self._budget,
+            "free": self._free,
+            "waiting": len(self._waiters),
+            "lanes": {
+                name: {
+                    "weight": lane.weight,
+                    "latency_target": lane.latency_target,
+                    "inflight": lane.inflight,
+                    "waiting": lane.waiting,
+                    "grants": lane.grants,
+                    "urgent_grants": lane.urgent_grants,
+                    "avg_wait": lane.total_wait / lane.grants if lane.grants else 0.0,
+                    "total_held": lane.total_held,
+                }
+                for name, lane in self._lanes.items()
+            },
+        }
+
+    async def _acquire(self, lane: SchedulerLane) -> None:
+        if not lane.waiting and not lane.inflight:
+            # Returning from idle: no credit for the time spent idle
+            lane.vtime = max(lane.vtime, self._vclock)
+        waiter = _Waiter(lane, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        lane.waiting += 1
+        self._dispatch()
+        try:
+            await waiter.future
+        except BaseException:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                lane.waiting -= 1
+            elif not waiter.future.cancelled():
+                # Granted just before the cancellation landed: hand it back
+                self._release(lane)
+            raise
+
+    def _release(self, lane: SchedulerLane) -> None:
+        held = time.monotonic() - lane._held_since.popleft()
+        lane.total_held += held
+        lane.vtime += held / lane.weight
+        self._free += 1
+        # Hand the slot out on the next loop iteration, so lanes woken in
+        # this one (e.g. a flush loop that just got a slot and is about to
+        # ask for the next) can compete for it
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            asyncio.get_running_loop().call_soon(self._deferred_dispatch)
+
+    def _deferred_dispatch(self) -> None:
+        self._dispatch_scheduled = False
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._free > 0 and self._waiters:
+            now = time.monotonic()
+            # Skip lanes at their own cap, and waiters cancelled since they
+            # queued (_acquire removes those once they resume)
+            eligible = [
+                w
+                for w in self._waiters
+                if not w.future.done() and w.lane.inflight < w.lane.max_inflight
+            ]
+            if not eligible:
+                return
+            overdue = [
+                w
+                for w in eligible
+                if w.lane.latency_target is not None
+                and now - w.since >= w.lane.latency_target
+            ]
+            if overdue:
+                waiter = min(overdue, key=lambda w: w.since + w.lane.latency_target)
+            else:
+                waiter = min(eligible, key=lambda w: (w.lane.vtime, w.since))
+                # Virtual time advances with the least-charged busy lane
+                self._vclock = max(self._vclock, waiter.lane.vtime)
+            self._waiters.remove(waiter)
+            waiter.lane.waiting -= 1
+            self._free -= 1
+            self._granted(waiter.lane, now - waiter.since, urgent=bool(overdue))
+            waiter.future.set_result(None)
+
+    def _granted(self, lane: SchedulerLane, waited: float, *, urgent: bool) -> None:
+        lane._held_since.append(time.monotonic())
+        lane.grants += 1
+        lane.total_wait += waited
+        if urgent:
+            lane.urgent_grants += 1
+            self._logger.debug(
+                "Lane %s over its latency target (%.2fs), served first",
+                lane.name,
+                waited,
+            )
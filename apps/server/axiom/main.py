@@ -1,18 +1,51 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
 import uvicorn
-from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi import (
+    Depends,
+    FastAPI,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from axiom.api.auth.schwab import router as schwab_auth_router
-from axiom.auth import require_auth
+from axiom.auth import get_current_user_from_websocket, require_auth
 from axiom.config import supabase
 from axiom.db.client import get_db
 from axiom.db.models.oauth import OAuthState
 from axiom.env import env
 from axiom.mdata.auth import SchwabAuthService
+from axiom.mdata.books import BOOKS, CONSOLIDATED, order_books
+from axiom.mdata.distribution import LiveSubscriber
+from axiom.mdata.live import LiveClient, LiveClientOverflow, live_hub
+from axiom.mdata.quotes import latest_quotes
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Live quotes/bars/books come from the streamer process over Postgres NOTIFY
+    subscriber = None
+    if env.LIVE_DISTRIBUTION:
+        subscriber = LiveSubscriber(channel=env.LIVE_CHANNEL)
+        await subscriber.start()
+    try:
+        yield
+    finally:
+        if subscriber is not None:
+            await subscriber.stop()
+
 
-app = FastAPI(title="Axiom Server", version="0.1.0")
+app = FastAPI(title="Axiom Server", version="0.1.0", lifespan=lifespan)
 
 # Configure CORS to allow frontend connection with credentials (cookies)
 app.add_middleware(
@@ -195,6 +228,121 @@ async def reset_schwab_connection(
         return {"error": f"Failed to reset connection: {str(e)}"}
 
 
+@app.get("/quotes/latest")
+async def get_latest_quotes(
+    response: Response,
+    symbols: Optional[str] = Query(
+        default=None, description="Comma-separated symbols; all symbols if omitted"
+    ),
+    if_none_match: Optional[str] = Header(default=None),
+    current_user=require_auth(),
+):
+    """
+    Latest level one quote per symbol from the in-memory store. Supports
+    ETag/If-None-Match so pollers get a 304 when nothing changed.
+    """
+    requested = None
+    if symbols is not None:
+        requested = list(
+            dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip())
+        )
+
+    etag = latest_quotes.etag(requested)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (tag.strip() for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    quotes, missing = latest_quotes.snapshot(requested)
+    response.headers.update(headers)
+    return {"quotes": quotes, "missing": missing}
+
+
+@app.get("/books/{symbol}")
+async def get_order_book(
+    symbol: str,
+    book: str = Query(
+        default=CONSOLIDATED,
+        description="NASDAQ, NYSE, or CONSOLIDATED to merge both books",
+    ),
+    depth: int = Query(default=10, ge=1, le=100, description="Levels per side"),
+    current_user=require_auth(),
+):
+    """
+    Current order book of a symbol from the in-memory books rebuilt from the
+    level two stream, best price first on each side.
+    """
+    book = book.upper()
+    if book != CONSOLIDATED and book not in BOOKS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown book {book!r}; expected one of {[*BOOKS, CONSOLIDATED]}",
+        )
+    snapshot = order_books.snapshot(symbol, book, depth)
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No {book} order book for {symbol.upper()}",
+        )
+    return snapshot
+
+
+@app.websocket("/ws/live")
+async def live_updates(
+    websocket: WebSocket, current_user=Depends(get_current_user_from_websocket)
+):
+    """
+    Push live L1, L2 and chart updates. Clients send
+    {"action": "subscribe" | "unsubscribe", "channel": "l1" | "l2" | "chart",
+    "symbols": [...]} and receive {"type": "updates", "updates": [...]} with
+    only the changed fields. "symbols" may also be a single symbol string.
+    Slow clients get the latest value per key. An L2 update whose level
+    fields are all null removes that level.
+    """
+    await websocket.accept()
+    client = live_hub.connect(websocket.send_json)
+    sender = asyncio.create_task(client.run())
+    reader = asyncio.create_task(_read_live_commands(websocket, client))
+    try:
+        done, _ = await asyncio.wait(
+            {sender, reader}, return_when=asyncio.FIRST_COMPLETED
+        )
+        if sender in done and isinstance(sender.exception(), LiveClientOverflow):
+            await websocket.close(
+                code=status.WS_1013_TRY_AGAIN_LATER, reason="Client too slow"
+            )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_hub.disconnect(client)
+        sender.cancel()
+        reader.cancel()
+
+
+async def _read_live_commands(websocket: WebSocket, client: LiveClient) -> None:
+    try:
+        while True:
+            command = await websocket.receive_json()
+            action = command.get("action") if isinstance(command, dict) else None
+            try:
+                if action == "subscribe":
+                    live_hub.subscribe(
+                        client, command.get("channel"), command.get("symbols") or []
+                    )
+                elif action == "unsubscribe":
+                    live_hub.unsubscribe(
+                        client, command.get("channel"), command.get("symbols") or []
+                    )
+                else:
+                    raise ValueError(f"Unknown action {action!r}")
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+    except WebSocketDisconnect:
+        pass
+
+
 @app.get("/openapi.json")
 async def get_openapi():
     """
@@ -0,0 +1,288 @@
+"""
+Incremental roll-up of 1 minute chart bars into the higher timeframes.
+
+The chart stream only delivers 1 minute bars. BarAggregator folds each one
+into the bar of every higher Timeframe it belongs to and returns those bars,
+completed or still in progress, so they go through the same chart sink
+(batcher -> upsert keyed by security, timestamp, timeframe) as the 1 minute
+bars. Clients read 5m..1d bars directly instead of aggregating 1m rows.
+
+Buckets follow the symbol's exchange session in its local timezone:
+
+- Intraday timeframes are aligned to the session open (09:30 by default),
+  so 1h bars are 09:30-10:30, 10:30-11:30, ... and 4h bars 09:30-13:30,
+  13:30-17:30; extended-hours minutes fall into buckets aligned the same
+  way.
+- 1d bars cover the local calendar day.
+
+DST is handled by computing buckets in local time. Bar timestamps are the
+bucket start as epoch milliseconds, like the stream's.
+
+Per symbol, the minute bars of the current local day are kept so a minute
+that is sent again (a revision) replaces its previous version instead of
+being counted twice. Everything else is updated in O(1) per timeframe.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from axiom.db.models.enums import Timeframe
+from axiom.mdata.records import ChartBar
+
+__all__ = ["HIGHER_TIMEFRAMES", "BarAggregator", "epoch_ms"]
+
+# Minutes per bucket; None = one bar per local day
+HIGHER_TIMEFRAMES: Dict[Timeframe, Optional[int]] = {
+    Timeframe.FIVE_MINUTE: 5,
+    Timeframe.FIFTEEN_MINUTE: 15,
+    Timeframe.THIRTY_MINUTE: 30,
+    Timeframe.ONE_HOUR: 60,
+    Timeframe.FOUR_HOUR: 240,
+    Timeframe.ONE_DAY: None,
+}
+
+_MINUTE_MS = 60_000
+
+
+@dataclass(slots=True)
+class _Bucket:
+    start: int
+    first: int  # timestamp of the earliest / latest minute folded in
+    last: int
+    open: Optional[float]
+    high: Optional[float]
+    low: Optional[float]
+    close: Optional[float]
+    volume: float = 0.0
+    trade_count: Optional[float] = None
+    # sum(vwap * volume) over minutes that carry a vwap, and their volume
+    pv: float = 0.0
+    pv_volume: float = 0.0
+
+    def add(self, ts: int, bar: ChartBar) -> None:
+        if ts < self.first:
+            self.first = ts
+            if bar.open_price is not None:
+                self.open = bar.open_price
+        if ts >= self.last:
+            self.last = ts
+            if bar.close_price is not None:
+                self.close = bar.close_price
+        if bar.high_price is not None and (
+            self.high is None or bar.high_price > self.high
+        ):
+            self.high = bar.high_price
+        if bar.low_price is not None and (self.low is None or bar.low_price < self.low):
+            self.low = bar.low_price
+        self.volume += bar.volume or 0.0
+        if bar.trade_count is not None:
+            self.trade_count = (self.trade_count or 0.0) + bar.trade_count
+        if bar.vwap is not None and bar.volume:
+            self.pv += bar.vwap * bar.volume
+            self.pv_volume += bar.volume
+
+    def to_bar(self, symbol: str, timeframe: Timeframe) -> ChartBar:
+        return ChartBar(
+            symbol,
+            open_price=self.open,
+            high_price=self.high,
+            low_price=self.low,
+            close_price=self.close,
+            volume=self.volume,
+            trade_count=self.trade_count,
+            vwap=self.pv / self.pv_volume if self.pv_volume else None,
+            timestamp=self.start,
+            timeframe=timeframe.value,
+        )
+
+
+def _new_bucket(start: int, ts: int, bar: ChartBar) -> _Bucket:
+    bucket = _Bucket(
+        start=start,
+        first=ts,
+        last=ts,
+        open=bar.open_price,
+        high=None,
+        low=None,
+        close=None,
+    )
+    bucket.add(ts, bar)
+    return bucket
+
+
+class _SymbolState:
+    __slots__ = ("zone", "day", "day_start", "anchor", "minutes", "buckets")
+
+    def __init__(self, zone: ZoneInfo) -> None:
+        self.zone = zone
+        self.day: Optional[date] = None
+        # Local midnight and session open of day, as epoch milliseconds
+        self.day_start = 0
+        self.anchor = 0
+        # minute timestamp -> 1m bar, for the current local day
+        self.minutes: Dict[int, ChartBar] = {}
+        self.buckets: Dict[Timeframe, _Bucket] = {}
+
+
+class BarAggregator:
+    """
+    Rolls 1 minute bars up into HIGHER_TIMEFRAMES:
+
+        bars = BarAggregator(timezone_for=resolver.timezone)
+        higher = bars.update(minute_bars)  # 5m..1d bars they touched
+
+    timezone_for maps a symbol to its exchange's IANA timezone; unknown
+    symbols use default_timezone.
+    """
+
+    def __init__(
+        self,
+        timeframes: Sequence[Timeframe] = tuple(HIGHER_TIMEFRAMES),
+        *,
+        timezone_for: Optional[Callable[[str], Optional[str]]] = None,
+        default_timezone: str = "America/New_York",
+        session_open: time = time(9, 30),
+    ) -> None:
+        self._timeframes = [(tf, HIGHER_TIMEFRAMES[tf]) for tf in timeframes]
+        self._timezone_for = timezone_for or (lambda _symbol: None)
+        self._default_zone = ZoneInfo(default_timezone)
+        self._session_open = session_open
+        self._zones: Dict[str, ZoneInfo] = {}
+        self._symbols: Dict[str, _SymbolState] = {}
+        self._minutes = 0
+        self._revisions = 0
+        self._late = 0
+        self._emitted = 0
+
+    def update(self, bars: Iterable[ChartBar]) -> List[ChartBar]:
+        """Fold 1 minute bars in; returns the higher-timeframe bars they touched."""
+        out: List[ChartBar] = []
+        touched: Dict[Tuple[str, Timeframe], None] = {}
+        for bar in bars:
+            ts = epoch_ms(bar.timestamp)
+            if ts is None:
+                continue
+            symbol = bar.symbol.upper()  # same key as forget()
+            state = self._state(symbol)
+            day = datetime.fromtimestamp(ts / 1000, tz=state.zone).date()
+            if day != state.day:
+                if state.day is not None and day < state.day:
+                    continue  # the previous day is closed
+                self._roll_day(state, day)
+            self._minutes += 1
+
+            revision = ts in state.minutes
+            state.minutes[ts] = bar
+            if revision:
+                self._revisions += 1
+            for tf, minutes in self._timeframes:
+                start = self._bucket_start(state, ts, minutes)
+                bucket = state.buckets.get(tf)
+                if bucket is None or start > bucket.start:
+                    if (symbol, tf) in touched:
+                        # Completed within this call: emit its final state
+                        del touched[(symbol, tf)]
+                        out.append(bucket.to_bar(symbol, tf))
+                    state.buckets[tf] = _new_bucket(start, ts, bar)
+                elif start < bucket.start:
+                    # Late minute for an earlier bucket: emit that bucket
+                    # again, rebuilt, and keep the current one
+                    self._late += 1
+                    late = self._rebuild(state, minutes, start)
+                    out.append(late.to_bar(symbol, tf))
+                    continue
+                elif revision:
+                    state.buckets[tf] = self._rebuild(state, minutes, start)
+                else:
+                    bucket.add(ts, bar)
+                touched[(symbol, tf)] = None
+
+        for symbol, tf in touched:
+            out.append(self._symbols[symbol].buckets[tf].to_bar(symbol, tf))
+        self._emitted += len(out)
+        return out
+
+    def forget(self, symbol: str) -> None:
+        """Drop the state kept for symbol (e.g. after unsubscribing)."""
+        self._symbols.pop(symbol.upper(), None)
+
+    def _state(self, symbol: str) -> _SymbolState:
+        state = self._symbols.get(symbol)
+        if state is None:
+            state = self._symbols[symbol] = _SymbolState(self._zone(symbol))
+        return state
+
+    def _zone(self, symbol: str) -> ZoneInfo:
+        name = self._timezone_for(symbol)
+        if not name:
+            return self._default_zone
+        zone = self._zones.get(name)
+        if zone is None:
+            try:
+                zone = ZoneInfo(name)
+            except (ZoneInfoNotFoundError, ValueError):
+                zone = self._default_zone
+            self._zones[name] = zone
+        return zone
+
+    def _roll_day(self, state: _SymbolState, day: date) -> None:
+        state.day = day
+        state.day_start = _local_ms(day, time(), state.zone)
+        state.anchor = _local_ms(day, self._session_open, state.zone)
+        state.minutes.clear()
+        state.buckets.clear()
+
+    @staticmethod
+    def _bucket_start(state: _SymbolState, ts: int, minutes: Optional[int]) -> int:
+        if minutes is None:
+            return state.day_start
+        width = minutes * _MINUTE_MS
+        return state.anchor + (ts - state.anchor) // width * width
+
+    def _rebuild(
+        self, state: _SymbolState, minutes: Optional[int], start: int
+    ) -> _Bucket:
+        """The bucket starting at start, from the day's minute bars."""
+        bucket: Optional[_Bucket] = None
+        for ts in sorted(state.minutes):
+            if self._bucket_start(state, ts, minutes) != start:
+                continue
+            bar = state.minutes[ts]
+            if bucket is None:
+                bucket = _new_bucket(start, ts, bar)
+            else:
+                bucket.add(ts, bar)
+        assert bucket is not None
+        return bucket
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "symbols": len(self._symbols),
+            "timeframes": [tf.value for tf, _ in self._timeframes],
+            "minute_bars": self._minutes,
+            "revisions": self._revisions,
+            "late_minutes": self._late,
+            "emitted_bars": self._emitted,
+        }
+
+
+def _local_ms(day: date, at: time, zone: ZoneInfo) -> int:
+    return int(datetime.combine(day, at, tzinfo=zone).timestamp() * 1000)
+
+
+def epoch_ms(value: Any) -> Optional[int]:
+    """Stream chart time as epoch milliseconds (seconds are detected)."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return int(number if number > 1e11 else number * 1000)
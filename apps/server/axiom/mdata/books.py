@@ -0,0 +1,278 @@
+"""
+In-memory order books rebuilt from the level two stream.
+
+level_two_quotes keeps every streamed level as its own row, so "the book
+for AAPL right now" is a heavy query. The streaming service instead folds
+every L2 message into an OrderBook per (symbol, book), and the API reads
+the book from memory.
+
+- Each side is a set of parallel arrays sorted best price first, keyed by
+  the price in ticks (price * 10^4, like the database) so equal prices
+  compare exactly. Bids are keyed by the negated tick so both sides sort
+  ascending. Top-N access is a slice, O(N).
+- Book messages carry the whole book of each symbol they mention, so a
+  symbol's levels in a message replace its book; a side with no levels in
+  the message is empty.
+- The consolidated view merges the venues' sides lazily (heapq.merge over
+  sorted keys), summing size and order count at equal prices, and stops
+  after depth prices: O(depth * log(books)).
+
+Every applied message takes a number from a store-wide sequence, so
+consumers sampling the books (see axiom.mdata.metrics) can ask which
+symbols changed since their last pass.
+"""
+
+from __future__ import annotations
+
+import heapq
+import time
+from array import array
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from axiom.mdata.records import L2Level
+
+__all__ = ["BOOKS", "CONSOLIDATED", "OrderBook", "OrderBookStore", "order_books"]
+
+BOOKS = ("NASDAQ", "NYSE")
+CONSOLIDATED = "CONSOLIDATED"
+
+_TICKS = 10_000
+
+
+class _Side:
+    """Levels of one side, best price first."""
+
+    __slots__ = ("keys", "sizes", "counts")
+
+    def __init__(self) -> None:
+        self.keys = array("q")
+        self.sizes = array("d")
+        self.counts = array("q")
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def replace(self, levels: Dict[int, List[float]]) -> None:
+        keys = sorted(levels)
+        self.keys = array("q", keys)
+        self.sizes = array("d", [levels[k][0] for k in keys])
+        self.counts = array("q", [int(levels[k][1]) for k in keys])
+
+    def iter_levels(self) -> Iterator[Tuple[int, float, int]]:
+        return zip(self.keys, self.sizes, self.counts)
+
+    def top(self, depth: int, sign: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                "price": sign * key / _TICKS,
+                "size": size,
+                "order_count": count,
+            }
+            for key, size, count in zip(
+                self.keys[:depth], self.sizes[:depth], self.counts[:depth]
+            )
+        ]
+
+
+class OrderBook:
+    """The current book of one symbol on one venue."""
+
+    __slots__ = ("symbol", "book", "bids", "asks", "book_time", "updated_at")
+
+    def __init__(self, symbol: str, book: str) -> None:
+        self.symbol = symbol
+        self.book = book
+        self.bids = _Side()
+        self.asks = _Side()
+        self.book_time: Any = None
+        self.updated_at = 0.0
+
+    def replace(self, levels: Iterable[L2Level]) -> None:
+        """Make levels the whole book; levels at the same price are summed."""
+        sides: Tuple[Dict[int, List[float]], Dict[int, List[float]]] = ({}, {})
+        book_time = None
+        for level in levels:
+            price, size = level.price_level, level.size
+            if price is None or size is None or price <= 0 or size <= 0:
+                continue
+            ticks = round(price * _TICKS)
+            bid = level.side != "ASK"
+            key = -ticks if bid else ticks
+            totals = sides[0 if bid else 1].setdefault(key, [0.0, 0])
+            totals[0] += size
+            totals[1] += level.order_count
+            if level.quote_time is not None:
+                book_time = level.quote_time
+        self.bids.replace(sides[0])
+        self.asks.replace(sides[1])
+        self.book_time = book_time
+        self.updated_at = time.time()
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return -self.bids.keys[0] / _TICKS if self.bids else None
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return self.asks.keys[0] / _TICKS if self.asks else None
+
+    def snapshot(self, depth: int = 10) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbol,
+            "book": self.book,
+            "bids": self.bids.top(depth, -1),
+            "asks": self.asks.top(depth, 1),
+            "book_time": self.book_time,
+            "updated_at": self.updated_at,
+        }
+
+
+class OrderBookStore:
+    """
+    Order books per symbol and venue:
+
+        books = OrderBookStore()
+        books.apply("NASDAQ", levels)               # one L2 message
+        books.snapshot("AAPL", "NASDAQ", depth=10)
+        books.snapshot("AAPL", CONSOLIDATED)        # NASDAQ + NYSE
+    """
+
+    def __init__(self) -> None:
+        self._books: Dict[str, Dict[str, OrderBook]] = {}
+        self._seq: Dict[str, int] = {}
+        self._version = 0
+        self._updates = 0
+
+    def __len__(self) -> int:
+        return len(self._books)
+
+    def apply(self, book: str, levels: Iterable[L2Level]) -> None:
+        """Fold one book message in; each symbol's levels replace its book."""
+        book = book.upper()
+        by_symbol: Dict[str, List[L2Level]] = {}
+        for level in levels:
+            by_symbol.setdefault(level.symbol, []).append(level)
+        for symbol, symbol_levels in by_symbol.items():
+            books = self._books.setdefault(symbol, {})
+            order_book = books.get(book)
+            if order_book is None:
+                order_book = books[book] = OrderBook(symbol, book)
+            order_book.replace(symbol_levels)
+            self._updates += 1
+            self._version += 1
+            self._seq[symbol] = self._version
+
+    @property
+    def version(self) -> int:
+        """Sequence number of the latest update."""
+        return self._version
+
+    def changed(self, since: int) -> List[str]:
+        """Symbols whose books were updated after version since."""
+        return [symbol for symbol, seq in self._seq.items() if seq > since]
+
+    def levels(
+        self, symbol: str, depth: int
+    ) -> Tuple[List[Tuple[int, float, int]], List[Tuple[int, float, int]]]:
+        """
+        Top depth consolidated (key, size, order_count) levels per side,
+        keyed like the sides: price * 10^4, negated for bids.
+        """
+        books = self._books.get(symbol.upper(), {}).values()
+        return (
+            _merged([b.bids for b in books], depth),
+            _merged([b.asks for b in books], depth),
+        )
+
+    def get(self, symbol: str, book: str) -> Optional[OrderBook]:
+        return self._books.get(symbol.upper(), {}).get(book.upper())
+
+    def snapshot(
+        self, symbol: str, book: str = CONSOLIDATED, depth: int = 10
+    ) -> Optional[Dict[str, Any]]:
+        """Top depth levels per side, None if there is no such book."""
+        symbol, book = symbol.upper(), book.upper()
+        if book == CONSOLIDATED:
+            return self.consolidated(symbol, depth)
+        order_book = self.get(symbol, book)
+        return order_book.snapshot(depth) if order_book is not None else None
+
+    def consolidated(self, symbol: str, depth: int = 10) -> Optional[Dict[str, Any]]:
+        """All venues' books of symbol merged, top depth levels per side."""
+        books = self._books.get(symbol.upper())
+        if not books:
+            return None
+        venues = sorted(books)
+        order_books = [books[v] for v in venues]
+        return {
+            "symbol": symbol.upper(),
+            "book": CONSOLIDATED,
+            "books": venues,
+            "bids": _merge([b.bids for b in order_books], depth, -1),
+            "asks": _merge([b.asks for b in order_books], depth, 1),
+            "book_time": max(
+                (b.book_time for b in order_books if b.book_time is not None),
+                default=None,
+            ),
+            "updated_at": max(b.updated_at for b in order_books),
+        }
+
+    def forget(self, symbol: str, book: Optional[str] = None) -> None:
+        """Drop symbol's book on one venue, or on all venues if book is None."""
+        symbol = symbol.upper()
+        if book is None:
+            self._books.pop(symbol, None)
+            self._seq.pop(symbol, None)
+            return
+        books = self._books.get(symbol)
+        if books is not None:
+            books.pop(book.upper(), None)
+            if not books:
+                del self._books[symbol]
+                self._seq.pop(symbol, None)
+
+    def clear(self) -> None:
+        self._books.clear()
+        self._seq.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        per_book: Dict[str, int] = {}
+        for books in self._books.values():
+            for book in books:
+                per_book[book] = per_book.get(book, 0) + 1
+        return {
+            "symbols": len(self._books),
+            "books": per_book,
+            "updates": self._updates,
+        }
+
+
+def _merged(sides: List[_Side], depth: int) -> List[Tuple[int, float, int]]:
+    if len(sides) == 1:
+        side = sides[0]
+        return list(zip(side.keys[:depth], side.sizes[:depth], side.counts[:depth]))
+    levels: List[Tuple[int, float, int]] = []
+    merged = heapq.merge(*(side.iter_levels() for side in sides))
+    for key, group in groupby(merged, key=lambda level: level[0]):
+        if len(levels) == depth:
+            break
+        size = 0.0
+        count = 0
+        for _key, level_size, level_count in group:
+            size += level_size
+            count += level_count
+        levels.append((key, size, count))
+    return levels
+
+
+def _merge(sides: List[_Side], depth: int, sign: int) -> List[Dict[str, Any]]:
+    return [
+        {"price": sign * key / _TICKS, "size": size, "order_count": count}
+        for key, size, count in _merged(sides, depth)
+    ]
+
+
+# Process-wide books: the streaming service writes them, the API reads them
+order_books = OrderBookStore()
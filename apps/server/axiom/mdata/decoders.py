@@ -0,0 +1,368 @@
+"""
+Table-driven decoders from streamed items (dicts) to compact records.
+
+Each stream type has a field table listing, per record field, the key
+spellings the feed may use and a converter. A RecordDecoder compiles its
+table into a plan: the first time a spelling is seen it becomes the only
+key read for that field, so steady-state decoding is one dict lookup per
+field, a type check for the numeric fields, and the record built from its
+positional slots. Fields that have not appeared yet (L1 sends
+partial updates) are probed item by item until they do. book_levels
+flattens schwab-py's nested order book items into per-level items first.
+
+Use one decoder per feed, since the resolved spellings are per feed.
+"""
+
+from __future__ import annotations
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from axiom.mdata.records import ChartBar, L1Quote, L2Level
+
+__all__ = [
+    "CHART_FIELDS",
+    "L1_FIELDS",
+    "L2_FIELDS",
+    "RecordDecoder",
+    "book_levels",
+    "chart_decoder",
+    "l1_decoder",
+    "l2_decoder",
+]
+
+R = TypeVar("R")
+
+# (key spellings, converter) per record field, in record field order
+FieldTable = Sequence[Tuple[Tuple[str, ...], Callable[[Any], Any]]]
+
+SYMBOL_KEYS = ("symbol", "SYMBOL", "key", "KEY")
+
+
+def to_float(value: Any) -> Optional[float]:
+    if value is None or type(value) is float:
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_int_or_zero(value: Any) -> int:
+    value = to_float(value)
+    return int(value) if value else 0
+
+
+def to_realtime(value: Any) -> bool:
+    return bool(value)
+
+
+def to_side(value: Any) -> Optional[str]:
+    if not value:
+        return None
+    side = str(value).upper()
+    return side if side in ("BID", "ASK") else None
+
+
+def to_timeframe(value: Any) -> Any:
+    return "1MIN" if value is None else value
+
+
+def raw(value: Any) -> Any:
+    return value
+
+
+# What a field reads when an item lacks its key, if not None: the feed
+# leaves isRealtime out of real-time quotes
+_ABSENT: Dict[Callable[[Any], Any], Any] = {to_realtime: True}
+
+
+L1_FIELDS: FieldTable = (
+    (("bidPrice", "BID_PRICE", "BID"), to_float),
+    (("askPrice", "ASK_PRICE", "ASK"), to_float),
+    (("lastPrice", "LAST_PRICE", "LAST"), to_float),
+    (("bidSize", "BID_SIZE"), to_float),
+    (("askSize", "ASK_SIZE"), to_float),
+    (("lastSize", "LAST_SIZE"), to_float),
+    (("mark", "MARK", "MARK_PRICE"), to_float),
+    (("highPrice", "HIGH_PRICE", "HIGH"), to_float),
+    (("lowPrice", "LOW_PRICE", "LOW"), to_float),
+    (("openPrice", "OPEN_PRICE", "OPEN"), to_float),
+    (("closePrice", "PREV_CLOSE", "CLOSE", "CLOSE_PRICE"), to_float),
+    (("totalVolume", "VOLUME", "TOTAL_VOLUME"), to_float),
+    (("quoteTime", "QUOTE_TIME", "QUOTE_TIME_MILLIS"), raw),
+    (("tradeTime", "TRADE_TIME", "TRADE_TIME_MILLIS"), raw),
+    (("isRealtime", "IS_REAL_TIME"), to_realtime),
+)
+
+L2_FIELDS: FieldTable = (
+    (("side", "SIDE"), to_side),
+    (("price", "PRICE", "priceLevel", "PRICE_LEVEL"), to_float),
+    (("size", "SIZE"), to_float),
+    (("orderCount", "ORDER_COUNT"), to_int_or_zero),
+    (("levelIndex", "LEVEL_INDEX"), to_int_or_zero),
+    (("marketMaker", "MMID"), raw),
+    (("micId", "MIC"), raw),
+    (("quoteTime", "QUOTE_TIME"), raw),
+)
+
+CHART_FIELDS: FieldTable = (
+    (("openPrice", "OPEN_PRICE", "OPEN", "open"), to_float),
+    (("highPrice", "HIGH_PRICE", "HIGH", "high"), to_float),
+    (("lowPrice", "LOW_PRICE", "LOW", "low"), to_float),
+    (("closePrice", "CLOSE_PRICE", "CLOSE", "close"), to_float),
+    (("volume", "VOLUME", "totalVolume", "TOTAL_VOLUME"), to_float),
+    (("tradeCount", "TRADE_COUNT"), to_float),
+    (("vwap", "VWAP"), to_float),
+    (("timestamp", "TIMESTAMP", "CHART_TIME_MILLIS"), raw),
+    (("timeframe", "TIMEFRAME"), to_timeframe),
+)
+
+
+# schwab-py's relabeled book sides: (side, list key, price key, order count key)
+_BOOK_SIDES = (
+    ("BID", "BIDS", "BID_PRICE", "NUM_BIDS"),
+    ("ASK", "ASKS", "ASK_PRICE", "NUM_ASKS"),
+)
+
+
+def book_levels(msg: Any) -> Any:
+    """
+    Flatten schwab-py's nested book content (one item per symbol with BIDS
+    and ASKS level lists) into one item per level in L2_FIELDS spellings.
+    Messages without nested books are returned unchanged.
+    """
+    content = msg.get("content") if isinstance(msg, dict) else None
+    if not isinstance(content, list) or not any(
+        isinstance(item, dict) and ("BIDS" in item or "ASKS" in item)
+        for item in content
+    ):
+        return msg
+    levels = []
+    for item in content:
+        if not isinstance(item, dict) or ("BIDS" not in item and "ASKS" not in item):
+            levels.append(item)
+            continue
+        symbol = item.get("key") or item.get("SYMBOL")
+        book_time = item.get("BOOK_TIME")
+        for side, list_key, price_key, count_key in _BOOK_SIDES:
+            for index, level in enumerate(item.get(list_key) or ()):
+                levels.append(
+                    {
+                        "key": symbol,
+                        "SIDE": side,
+                        "PRICE": level.get(price_key),
+                        "SIZE": level.get("TOTAL_VOLUME"),
+                        "ORDER_COUNT": level.get(count_key),
+                        "LEVEL_INDEX": index,
+                        "QUOTE_TIME": book_time,
+                    }
+                )
+    return {**msg, "content": levels}
+
+
+class RecordDecoder(Generic[R]):
+    """
+    Decodes stream messages into records of type `record`, constructed as
+    record(symbol, *fields) in the order of the field table.
+
+        decoder = RecordDecoder(L1Quote, L1_FIELDS)
+        quotes = decoder.decode_message(msg)
+
+    The decoding functions close over a plan built from the table (the
+    key and absent value of each field, and the indices of the fields per
+    converter), rebuilt whenever a spelling is resolved. The built-in
+    converters only run when a type check fails (e.g. a price arrives as a
+    string); other converters are called once per field.
+    """
+
+    def __init__(self, record: Type[R], table: FieldTable) -> None:
+        self._record = record
+        self._aliases = [keys for keys, _ in table]
+        self._converters = [convert for _, convert in table]
+        self._keys: List[Optional[str]] = [None] * len(table)
+        self._unresolved = set(range(len(table)))
+        # Every key seen so far; items with no new keys skip resolution
+        self._seen: set = set()
+        self._symbol_key: Optional[str] = None
+        self._decode_fields: Callable[[dict, str], R]
+        self._decode_items: Optional[Callable[..., List[R]]] = None
+        self._compile()
+
+    def decode_message(self, msg: Any) -> List[R]:
+        """Decode a stream message (dict with content, list, or single item)."""
+        if isinstance(msg, dict) and msg.get("content"):
+            content = msg["content"]
+            if not isinstance(content, list):
+                content = [content]
+        elif isinstance(msg, list):
+            content = msg
+        elif isinstance(msg, dict):
+            content = [msg]
+        else:
+            return []
+        if self._decode_items is not None:
+            return self._decode_items(content, self._seen, self._resolve_from)
+        return self._decode_each(content)
+
+    def _decode_each(self, content: List[Any]) -> List[R]:
+        decode = self.decode
+        records = []
+        for item in content:
+            if isinstance(item, dict):
+                record = decode(item)
+                if record is not None:
+                    records.append(record)
+        return records
+
+    def decode(self, item: dict) -> Optional[R]:
+        """Decode one item; None if it carries no symbol."""
+        if not item.keys() <= self._seen:
+            self._resolve(item)
+        symbol = item.get(self._symbol_key) if self._symbol_key else None
+        if not symbol:
+            symbol = self._probe_symbol(item)
+            if not symbol:
+                return None
+        return self._decode_fields(item, str(symbol).upper())
+
+    @property
+    def resolved_keys(self) -> dict:
+        """Field index -> key spelling chosen so far (for diagnostics)."""
+        return {i: k for i, k in enumerate(self._keys) if k is not None}
+
+    def _probe_symbol(self, item: dict) -> Any:
+        for key in SYMBOL_KEYS:
+            symbol = item.get(key)
+            if symbol:
+                if key != self._symbol_key:
+                    self._symbol_key = key
+                    self._compile()
+                return symbol
+        return None
+
+    def _resolve_from(self, content: List[Any], index: int) -> Optional[List[R]]:
+        """
+        Called by decode_items on an item with unseen keys. If that resolves
+        a spelling, the generated code is stale: decode the rest of the
+        message with the new plan and return it; otherwise None.
+        """
+        if not self._resolve(content[index]):
+            return None
+        return self._decode_each(content[index:])
+
+    def _resolve(self, item: dict) -> bool:
+        """Pick up spellings first seen in item; True if any was resolved."""
+        self._seen.update(item.keys())
+        found = False
+        for i in list(self._unresolved):
+            for key in self._aliases[i]:
+                if key in item:
+                    self._keys[i] = key
+                    self._unresolved.discard(i)
+                    found = True
+                    break
+        if found:
+            self._compile()
+        return found
+
+    def _compile(self) -> None:
+        """
+        Build decode_fields(item, symbol) and, once the symbol key is known,
+        decode_items(content, seen, resolve_from) for the current key plan.
+        """
+        record = self._record
+        # Unresolved fields read a key no item has
+        plan = tuple(
+            (key, _ABSENT.get(convert))
+            for key, convert in zip(self._keys, self._converters)
+        )
+        floats = []
+        ints = []
+        sides = []
+        others = []
+        for i, convert in enumerate(self._converters):
+            if convert is to_float:
+                floats.append(i)
+            elif convert is to_int_or_zero:
+                ints.append(i)
+            elif convert is to_side:
+                sides.append(i)
+            elif convert is not raw:
+                others.append((i, convert))
+        floats, ints, sides, others = (
+            tuple(floats),
+            tuple(ints),
+            tuple(sides),
+            tuple(others),
+        )
+
+        def decode_fields(item: dict, symbol: str) -> R:
+            get = item.get
+            values = [get(key, absent) for key, absent in plan]
+            for i in floats:
+                v = values[i]
+                if v is not None and v.__class__ is not float:
+                    values[i] = to_float(v)
+            for i in ints:
+                if values[i].__class__ is not int:
+                    values[i] = to_int_or_zero(values[i])
+            for i in sides:
+                v = values[i]
+                if v != "BID" and v != "ASK":
+                    values[i] = to_side(v)
+            for i, convert in others:
+                values[i] = convert(values[i])
+            return record(symbol, *values)
+
+        self._decode_fields = decode_fields
+        if self._symbol_key is None:
+            self._decode_items = None
+            return
+        symbol_key = self._symbol_key
+        decode_each = self._decode_each
+
+        def decode_items(
+            content: List[Any],
+            seen: set,
+            resolve_from: Callable[[List[Any], int], Optional[List[R]]],
+        ) -> List[R]:
+            out: List[R] = []
+            append = out.append
+            for index, item in enumerate(content):
+                if not isinstance(item, dict):
+                    continue
+                if not item.keys() <= seen:
+                    rest = resolve_from(content, index)
+                    if rest is not None:
+                        return out + rest
+                symbol = item.get(symbol_key)
+                if not symbol:
+                    # Different (or no) symbol spelling: slow path
+                    return out + decode_each(content[index:])
+                append(decode_fields(item, str(symbol).upper()))
+            return out
+
+        self._decode_items = decode_items
+
+
+def l1_decoder() -> RecordDecoder[L1Quote]:
+    return RecordDecoder(L1Quote, L1_FIELDS)
+
+
+def l2_decoder() -> RecordDecoder[L2Level]:
+    return RecordDecoder(L2Level, L2_FIELDS)
+
+
+def chart_decoder() -> RecordDecoder[ChartBar]:
+    return RecordDecoder(ChartBar, CHART_FIELDS)
@@ -0,0 +1,442 @@
+"""
+Live data distribution between processes over Postgres LISTEN/NOTIFY.
+
+The streamer (scripts/stream.py) and the API workers are separate
+processes, so the API's LatestQuoteStore and LiveHub see nothing on their
+own. LivePublisher runs next to the streaming service and NOTIFYs compact
+deltas on a channel; every API worker, on this host or any other host using
+the same database, runs a LiveSubscriber that LISTENs and applies them to
+its stores and hub.
+
+- Quotes are sent as the fields that changed since the last publish per
+  symbol, conflated over a short interval: [symbol, i, v, i, v, ...] where
+  i is the field's index in L1Quote. A keyframe with every symbol's full
+  quote goes out periodically so late joiners converge.
+- Chart bars are sent whole, latest version per (symbol, timeframe, time).
+- Order books are sent whole, latest version per (symbol, book), as
+  [symbol, book, [[side, price, size, order_count, level_index,
+  quote_time], ...]]; keyframes
+  resend every book.
+- Payloads are msgspec-encoded JSON chunked under NOTIFY's 8000 byte limit.
+
+Both sides use a dedicated asyncpg connection (not a pool slot) and
+reconnect with backoff; a lost NOTIFY costs at most one keyframe interval
+of staleness, never ingestion.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import asyncpg
+import msgspec
+
+from axiom.mdata.books import OrderBookStore, order_books
+from axiom.mdata.live import LiveHub, live_hub
+from axiom.mdata.quotes import LatestQuoteStore, latest_quotes
+from axiom.mdata.records import ChartBar, L1Quote, L2Level, merge_non_null
+
+__all__ = ["LivePublisher", "LiveSubscriber", "database_dsn"]
+
+# NOTIFY payloads must be shorter than 8000 bytes
+_MAX_PAYLOAD = 7_900
+_L1_FIELDS = L1Quote.__slots__
+_BAR_FIELDS = ChartBar.__slots__
+# Bars kept for publishing while the connection is down
+_MAX_PENDING_BARS = 10_000
+
+
+def database_dsn() -> str:
+    """Plain asyncpg DSN for the app's database URL."""
+    from axiom.db.client import engine
+
+    return engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class LivePublisher:
+    """
+    Publishes quote, bar and book deltas from the ingestion process:
+
+        publisher = LivePublisher(channel="axiom_live")
+        await publisher.start()
+        publisher.offer_quotes(quotes)  # O(1) per quote, never blocks
+        publisher.offer_bars(bars)
+        publisher.offer_books("NASDAQ", levels)
+        await publisher.stop()
+    """
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        *,
+        channel: str = "axiom_live",
+        interval: float = 0.25,
+        keyframe_interval: float = 30.0,
+        name: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self._dsn = dsn
+        self._channel = channel
+        self._interval = interval
+        self._keyframe_interval = keyframe_interval
+        self._name = name or "LivePublisher"
+        self._logger = logger or logging.getLogger(self._name)
+        self._encoder = msgspec.json.Encoder()
+        self._conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        # symbol -> merged quote; symbol -> field values last published
+        self._current: Dict[str, L1Quote] = {}
+        self._sent: Dict[str, Tuple[Any, ...]] = {}
+        self._dirty: set = set()
+        self._bars: Dict[Tuple[Any, ...], ChartBar] = {}
+        # (symbol, book) -> latest book entry
+        self._books: Dict[Tuple[str, str], list] = {}
+        self._dirty_books: set = set()
+        self._last_keyframe = 0.0
+        self._notifies = 0
+        self._published_quotes = 0
+        self._published_bars = 0
+        self._published_books = 0
+        self._dropped_bars = 0
+        self._errors = 0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self._name)
+
+    async def stop(self) -> None:
+        """Publish what is pending, then close the connection."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self._publish()
+        except Exception as e:
+            self._logger.warning("Final live publish failed: %s", e)
+        await self._close()
+
+    def offer_quotes(self, quotes: Iterable[L1Quote]) -> None:
+        current = self._current
+        for quote in quotes:
+            symbol = quote.symbol
+            previous = current.get(symbol)
+            current[symbol] = (
+                quote if previous is None else merge_non_null(previous, quote)
+            )
+            self._dirty.add(symbol)
+
+    def offer_bars(self, bars: Iterable[ChartBar]) -> None:
+        for bar in bars:
+            self._bars[(bar.symbol, bar.timeframe, bar.timestamp)] = bar
+        overflow = len(self._bars) - _MAX_PENDING_BARS
+        if overflow > 0:
+            for key in list(self._bars)[:overflow]:
+                del self._bars[key]
+            self._dropped_bars += overflow
+
+    def offer_books(self, book: str, levels: Iterable[L2Level]) -> None:
+        """Latest book per symbol in levels (one book message)."""
+        book = book.upper()
+        entries: Dict[str, list] = {}
+        for level in levels:
+            entry = entries.get(level.symbol)
+            if entry is None:
+                entry = entries[level.symbol] = [level.symbol, book, []]
+            entry[2].append(
+                [
+                    level.side,
+                    level.price_level,
+                    level.size,
+                    level.order_count,
+                    level.level_index,
+                    level.quote_time,
+                ]
+            )
+        for symbol, entry in entries.items():
+            self._books[(symbol, book)] = entry
+            self._dirty_books.add((symbol, book))
+
+    def forget(self, symbol: str) -> None:
+        """Stop publishing symbol's quotes (e.g. after unsubscribing)."""
+        symbol = symbol.upper()
+        self._current.pop(symbol, None)
+        self._sent.pop(symbol, None)
+        self._dirty.discard(symbol)
+
+    def forget_book(self, symbol: str, book: str) -> None:
+        """Stop publishing symbol's book."""
+        key = (symbol.upper(), book.upper())
+        self._books.pop(key, None)
+        self._dirty_books.discard(key)
+
+    async def _run(self) -> None:
+        backoff = self._interval
+        while True:
+            await asyncio.sleep(backoff)
+            try:
+                await self._publish()
+                backoff = self._interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._errors += 1
+                self._logger.warning("Live publish failed: %s", e)
+                await self._close()
+                backoff = min(backoff * 2, 30.0)
+
+    async def _publish(self) -> None:
+        now = time.monotonic()
+        keyframe = now - self._last_keyframe >= self._keyframe_interval
+        symbols = list(self._current) if keyframe else list(self._dirty)
+        book_keys = list(self._books) if keyframe else list(self._dirty_books)
+        if not symbols and not self._bars and not book_keys:
+            return
+        # Detach what is pending: updates offered while NOTIFYs are in
+        # flight go out next round
+        dirty, self._dirty = self._dirty, set()
+        dirty_books, self._dirty_books = self._dirty_books, set()
+        pending_bars, self._bars = self._bars, {}
+
+        quotes: List[list] = []
+        sent_values: Dict[str, Tuple[Any, ...]] = {}
+        for symbol in symbols:
+            quote = self._current[symbol]
+            values = tuple(getattr(quote, name) for name in _L1_FIELDS)
+            previous = None if keyframe else self._sent.get(symbol)
+            entry: list = [symbol]
+            for i, value in enumerate(values[1:], start=1):
+                if value is not None and (previous is None or previous[i] != value):
+                    entry += (i, value)
+            sent_values[symbol] = values
+            if len(entry) > 1:
+                quotes.append(entry)
+        bars = [
+            [getattr(bar, name) for name in _BAR_FIELDS]
+            for bar in pending_bars.values()
+        ]
+        books = [self._books[key] for key in book_keys]
+
+        try:
+            conn = await self._connect()
+            for payload in self._payloads(quotes, bars, books):
+                await conn.execute("SELECT pg_notify($1, $2)", self._channel, payload)
+                self._notifies += 1
+        except BaseException:
+            # Resend everything next round; newer bars win
+            self._dirty |= dirty
+            self._dirty_books |= dirty_books
+            self._bars = {**pending_bars, **self._bars}
+            raise
+
+        self._sent.update(sent_values)
+        if keyframe:
+            self._last_keyframe = now
+        self._published_quotes += len(quotes)
+        self._published_bars += len(bars)
+        self._published_books += len(books)
+
+    def _payloads(
+        self, quotes: List[list], bars: List[list], books: List[list]
+    ) -> Iterable[str]:
+        """Pack entries into as few payloads under the size limit as possible."""
+        parts: Dict[str, List[bytes]] = {"q": [], "b": [], "o": []}
+        size = 0
+        for kind, entries in (("q", quotes), ("b", bars), ("o", books)):
+            for entry in entries:
+                encoded = self._encoder.encode(entry)
+                if size + len(encoded) + 24 > _MAX_PAYLOAD and size:
+                    yield self._join(parts)
+                    parts = {"q": [], "b": [], "o": []}
+                    size = 0
+                if len(encoded) + 24 > _MAX_PAYLOAD:
+                    self._logger.warning(
+                        "Dropping oversized live entry for %s", entry[0]
+                    )
+                    continue
+                parts[kind].append(encoded)
+                size += len(encoded) + 1
+        if size:
+            yield self._join(parts)
+
+    @staticmethod
+    def _join(parts: Dict[str, List[bytes]]) -> str:
+        return (
+            b'{"q":['
+            + b",".join(parts["q"])
+            + b'],"b":['
+            + b",".join(parts["b"])
+            + b'],"o":['
+            + b",".join(parts["o"])
+            + b"]}"
+        ).decode()
+
+    async def _connect(self) -> asyncpg.Connection:
+        if self._conn is None or self._conn.is_closed():
+            self._conn = await asyncpg.connect(self._dsn or database_dsn())
+        return self._conn
+
+    async def _close(self) -> None:
+        if self._conn is not None:
+            try:
+                await self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "channel": self._channel,
+            "connected": self._conn is not None and not self._conn.is_closed(),
+            "notifies": self._notifies,
+            "published_quotes": self._published_quotes,
+            "published_bars": self._published_bars,
+            "published_books": self._published_books,
+            "pending_symbols": len(self._dirty),
+            "pending_bars": len(self._bars),
+            "pending_books": len(self._dirty_books),
+            "dropped_bars": self._dropped_bars,
+            "errors": self._errors,
+        }
+
+
+class _Payload(msgspec.Struct):
+    q: List[list] = []
+    b: List[list] = []
+    o: List[list] = []
+
+
+class LiveSubscriber:
+    """
+    Applies published deltas to this process's quote store, order books and
+    live hub:
+
+        subscriber = LiveSubscriber(channel="axiom_live")
+        await subscriber.start()
+        ...
+        await subscriber.stop()
+    """
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        *,
+        channel: str = "axiom_live",
+        quote_store: Optional[LatestQuoteStore] = None,
+        hub: Optional[LiveHub] = None,
+        books: Optional[OrderBookStore] = None,
+        name: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self._dsn = dsn
+        self._channel = channel
+        self._store = quote_store if quote_store is not None else latest_quotes
+        self._books = books if books is not None else order_books
+        self._hub = hub if hub is not None else live_hub
+        self._name = name or "LiveSubscriber"
+        self._logger = logger or logging.getLogger(self._name)
+        self._decoder = msgspec.json.Decoder(_Payload)
+        self._task: Optional[asyncio.Task] = None
+        self._connected = False
+        self._received = 0
+        self._errors = 0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self._name)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def apply(self, payload: str) -> None:
+        """Apply one NOTIFY payload."""
+        message = self._decoder.decode(payload)
+        if message.q:
+            quotes = []
+            width = len(_L1_FIELDS)
+            for entry in message.q:
+                values: List[Any] = [None] * width
+                values[0] = entry[0]
+                for i in range(1, len(entry) - 1, 2):
+                    index = entry[i]
+                    if 0 < index < width:
+                        values[index] = entry[i + 1]
+                quotes.append(L1Quote(*values))
+            self._store.update(quotes)
+            self._hub.publish_l1(quotes)
+        if message.b:
+            self._hub.publish_bars(ChartBar(*entry) for entry in message.b)
+        for symbol, book, entries in message.o:
+            levels = [
+                L2Level(
+                    symbol,
+                    side,
+                    price,
+                    size,
+                    order_count,
+                    index,
+                    quote_time=quote_time,
+                )
+                for side, price, size, order_count, index, quote_time in entries
+            ]
+            self._books.apply(book, levels)
+            self._hub.publish_l2(book, levels)
+        self._received += 1
+
+    def _on_notify(self, _conn: Any, _pid: int, _channel: str, payload: str) -> None:
+        try:
+            self.apply(payload)
+        except Exception as e:
+            self._errors += 1
+            self._logger.warning("Bad live payload: %s", e)
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self._dsn or database_dsn())
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _c, closed=closed: closed.set())
+                await conn.add_listener(self._channel, self._on_notify)
+                self._connected = True
+                backoff = 1.0
+                self._logger.info("Listening for live data on %s", self._channel)
+                await closed.wait()
+                self._logger.warning("Live data connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._errors += 1
+                self._logger.warning("Live data listener failed: %s", e)
+            finally:
+                self._connected = False
+                if conn is not None and not conn.is_closed():
+                    try:
+                        await conn.close()
+                    except Exception:
+                        pass
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60.0)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "channel": self._channel,
+            "connected": self._connected,
+            "received": self._received,
+            "errors": self._errors,
+        }
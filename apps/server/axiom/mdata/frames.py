@@ -0,0 +1,221 @@
+"""
+Raw streamer frame decoding.
+
+schwab-py parses every websocket frame into dicts, deep-copies them to
+relabel numeric field keys, and hands them to handlers that build more
+dicts. FrameDecoder instead decodes the raw JSON text with msgspec against
+typed schemas of the wire format (numeric field keys included) and builds
+records directly, skipping every intermediate dict.
+
+Only the services it has schemas for, and the caller asks for, take the
+fast path. Everything else in the frame (responses, notifications, other
+services) is returned as a plain message for schwab-py's own dispatch.
+"""
+
+from __future__ import annotations
+
+from typing import Collection, Dict, List, Optional, Tuple, Union
+
+import msgspec
+
+from axiom.mdata.records import ChartBar, L1Quote, L2Level
+
+__all__ = ["FrameDecodeError", "FrameDecoder"]
+
+FrameDecodeError = (msgspec.DecodeError, msgspec.ValidationError)
+
+
+# ---------- Wire schemas (field numbers from schwab-py's *Fields enums) ----------
+class _ServiceData(msgspec.Struct):
+    service: str
+    content: msgspec.Raw = msgspec.Raw(b"[]")
+    timestamp: Optional[int] = None
+    command: Optional[str] = None
+
+
+class _Frame(msgspec.Struct):
+    data: List[_ServiceData] = []
+    response: Optional[msgspec.Raw] = None
+    notify: Optional[msgspec.Raw] = None
+
+
+class _LevelOne(msgspec.Struct):
+    key: str
+    delayed: bool = False
+    bid_price: Optional[float] = msgspec.field(default=None, name="1")
+    ask_price: Optional[float] = msgspec.field(default=None, name="2")
+    last_price: Optional[float] = msgspec.field(default=None, name="3")
+    bid_size: Optional[float] = msgspec.field(default=None, name="4")
+    ask_size: Optional[float] = msgspec.field(default=None, name="5")
+    total_volume: Optional[float] = msgspec.field(default=None, name="8")
+    last_size: Optional[float] = msgspec.field(default=None, name="9")
+    high_price: Optional[float] = msgspec.field(default=None, name="10")
+    low_price: Optional[float] = msgspec.field(default=None, name="11")
+    close_price: Optional[float] = msgspec.field(default=None, name="12")
+    open_price: Optional[float] = msgspec.field(default=None, name="17")
+    mark: Optional[float] = msgspec.field(default=None, name="33")
+    quote_time: Optional[int] = msgspec.field(default=None, name="34")
+    trade_time: Optional[int] = msgspec.field(default=None, name="35")
+
+
+class _BookLevel(msgspec.Struct):
+    price: float = msgspec.field(name="0")
+    total_volume: float = msgspec.field(default=0.0, name="1")
+    order_count: int = msgspec.field(default=0, name="2")
+
+
+class _Book(msgspec.Struct):
+    key: str
+    book_time: Optional[int] = msgspec.field(default=None, name="1")
+    bids: List[_BookLevel] = msgspec.field(default_factory=list, name="2")
+    asks: List[_BookLevel] = msgspec.field(default_factory=list, name="3")
+
+
+class _ChartEquity(msgspec.Struct):
+    key: str
+    open_price: Optional[float] = msgspec.field(default=None, name="2")
+    high_price: Optional[float] = msgspec.field(default=None, name="3")
+    low_price: Optional[float] = msgspec.field(default=None, name="4")
+    close_price: Optional[float] = msgspec.field(default=None, name="5")
+    volume: Optional[float] = msgspec.field(default=None, name="6")
+    chart_time: Optional[int] = msgspec.field(default=None, name="7")
+
+
+# ---------- Wire -> record ----------
+def _l1_records(items: List[_LevelOne]) -> List[L1Quote]:
+    return [
+        L1Quote(
+            q.key.upper(),
+            q.bid_price,
+            q.ask_price,
+            q.last_price,
+            q.bid_size,
+            q.ask_size,
+            q.last_size,
+            q.mark,
+            q.high_price,
+            q.low_price,
+            q.open_price,
+            q.close_price,
+            q.total_volume,
+            q.quote_time,
+            q.trade_time,
+            not q.delayed,
+        )
+        for q in items
+    ]
+
+
+def _book_records(items: List[_Book]) -> List[L2Level]:
+    records: List[L2Level] = []
+    append = records.append
+    for book in items:
+        symbol = book.key.upper()
+        t = book.book_time
+        for i, lvl in enumerate(book.bids):
+            append(
+                L2Level(
+                    symbol,
+                    "BID",
+                    lvl.price,
+                    lvl.total_volume,
+                    lvl.order_count,
+                    i,
+                    None,
+                    None,
+                    t,
+                )
+            )
+        for i, lvl in enumerate(book.asks):
+            append(
+                L2Level(
+                    symbol,
+                    "ASK",
+                    lvl.price,
+                    lvl.total_volume,
+                    lvl.order_count,
+                    i,
+                    None,
+                    None,
+                    t,
+                )
+            )
+    return records
+
+
+def _chart_records(items: List[_ChartEquity]) -> List[ChartBar]:
+    return [
+        ChartBar(
+            c.key.upper(),
+            c.open_price,
+            c.high_price,
+            c.low_price,
+            c.close_price,
+            c.volume,
+            None,
+            None,
+            c.chart_time,
+        )
+        for c in items
+    ]
+
+
+# service -> (content schema, record builder)
+_SCHEMAS = {
+    "LEVELONE_EQUITIES": (List[_LevelOne], _l1_records),
+    "NASDAQ_BOOK": (List[_Book], _book_records),
+    "NYSE_BOOK": (List[_Book], _book_records),
+    "CHART_EQUITY": (List[_ChartEquity], _chart_records),
+}
+
+Records = Union[List[L1Quote], List[L2Level], List[ChartBar]]
+
+
+class FrameDecoder:
+    """
+    Decodes raw streamer frames into records for the fast services.
+
+        records, rest = decoder.decode(raw, {"LEVELONE_EQUITIES"})
+        # records: [("LEVELONE_EQUITIES", [L1Quote, ...]), ...] in frame order
+        # rest: dict for schwab-py's dispatch, or None if nothing is left
+
+    Raises one of FrameDecodeError if the frame is not valid JSON or does
+    not match the schemas.
+    """
+
+    def __init__(self) -> None:
+        self._frame = msgspec.json.Decoder(_Frame)
+        self._content = {
+            service: (msgspec.json.Decoder(schema), build)
+            for service, (schema, build) in _SCHEMAS.items()
+        }
+        self._json = msgspec.json.Decoder()
+
+    def decode(
+        self, raw: Union[str, bytes], services: Collection[str]
+    ) -> Tuple[List[Tuple[str, Records]], Optional[dict]]:
+        frame = self._frame.decode(raw)
+        records: List[Tuple[str, Records]] = []
+        rest: Dict[str, list] = {}
+        for part in frame.data:
+            decoder = (
+                self._content.get(part.service) if part.service in services else None
+            )
+            if decoder is None:
+                rest.setdefault("data", []).append(self._plain(part))
+                continue
+            content_decoder, build = decoder
+            records.append((part.service, build(content_decoder.decode(part.content))))
+        if frame.response is not None:
+            rest["response"] = self._json.decode(frame.response)
+        if frame.notify is not None:
+            rest["notify"] = self._json.decode(frame.notify)
+        return records, (rest or None)
+
+    def _plain(self, part: _ServiceData) -> dict:
+        msg = {"service": part.service, "content": self._json.decode(part.content)}
+        if part.timestamp is not None:
+            msg["timestamp"] = part.timestamp
+        if part.command is not None:
+            msg["command"] = part.command
+        return msg
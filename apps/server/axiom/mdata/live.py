@@ -0,0 +1,348 @@
+"""
+LiveHub - Fan-out of Stream Updates to Live Clients
+
+The streaming service publishes decoded L1 quotes, L2 levels and chart bars
+to the hub; WebSocket clients subscribe per channel ("l1", "l2", "chart")
+and symbol. Publishing never waits on a client:
+
+- The hub keeps the last published fields per key (symbol for L1, symbol +
+  book + side + level for L2, symbol + timeframe for charts) and forwards
+  only the fields that changed.
+- An L2 message carries the whole book of each symbol it mentions, so a
+  level of that symbol and book that is missing from it has left the book.
+  Its removal is published as an update with every level field null.
+- Each client has a bounded map of pending updates keyed the same way.
+  A new delta for a key that is still pending is merged into it, so a slow
+  client gets the latest value per key (conflation) instead of a backlog.
+- A separate task per client drains the map into one message per send. A
+  client whose map overflows is dropped; it resyncs from a snapshot when
+  it reconnects and subscribes again.
+
+Updates are sent as {"type": "updates", "updates": [...]}, each entry
+carrying its key fields (channel, symbol, book/side/level or
+timeframe/timestamp)
+plus the changed values. A new subscription first receives the full current
+state of its keys.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from axiom.mdata.records import ChartBar, L1Quote, L2Level
+
+__all__ = ["CHANNELS", "LiveClient", "LiveClientOverflow", "LiveHub", "live_hub"]
+
+CHANNELS = ("l1", "l2", "chart")
+
+_L1_FIELDS = tuple(f for f in L1Quote.__slots__ if f != "symbol")
+_L2_FIELDS = (
+    "price_level",
+    "size",
+    "order_count",
+    "market_maker_id",
+    "mic_id",
+    "quote_time",
+)
+_CHART_FIELDS = (
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+    "volume",
+    "trade_count",
+    "vwap",
+)
+
+Key = Tuple[Any, ...]
+
+
+class LiveClientOverflow(Exception):
+    """Raised by LiveClient.run when the client fell too far behind."""
+
+
+class LiveClient:
+    """One connected client: its subscriptions and pending updates."""
+
+    def __init__(
+        self,
+        send: Callable[[Any], Awaitable[None]],
+        *,
+        max_pending: int,
+    ) -> None:
+        self._send = send
+        self._max_pending = max_pending
+        self._pending: "OrderedDict[Key, Dict[str, Any]]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._overflowed = False
+        self.subscriptions: Dict[str, Set[str]] = {c: set() for c in CHANNELS}
+        self.sent_messages = 0
+        self.sent_updates = 0
+        self.conflated_updates = 0
+
+    def offer(self, key: Key, update: Dict[str, Any]) -> None:
+        """Queue an update without blocking; merges into a pending one."""
+        if self._overflowed:
+            return
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.update(update)
+            self.conflated_updates += 1
+        elif len(self._pending) >= self._max_pending:
+            self._overflowed = True
+            self._pending.clear()
+        else:
+            self._pending[key] = dict(update)
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        """Send pending updates as they arrive until cancelled."""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._overflowed:
+                raise LiveClientOverflow(
+                    f"More than {self._max_pending} pending updates"
+                )
+            if not self._pending:
+                continue
+            updates = list(self._pending.values())
+            self._pending.clear()
+            await self._send({"type": "updates", "updates": updates})
+            self.sent_messages += 1
+            self.sent_updates += len(updates)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+
+class LiveHub:
+    """
+    Fan-out hub, safe to publish to from the event loop thread:
+
+        hub = LiveHub()
+        client = hub.connect(websocket.send_json)
+        hub.subscribe(client, "l1", ["AAPL"])
+        asyncio.create_task(client.run())
+        hub.publish_l1(quotes)
+        hub.publish_l2("NASDAQ", levels)  # one book message
+    """
+
+    def __init__(
+        self,
+        *,
+        max_pending: int = 10_000,
+    ) -> None:
+        self._max_pending = max_pending
+        self._clients: Set[LiveClient] = set()
+        # channel -> symbol -> subscribed clients
+        self._subscribers: Dict[str, Dict[str, Set[LiveClient]]] = {
+            c: {} for c in CHANNELS
+        }
+        # state key -> last published update; (channel, symbol) -> state keys
+        self._state: Dict[Key, Dict[str, Any]] = {}
+        self._keys: Dict[Tuple[str, str], Set[Key]] = {}
+        self._published = 0
+
+    # ---------- Clients ----------
+    def connect(
+        self,
+        send: Callable[[Any], Awaitable[None]],
+        *,
+        max_pending: Optional[int] = None,
+    ) -> LiveClient:
+        client = LiveClient(send, max_pending=max_pending or self._max_pending)
+        self._clients.add(client)
+        return client
+
+    def disconnect(self, client: LiveClient) -> None:
+        self._clients.discard(client)
+        for channel, symbols in client.subscriptions.items():
+            index = self._subscribers[channel]
+            for symbol in symbols:
+                subs = index.get(symbol)
+                if subs is not None:
+                    subs.discard(client)
+                    if not subs:
+                        del index[symbol]
+            symbols.clear()
+
+    def subscribe(
+        self, client: LiveClient, channel: str, symbols: Union[str, Iterable[str]]
+    ) -> None:
+        """Subscribe client to symbols on channel and queue their current state."""
+        index = self._channel(channel)
+        for symbol in _symbol_set(symbols):
+            client.subscriptions[channel].add(symbol)
+            index.setdefault(symbol, set()).add(client)
+            for state_key in self._keys.get((channel, symbol), ()):
+                update = self._state[state_key]
+                client.offer(_pending_key(update), update)
+
+    def unsubscribe(
+        self, client: LiveClient, channel: str, symbols: Union[str, Iterable[str]]
+    ) -> None:
+        index = self._channel(channel)
+        for symbol in _symbol_set(symbols):
+            client.subscriptions[channel].discard(symbol)
+            subs = index.get(symbol)
+            if subs is not None:
+                subs.discard(client)
+                if not subs:
+                    del index[symbol]
+
+    # ---------- Publishing ----------
+    def publish_l1(self, quotes: Iterable[L1Quote]) -> None:
+        for q in quotes:
+            fields = {}
+            for name in _L1_FIELDS:
+                value = getattr(q, name)
+                if value is not None:
+                    fields[name] = value
+            self._publish("l1", q.symbol, ("l1", q.symbol), {}, fields)
+
+    def publish_l2(self, book: str, levels: Iterable[L2Level]) -> None:
+        """Publish one book message; levels it no longer has are removed."""
+        book = book.upper()
+        seen: Dict[str, Set[Key]] = {}
+        for lvl in levels:
+            header = {"book": book, "side": lvl.side, "level": lvl.level_index}
+            fields = {name: getattr(lvl, name) for name in _L2_FIELDS}
+            state_key = ("l2", lvl.symbol, book, lvl.side, lvl.level_index)
+            seen.setdefault(lvl.symbol, set()).add(state_key)
+            self._publish("l2", lvl.symbol, state_key, header, fields)
+        for symbol, current in seen.items():
+            stale = [
+                state_key
+                for state_key in self._keys.get(("l2", symbol), ())
+                if state_key[2] == book and state_key not in current
+            ]
+            for state_key in stale:
+                self._remove_level(symbol, state_key)
+
+    def publish_bars(self, bars: Iterable[ChartBar]) -> None:
+        for bar in bars:
+            # One state per timeframe; a new bar timestamp starts a new bar
+            header = {"timeframe": bar.timeframe, "timestamp": bar.timestamp}
+            fields = {name: getattr(bar, name) for name in _CHART_FIELDS}
+            state_key = ("chart", bar.symbol, bar.timeframe)
+            self._publish("chart", bar.symbol, state_key, header, fields)
+
+    def _publish(
+        self,
+        channel: str,
+        symbol: str,
+        state_key: Key,
+        header: Dict[str, Any],
+        fields: Dict[str, Any],
+    ) -> None:
+        self._published += 1
+        state = self._state.get(state_key)
+        if state is None or any(state.get(k) != v for k, v in header.items()):
+            state = {"channel": channel, "symbol": symbol, **header, **fields}
+            self._state[state_key] = state
+            self._keys.setdefault((channel, symbol), set()).add(state_key)
+            delta = fields
+        else:
+            delta = {k: v for k, v in fields.items() if state.get(k) != v}
+            if not delta:
+                return
+            state.update(delta)
+
+        subs = self._subscribers[channel].get(symbol)
+        if not subs:
+            return
+        update = {"channel": channel, "symbol": symbol, **header, **delta}
+        key = _pending_key(update)
+        for client in subs:
+            client.offer(key, update)
+
+    def _remove_level(self, symbol: str, state_key: Key) -> None:
+        state = self._state.pop(state_key)
+        keys = self._keys[("l2", symbol)]
+        keys.discard(state_key)
+        if not keys:
+            del self._keys[("l2", symbol)]
+
+        subs = self._subscribers["l2"].get(symbol)
+        if not subs:
+            return
+        update = {
+            "channel": "l2",
+            "symbol": symbol,
+            "book": state["book"],
+            "side": state["side"],
+            "level": state["level"],
+            **dict.fromkeys(_L2_FIELDS),
+        }
+        key = _pending_key(update)
+        for client in subs:
+            client.offer(key, update)
+
+    # ---------- Introspection ----------
+    def _channel(self, channel: str) -> Dict[str, Set[LiveClient]]:
+        index = self._subscribers.get(channel)
+        if index is None:
+            raise ValueError(f"Unknown channel {channel!r}; expected one of {CHANNELS}")
+        return index
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        clients: List[LiveClient] = list(self._clients)
+        return {
+            "clients": len(clients),
+            "subscriptions": {
+                channel: sum(len(subs) for subs in index.values())
+                for channel, index in self._subscribers.items()
+            },
+            "tracked_keys": len(self._state),
+            "published_updates": self._published,
+            "pending_updates": sum(c.pending for c in clients),
+            "conflated_updates": sum(c.conflated_updates for c in clients),
+        }
+
+
+def _symbol_set(symbols: Union[str, Iterable[str]]) -> Set[str]:
+    """Upper-cased symbols; a single string is one symbol, not its letters."""
+    if isinstance(symbols, str):
+        return {symbols.upper()}
+    try:
+        return {str(s).upper() for s in symbols}
+    except TypeError:
+        raise ValueError(
+            f"symbols must be a list of strings, got {type(symbols).__name__}"
+        ) from None
+
+
+def _pending_key(update: Dict[str, Any]) -> Key:
+    """Conflation key: the update's identity fields."""
+    channel = update["channel"]
+    if channel == "l2":
+        return (
+            channel,
+            update["symbol"],
+            update["book"],
+            update["side"],
+            update["level"],
+        )
+    if channel == "chart":
+        return (channel, update["symbol"], update["timeframe"], update["timestamp"])
+    return (channel, update["symbol"])
+
+
+# Process-wide hub: the streaming service publishes, the API's WebSocket serves
+live_hub = LiveHub()
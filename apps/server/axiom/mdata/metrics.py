@@ -0,0 +1,277 @@
+"""
+Microstructure metrics sampled from the in-memory order books.
+
+These used to be recomputed offline from level_two_quotes. BookMetricsSampler
+instead samples the consolidated books at a fixed cadence, computes the
+metrics of every symbol whose book changed since the previous pass with one
+set of NumPy array operations, and hands the rows to a callback (the
+streaming service's book metrics batcher).
+
+Per symbol, with b/a the best bid/ask and qb/qa their sizes:
+
+- imbalance = (qb - qa) / (qb + qa), in [-1, 1]
+- microprice = (a * qb + b * qa) / (qb + qa)
+- spread_ticks = (a - b) / tick, with a $0.01 tick, $0.0001 below $1
+- bid_depth / ask_depth: size resting within depth_bps of the mid
+- bid_added / bid_canceled / ask_added / ask_canceled: order flow estimated
+  from the change in size at each price since the symbol's previous sample.
+  Only prices inside both samples' visible depth count, so levels scrolling
+  in and out of the top depth are not taken for flow. Executions reduce
+  size too and are counted as cancels.
+
+A pass lays the books out as (side, symbol, level) matrices of keys (price
+* 10^4, negated for bids, so both sides sort best first) and sizes, with
+size 0 as padding. Only two-sided books produce a row.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from axiom.mdata.books import OrderBookStore, order_books
+from axiom.mdata.columns import PRICE_SCALE
+from axiom.mdata.records import BookMetric
+
+__all__ = ["BookMetricsSampler", "book_metrics"]
+
+_PAD = np.iinfo(np.int64).max
+_NO_KEY = np.iinfo(np.int64).min
+# Minimum price increments (Reg NMS), in scaled price units
+_TICK = 100
+_SUB_DOLLAR_TICK = 1
+
+
+def book_metrics(
+    keys: np.ndarray,
+    sizes: np.ndarray,
+    prev_keys: np.ndarray,
+    prev_sizes: np.ndarray,
+    has_prev: np.ndarray,
+    *,
+    depth_bps: float = 10.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Metrics for (2, symbols, depth) key/size matrices (bids first) and the
+    previous sample of each symbol; NaN where undefined. Prices are in
+    scaled units (price * 10^4).
+    """
+    valid = sizes > 0
+    bid = -keys[0, :, 0].astype(np.float64)
+    ask = keys[1, :, 0].astype(np.float64)
+    bid_size, ask_size = sizes[0, :, 0], sizes[1, :, 0]
+    two_sided = valid[0, :, 0] & valid[1, :, 0]
+    bid = np.where(two_sided, bid, np.nan)
+    ask = np.where(two_sided, ask, np.nan)
+
+    total = bid_size + ask_size
+    with np.errstate(invalid="ignore", divide="ignore"):
+        imbalance = (bid_size - ask_size) / total
+        microprice = (ask * bid_size + bid * ask_size) / total
+    mid = (bid + ask) / 2
+    tick = np.where(mid >= PRICE_SCALE, _TICK, _SUB_DOLLAR_TICK)
+    band = mid * depth_bps / 10_000
+
+    # Bid keys are negated prices: within band means -key >= mid - band
+    bid_near = valid[0] & (-keys[0] >= (mid - band)[:, None])
+    ask_near = valid[1] & (keys[1] <= (mid + band)[:, None])
+    bid_added, bid_canceled = _flow(keys[0], sizes[0], prev_keys[0], prev_sizes[0])
+    ask_added, ask_canceled = _flow(keys[1], sizes[1], prev_keys[1], prev_sizes[1])
+    return {
+        "two_sided": two_sided,
+        "mid_price": mid,
+        "microprice": microprice,
+        "spread_ticks": np.rint((ask - bid) / tick),
+        "imbalance": imbalance,
+        "bid_depth": np.where(bid_near, sizes[0], 0.0).sum(1),
+        "ask_depth": np.where(ask_near, sizes[1], 0.0).sum(1),
+        "bid_added": np.where(has_prev, bid_added, np.nan),
+        "bid_canceled": np.where(has_prev, bid_canceled, np.nan),
+        "ask_added": np.where(has_prev, ask_added, np.nan),
+        "ask_canceled": np.where(has_prev, ask_canceled, np.nan),
+    }
+
+
+def _flow(
+    keys: np.ndarray,
+    sizes: np.ndarray,
+    prev_keys: np.ndarray,
+    prev_sizes: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Size added and removed per symbol between two samples of one side."""
+    valid = sizes > 0
+    prev_valid = prev_sizes > 0
+    # (symbol, level, previous level): the same price in both samples
+    same = (
+        (keys[:, :, None] == prev_keys[:, None, :])
+        & valid[:, :, None]
+        & prev_valid[:, None, :]
+    )
+    prev_at = np.where(same, prev_sizes[:, None, :], 0.0).sum(2)
+    now_at = np.where(same, sizes[:, :, None], 0.0).sum(1)
+    # Worst visible price per sample; keys sort best first
+    worst = np.where(valid, keys, _NO_KEY).max(1)
+    prev_worst = np.where(prev_valid, prev_keys, _NO_KEY).max(1)
+    added = np.where(
+        valid & (keys <= prev_worst[:, None]), np.maximum(sizes - prev_at, 0.0), 0.0
+    ).sum(1)
+    canceled = np.where(
+        prev_valid & (prev_keys <= worst[:, None]),
+        np.maximum(prev_sizes - now_at, 0.0),
+        0.0,
+    ).sum(1)
+    return added, canceled
+
+
+class BookMetricsSampler:
+    """
+    Samples book metrics at a fixed cadence:
+
+        sampler = BookMetricsSampler(order_books, on_metrics=enqueue)
+        await sampler.start()
+        ...
+        await sampler.stop()
+
+    on_metrics receives the BookMetric rows of each pass; it is called from
+    the event loop and must not block.
+    """
+
+    def __init__(
+        self,
+        books: Optional[OrderBookStore] = None,
+        *,
+        on_metrics: Callable[[List[BookMetric]], Any],
+        interval: float = 1.0,
+        depth: int = 10,
+        depth_bps: float = 10.0,
+        name: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self._books = books if books is not None else order_books
+        self._on_metrics = on_metrics
+        self._interval = interval
+        self._depth = depth
+        self._depth_bps = depth_bps
+        self._name = name or "BookMetricsSampler"
+        self._logger = logger or logging.getLogger(self._name)
+        self._task: Optional[asyncio.Task] = None
+        self._version = 0
+        # symbol -> (keys, sizes) of its previous sample, each (2, depth)
+        self._previous: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._passes = 0
+        self._rows = 0
+        self._errors = 0
+        self._last_duration = 0.0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self._name)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def sample(self) -> List[BookMetric]:
+        """One pass over the books that changed since the previous one."""
+        started = time.perf_counter()
+        version = self._books.version
+        symbols = self._books.changed(self._version)
+        self._version = version
+        if not symbols:
+            return []
+
+        keys, sizes = self._matrices(symbols)
+        prev_keys = np.full_like(keys, _PAD)
+        prev_sizes = np.zeros_like(sizes)
+        has_prev = np.zeros(len(symbols), dtype=bool)
+        for i, symbol in enumerate(symbols):
+            previous = self._previous.get(symbol)
+            if previous is not None:
+                prev_keys[:, i], prev_sizes[:, i] = previous
+                has_prev[i] = True
+            self._previous[symbol] = (keys[:, i].copy(), sizes[:, i].copy())
+
+        metrics = book_metrics(
+            keys, sizes, prev_keys, prev_sizes, has_prev, depth_bps=self._depth_bps
+        )
+        rows = self._rows_of(symbols, metrics)
+        self._passes += 1
+        self._rows += len(rows)
+        self._last_duration = time.perf_counter() - started
+        return rows
+
+    def forget(self, symbol: str) -> None:
+        self._previous.pop(symbol.upper(), None)
+
+    def _matrices(self, symbols: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        keys = np.full((2, len(symbols), self._depth), _PAD, dtype=np.int64)
+        sizes = np.zeros((2, len(symbols), self._depth), dtype=np.float64)
+        for i, symbol in enumerate(symbols):
+            for side, levels in enumerate(self._books.levels(symbol, self._depth)):
+                if levels:
+                    side_keys, side_sizes, _counts = zip(*levels)
+                    keys[side, i, : len(levels)] = side_keys
+                    sizes[side, i, : len(levels)] = side_sizes
+        return keys, sizes
+
+    @staticmethod
+    def _rows_of(
+        symbols: Sequence[str], metrics: Dict[str, np.ndarray]
+    ) -> List[BookMetric]:
+        now = datetime.now(timezone.utc)
+        keep = np.flatnonzero(metrics["two_sided"])
+        scale = 1.0 / PRICE_SCALE
+        columns = [
+            (metrics["mid_price"][keep] * scale).tolist(),
+            (metrics["microprice"][keep] * scale).tolist(),
+        ] + [
+            metrics[name][keep].tolist()
+            for name in (
+                "spread_ticks",
+                "imbalance",
+                "bid_depth",
+                "ask_depth",
+                "bid_added",
+                "bid_canceled",
+                "ask_added",
+                "ask_canceled",
+            )
+        ]
+        return [
+            BookMetric(symbols[i], now, *values)
+            for i, *values in zip(keep.tolist(), *columns)
+        ]
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                rows = self.sample()
+                if rows:
+                    self._on_metrics(rows)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._errors += 1
+                self._logger.warning("Book metrics pass failed: %s", e)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self._interval,
+            "symbols": len(self._previous),
+            "passes": self._passes,
+            "rows": self._rows,
+            "last_pass_ms": round(self._last_duration * 1000, 3),
+            "errors": self._errors,
+        }
@@ -0,0 +1,287 @@
+"""
+Per-symbol persistence policies for level one quotes.
+
+Most L1 updates change nothing that matters for storage. L1PersistenceFilter
+sits in front of the L1 batchers and decides, per symbol, which updates are
+written:
+
+- latest: the newest state per flush window. Updates go to the coalescing
+  L1 batcher, which folds the updates of a symbol pending in one flush
+  window into a single row.
+- every_tick: every update, each as its own row
+- on_change: only when bid/ask/last price or bid/ask/last size moved by
+  more than a threshold since the last persisted quote
+- sample: the latest quote once per interval, on a fixed clock. Updates
+  only mark the symbol; a timer writes the current state of each marked
+  symbol at the end of every interval, so a symbol that goes quiet still
+  has its last state written.
+
+Policies are configured with a spec string: a default policy, then tiers of
+symbols with their own policy, separated by semicolons:
+
+    "on_change:0.01; SPY,QQQ=every_tick; AAPL,MSFT=sample:1"
+
+The default is latest. Rows of every_tick, on_change and sample are
+returned apart from latest updates, so they can bypass the coalescing
+batcher: folding them per flush window would drop the ticks, changes and
+samples those policies select.
+
+on_change takes optional price and size thresholds (on_change:<price>:<size>,
+default 0 = any change); sample takes the interval in seconds (default 1).
+
+The filter keeps the current merged state and the last persisted state per
+symbol, so each update costs O(1). start() runs the sample timer, which
+hands due samples to on_samples; stop() writes the samples still pending. Policies other than latest persist the
+merged state rather than the partial update, so every written row is a full
+quote.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from axiom.mdata.records import L1Quote, merge_non_null
+
+__all__ = ["L1PersistenceFilter", "PersistMode", "PersistPolicy"]
+
+_PRICE_FIELDS = ("bid_price", "ask_price", "last_price")
+_SIZE_FIELDS = ("bid_size", "ask_size", "last_size")
+
+
+class PersistMode(str, Enum):
+    LATEST = "latest"
+    EVERY_TICK = "every_tick"
+    ON_CHANGE = "on_change"
+    SAMPLE = "sample"
+
+
+@dataclass(frozen=True)
+class PersistPolicy:
+    mode: PersistMode = PersistMode.LATEST
+    price_threshold: float = 0.0
+    size_threshold: float = 0.0
+    interval: float = 1.0
+
+    @classmethod
+    def parse(cls, spec: str) -> PersistPolicy:
+        """
+        Parse "latest", "every_tick", "on_change[:price[:size]]" or
+        "sample[:seconds]".
+        """
+        name, *args = [part.strip() for part in spec.strip().split(":")]
+        try:
+            mode = PersistMode(name.lower())
+        except ValueError:
+            raise ValueError(f"Unknown L1 persistence policy: {spec!r}") from None
+        values = [float(a) for a in args]
+        if mode in (PersistMode.LATEST, PersistMode.EVERY_TICK) and not values:
+            return cls(mode)
+        if mode is PersistMode.ON_CHANGE and len(values) <= 2:
+            return cls(mode, *values)
+        if mode is PersistMode.SAMPLE and len(values) <= 1:
+            if values and values[0] <= 0:
+                raise ValueError(f"Sample interval must be positive: {spec!r}")
+            return cls(mode, interval=values[0] if values else 1.0)
+        raise ValueError(f"Invalid arguments for L1 persistence policy: {spec!r}")
+
+
+class L1PersistenceFilter:
+    """
+    Drops L1 updates a symbol's policy does not persist:
+
+        persist = L1PersistenceFilter.from_spec(
+            "on_change; SPY=every_tick; AAPL=sample:1",
+            on_samples=batcher.extend_nowait,
+        )
+        await persist.start()  # sample timer
+        latest, rows = persist.filter(quotes)
+        coalescing_batcher.extend_nowait(latest)
+        batcher.extend_nowait(rows)
+    """
+
+    def __init__(
+        self,
+        default: Optional[PersistPolicy] = None,
+        overrides: Optional[Dict[str, PersistPolicy]] = None,
+        *,
+        on_samples: Optional[Callable[[List[L1Quote]], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        name: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self._default = default or PersistPolicy()
+        self._overrides = {s.upper(): p for s, p in (overrides or {}).items()}
+        self._on_samples = on_samples
+        self._clock = clock
+        self._name = name or "L1PersistenceFilter"
+        self._logger = logger or logging.getLogger(self._name)
+        self._task: Optional[asyncio.Task] = None
+        # The timer ticks at the shortest sample interval configured
+        intervals = [
+            p.interval
+            for p in (self._default, *self._overrides.values())
+            if p.mode is PersistMode.SAMPLE
+        ]
+        self._tick = min(intervals) if intervals else None
+        # Sampled symbols updated since their last sample
+        self._dirty: Dict[str, None] = {}
+        # symbol -> merged current quote / last persisted quote / time persisted
+        self._current: Dict[str, L1Quote] = {}
+        self._persisted: Dict[str, L1Quote] = {}
+        self._persisted_at: Dict[str, float] = {}
+        self._passed = 0
+        self._suppressed = 0
+        self._errors = 0
+
+    async def start(self) -> None:
+        """Run the sample timer, if any symbol is sampled."""
+        if self._task is None and self._tick is not None:
+            self._task = asyncio.create_task(self._run(), name=self._name)
+
+    async def stop(self) -> None:
+        """Stop the timer and hand over the samples still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        rows = self.samples(final=True)
+        if rows and self._on_samples is not None:
+            self._on_samples(rows)
+
+    @classmethod
+    def from_spec(cls, spec: str, **kwargs: Any) -> L1PersistenceFilter:
+        default = PersistPolicy()
+        overrides: Dict[str, PersistPolicy] = {}
+        for entry in filter(None, (e.strip() for e in spec.split(";"))):
+            if "=" in entry:
+                symbols, policy_spec = entry.split("=", 1)
+                policy = PersistPolicy.parse(policy_spec)
+                for symbol in filter(None, (s.strip() for s in symbols.split(","))):
+                    overrides[symbol.upper()] = policy
+            else:
+                default = PersistPolicy.parse(entry)
+        return cls(default, overrides, **kwargs)
+
+    def policy_for(self, symbol: str) -> PersistPolicy:
+        return self._overrides.get(symbol, self._default)
+
+    def filter(self, quotes: List[L1Quote]) -> Tuple[List[L1Quote], List[L1Quote]]:
+        """
+        The quotes to persist, in order, as (latest, rows): updates of latest
+        symbols, which may be folded per symbol before they are written, and
+        full quotes that must each be written as a row.
+        """
+        latest: List[L1Quote] = []
+        rows: List[L1Quote] = []
+        for quote in quotes:
+            symbol = quote.symbol
+            policy = self._overrides.get(symbol, self._default)
+            if policy.mode is PersistMode.LATEST:
+                latest.append(quote)
+                continue
+
+            previous = self._current.get(symbol)
+            current = quote if previous is None else merge_non_null(previous, quote)
+            self._current[symbol] = current
+
+            if policy.mode is PersistMode.ON_CHANGE:
+                last = self._persisted.get(symbol)
+                if last is not None and not _changed(last, current, policy):
+                    self._suppressed += 1
+                    continue
+                self._persisted[symbol] = current
+            elif policy.mode is PersistMode.SAMPLE:
+                # Written by the timer, see samples()
+                if symbol in self._dirty:
+                    self._suppressed += 1
+                self._dirty[symbol] = None
+                continue
+            rows.append(current)
+        self._passed += len(latest) + len(rows)
+        return latest, rows
+
+    def samples(self, *, final: bool = False) -> List[L1Quote]:
+        """
+        The current quote of each sampled symbol updated since its last
+        sample, once the interval it was last sampled in is over. Intervals
+        are aligned to the clock, not to the updates. final takes every
+        pending sample regardless.
+        """
+        if not self._dirty:
+            return []
+        now = self._clock()
+        rows: List[L1Quote] = []
+        for symbol in list(self._dirty):
+            interval = self.policy_for(symbol).interval
+            last_at = self._persisted_at.get(symbol)
+            if (
+                not final
+                and last_at is not None
+                and math.floor(now / interval) == math.floor(last_at / interval)
+            ):
+                continue
+            del self._dirty[symbol]
+            self._persisted_at[symbol] = now
+            rows.append(self._current[symbol])
+        self._passed += len(rows)
+        return rows
+
+    def forget(self, symbol: str) -> None:
+        """Drop the state kept for symbol (e.g. after unsubscribing)."""
+        symbol = symbol.upper()
+        self._current.pop(symbol, None)
+        self._persisted.pop(symbol, None)
+        self._persisted_at.pop(symbol, None)
+        self._dirty.pop(symbol, None)
+
+    async def _run(self) -> None:
+        tick = self._tick
+        while True:
+            # Wake at the clock's interval boundaries
+            await asyncio.sleep(tick - self._clock() % tick)
+            try:
+                rows = self.samples()
+                if rows and self._on_samples is not None:
+                    self._on_samples(rows)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._errors += 1
+                self._logger.warning("L1 sample pass failed: %s", e)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "default_policy": self._default.mode.value,
+            "symbol_policies": len(self._overrides),
+            "tracked_symbols": len(self._current),
+            "persisted_updates": self._passed,
+            "suppressed_updates": self._suppressed,
+            "pending_samples": len(self._dirty),
+            "errors": self._errors,
+        }
+
+
+def _changed(last: L1Quote, current: L1Quote, policy: PersistPolicy) -> bool:
+    for names, threshold in (
+        (_PRICE_FIELDS, policy.price_threshold),
+        (_SIZE_FIELDS, policy.size_threshold),
+    ):
+        for name in names:
+            a = getattr(last, name)
+            b = getattr(current, name)
+            if a is None or b is None:
+                if a is not b:
+                    return True
+            elif abs(b - a) > threshold:
+                return True
+    return False
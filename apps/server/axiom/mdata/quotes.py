@@ -0,0 +1,98 @@
+"""
+In-memory latest level one quote per symbol.
+
+The streaming service folds every L1 update into the store, so the current
+quote for a symbol is a dict lookup instead of a "latest row per symbol"
+query over the partitioned level_one_quotes table.
+
+Every update takes a number from a store-wide sequence. The ETag for a set
+of symbols is derived from the highest sequence among them (plus a
+per-process epoch, so a restart never reuses a tag), which makes it O(k) to
+compute and lets pollers revalidate with If-None-Match without building the
+response. Symbols without a quote count as the sequence number of the last
+clear(), so clearing the store changes every tag.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from axiom.mdata.records import L1Quote, merge_non_null
+
+__all__ = ["LatestQuoteStore", "latest_quotes"]
+
+
+class LatestQuoteStore:
+    def __init__(self) -> None:
+        self._quotes: Dict[str, L1Quote] = {}
+        self._seq: Dict[str, int] = {}
+        self._updated_at: Dict[str, float] = {}
+        self._version = 0
+        # Sequence number of the last clear(), for symbols without a quote
+        self._cleared = 0
+        self._epoch = uuid.uuid4().hex[:8]
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._quotes
+
+    def update(self, quotes: Iterable[L1Quote]) -> None:
+        """Fold quote updates (possibly partial) into the latest state."""
+        now = time.time()
+        for quote in quotes:
+            symbol = quote.symbol
+            previous = self._quotes.get(symbol)
+            self._quotes[symbol] = (
+                quote if previous is None else merge_non_null(previous, quote)
+            )
+            self._version += 1
+            self._seq[symbol] = self._version
+            self._updated_at[symbol] = now
+
+    def get(self, symbol: str) -> Optional[L1Quote]:
+        return self._quotes.get(symbol.upper())
+
+    def etag(self, symbols: Optional[Sequence[str]] = None) -> str:
+        """Weak ETag for the given symbols (all symbols if None)."""
+        if symbols is None:
+            version = self._version
+        else:
+            cleared = self._cleared
+            version = max((self._seq.get(s, cleared) for s in symbols), default=cleared)
+        return f'W/"{self._epoch}-{version}"'
+
+    def snapshot(
+        self, symbols: Optional[Sequence[str]] = None
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """
+        Latest quotes as plain dicts keyed by symbol, plus the requested
+        symbols with no quote yet. All symbols if symbols is None.
+        """
+        if symbols is None:
+            symbols = sorted(self._quotes)
+        quotes: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for symbol in symbols:
+            quote = self._quotes.get(symbol)
+            if quote is None:
+                missing.append(symbol)
+                continue
+            row = {name: getattr(quote, name) for name in quote.__slots__}
+            row["updated_at"] = self._updated_at[symbol]
+            quotes[symbol] = row
+        return quotes, missing
+
+    def clear(self) -> None:
+        self._quotes.clear()
+        self._seq.clear()
+        self._updated_at.clear()
+        self._version += 1
+        self._cleared = self._version
+
+
+# Process-wide store: the streaming service writes it, the API reads it
+latest_quotes = LatestQuoteStore()
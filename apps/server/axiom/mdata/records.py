@@ -0,0 +1,89 @@
+"""
+Compact market data records produced by the stream decoders and consumed by
+the batchers' flush functions. Field names match the database columns they
+end up in; prices and sizes are still raw floats from the feed.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional, TypeVar
+
+__all__ = ["BookMetric", "ChartBar", "L1Quote", "L2Level", "merge_non_null"]
+
+R = TypeVar("R")
+
+
+@dataclass(slots=True)
+class L1Quote:
+    symbol: str
+    bid_price: Optional[float] = None
+    ask_price: Optional[float] = None
+    last_price: Optional[float] = None
+    bid_size: Optional[float] = None
+    ask_size: Optional[float] = None
+    last_size: Optional[float] = None
+    mark_price: Optional[float] = None
+    daily_high: Optional[float] = None
+    daily_low: Optional[float] = None
+    daily_open: Optional[float] = None
+    prev_close: Optional[float] = None
+    daily_volume: Optional[float] = None
+    quote_time: Any = None
+    trade_time: Any = None
+    is_realtime: bool = True
+
+
+@dataclass(slots=True)
+class L2Level:
+    symbol: str
+    side: Optional[str] = None
+    price_level: Optional[float] = None
+    size: Optional[float] = None
+    order_count: int = 0
+    level_index: int = 0
+    market_maker_id: Optional[str] = None
+    mic_id: Optional[str] = None
+    quote_time: Any = None
+
+
+@dataclass(slots=True)
+class ChartBar:
+    symbol: str
+    open_price: Optional[float] = None
+    high_price: Optional[float] = None
+    low_price: Optional[float] = None
+    close_price: Optional[float] = None
+    volume: Optional[float] = None
+    trade_count: Optional[float] = None
+    vwap: Optional[float] = None
+    timestamp: Any = None
+    timeframe: Any = "1MIN"
+
+
+@dataclass(slots=True)
+class BookMetric:
+    symbol: str
+    timestamp: Any = None
+    mid_price: Optional[float] = None
+    microprice: Optional[float] = None
+    spread_ticks: Optional[float] = None
+    imbalance: Optional[float] = None
+    bid_depth: Optional[float] = None
+    ask_depth: Optional[float] = None
+    bid_added: Optional[float] = None
+    bid_canceled: Optional[float] = None
+    ask_added: Optional[float] = None
+    ask_canceled: Optional[float] = None
+
+
+def merge_non_null(previous: R, update: R) -> R:
+    """
+    Return a copy of previous with every field that is not None in update
+    overlaid, e.g. to fold a partial L1 update into the pending snapshot.
+    """
+    values = []
+    for name in previous.__slots__:
+        value = getattr(update, name)
+        values.append(getattr(previous, name) if value is None else value)
+    return previous.__class__(*values)
@@ -0,0 +1,318 @@
+"""
+Symbol -> security_id resolution for the flush path.
+
+SecurityResolver keeps every active security's id in memory so flushes
+resolve symbols with dict lookups and never wait on the database:
+
+- start() restores the map from an on-disk snapshot (if any) for a fast
+  cold start, then bulk-loads all active securities and rewrites the
+  snapshot.
+- A background loop applies incremental changes: rows whose updated_at is
+  past the last seen value are added, or dropped if deactivated. All
+  active securities are reloaded periodically to catch deletions.
+- A miss wakes the loop, which looks the symbol up right away; a symbol
+  still unknown is only cached as missing for negative_ttl seconds, so a
+  security added later (e.g. by scripts/securities.py) is picked up
+  without a restart. Flushes use lookup(), which queries such misses
+  before returning, so rows of a new security are not dropped while the
+  map catches up.
+
+The resolver also keeps each security's exchange timezone, for session
+boundaries. The snapshot is msgpack: the watermark plus (symbol, 16-byte
+id, timezone) triples.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import msgspec
+from sqlalchemy import select
+
+from axiom.db.client import AsyncSessionLocal
+from axiom.db.models import Exchange, Security
+
+__all__ = ["SecurityResolver"]
+
+# updated_at is stamped by each writer's clock; re-read this much history
+# on incremental refreshes so clock skew between hosts cannot hide a row
+_WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+class _Snapshot(msgspec.Struct):
+    watermark: Optional[datetime]
+    securities: List[tuple[str, bytes, Optional[str]]]
+
+
+class SecurityResolver:
+    """
+    In-memory symbol -> security_id map, kept fresh in the background:
+
+        resolver = SecurityResolver(snapshot_path="data/securities.snapshot")
+        await resolver.start()
+        ids = resolver.resolve(["AAPL", "MSFT"])  # no I/O
+        ids = await resolver.lookup(["AAPL", "NEWCO"])  # queries misses
+        await resolver.stop()
+    """
+
+    def __init__(
+        self,
+        *,
+        snapshot_path: Optional[str] = None,
+        refresh_interval: float = 30.0,
+        full_refresh_interval: float = 3600.0,
+        negative_ttl: float = 60.0,
+        session_factory: Callable[[], Any] = AsyncSessionLocal,
+        name: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._snapshot_path = snapshot_path
+        self._refresh_interval = refresh_interval
+        self._full_refresh_interval = full_refresh_interval
+        self._negative_ttl = negative_ttl
+        self._session_factory = session_factory
+        self._name = name or "SecurityResolver"
+        self._logger = logger or logging.getLogger(self._name)
+        self._clock = clock
+        self._ids: Dict[str, uuid.UUID] = {}
+        # symbol -> IANA timezone of its exchange
+        self._timezones: Dict[str, Optional[str]] = {}
+        # symbol -> clock time until which it is known to be missing
+        self._missing: Dict[str, float] = {}
+        self._lookups: Set[str] = set()
+        self._watermark: Optional[datetime] = None
+        self._last_full_refresh = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._errors = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    async def start(self) -> None:
+        """Load the snapshot and all active securities; idempotent."""
+        if self._task is not None:
+            return
+        self._load_snapshot()
+        try:
+            await self.refresh(full=True)
+        except Exception as e:
+            # Keep going with the snapshot; the loop retries
+            self._errors += 1
+            self._logger.warning("Initial security load failed: %s", e)
+        self._task = asyncio.create_task(self._run(), name=self._name)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def resolve(self, symbols: Iterable[str]) -> Dict[str, Optional[uuid.UUID]]:
+        """Security ids for symbols (None if unknown), without I/O."""
+        out: Dict[str, Optional[uuid.UUID]] = {}
+        now: Optional[float] = None
+        for symbol in symbols:
+            sec_id = self._ids.get(symbol)
+            out[symbol] = sec_id
+            if sec_id is not None:
+                self._hits += 1
+                continue
+            self._misses += 1
+            if now is None:
+                now = self._clock()
+            if self._missing.get(symbol, 0.0) <= now:
+                self._lookups.add(symbol)
+        if self._lookups:
+            self._wakeup.set()
+        return out
+
+    async def lookup(self, symbols: Iterable[str]) -> Dict[str, Optional[uuid.UUID]]:
+        """
+        Like resolve(), but symbols it misses (and that are not cached as
+        missing) are queried right away instead of by the background loop.
+        """
+        out = self.resolve(symbols)
+        pending = [
+            s for s, sec_id in out.items() if sec_id is None and s in self._lookups
+        ]
+        if not pending:
+            return out
+        self._lookups.difference_update(pending)
+        try:
+            async with self._session_factory() as db:
+                rows = (
+                    await db.execute(self._query().where(Security.symbol.in_(pending)))
+                ).all()
+        except Exception as e:
+            # The loop retries; this batch goes without them
+            self._lookups.update(pending)
+            self._errors += 1
+            self._logger.warning("Security lookup failed: %s", e)
+            return out
+        changed = self._apply(rows)
+        self._expire_missing(pending)
+        if changed:
+            await asyncio.to_thread(self._save_snapshot)
+        for symbol in pending:
+            out[symbol] = self._ids.get(symbol)
+        return out
+
+    def timezone(self, symbol: str) -> Optional[str]:
+        """Timezone of symbol's exchange (e.g. "America/New_York"), if known."""
+        return self._timezones.get(symbol)
+
+    async def refresh(self, *, full: bool = False) -> None:
+        """Apply changed securities (all active ones if full) and lookups."""
+        lookups = list(self._lookups)
+        self._lookups.clear()
+        try:
+            async with self._session_factory() as db:
+                query = self._query()
+                full = full or self._watermark is None
+                if full:
+                    rows = (await db.execute(query.where(Security.is_active))).all()
+                else:
+                    since = self._watermark - _WATERMARK_OVERLAP
+                    rows = (
+                        await db.execute(query.where(Security.updated_at > since))
+                    ).all()
+                if lookups:
+                    rows += (
+                        await db.execute(query.where(Security.symbol.in_(lookups)))
+                    ).all()
+        except BaseException:
+            self._lookups.update(lookups)
+            raise
+
+        if full:
+            self._ids = {}
+            self._timezones = {}
+            self._last_full_refresh = self._clock()
+        changed = self._apply(rows) or full
+        self._expire_missing(lookups)
+        self._refreshes += 1
+        if changed:
+            await asyncio.to_thread(self._save_snapshot)
+
+    @staticmethod
+    def _query() -> Any:
+        return select(
+            Security.symbol,
+            Security.id,
+            Security.is_active,
+            Security.updated_at,
+            Exchange.timezone,
+        ).join(Exchange, Security.exchange_id == Exchange.id)
+
+    def _apply(self, rows: Iterable[Any]) -> bool:
+        """Fold security rows into the map; True if it changed."""
+        changed = False
+        for symbol, sec_id, is_active, updated_at, tz in rows:
+            if is_active:
+                if self._ids.get(symbol) != sec_id or self._timezones.get(symbol) != tz:
+                    self._ids[symbol] = sec_id
+                    self._timezones[symbol] = tz
+                    changed = True
+                self._missing.pop(symbol, None)
+            elif self._ids.pop(symbol, None) is not None:
+                self._timezones.pop(symbol, None)
+                changed = True
+            if updated_at is not None and (
+                self._watermark is None or updated_at > self._watermark
+            ):
+                self._watermark = updated_at
+        return changed
+
+    def _expire_missing(self, lookups: Iterable[str]) -> None:
+        """Drop expired negative entries; cache looked-up symbols still unknown."""
+        now = self._clock()
+        self._missing = {s: t for s, t in self._missing.items() if t > now}
+        expires = now + self._negative_ttl
+        for symbol in lookups:
+            if symbol not in self._ids:
+                self._missing[symbol] = expires
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            full = (
+                self._clock() - self._last_full_refresh >= self._full_refresh_interval
+            )
+            try:
+                await self.refresh(full=full)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._errors += 1
+                self._logger.warning("Security refresh failed: %s", e)
+                await asyncio.sleep(self._refresh_interval)
+
+    # ---------- Snapshot ----------
+    def _load_snapshot(self) -> None:
+        if not self._snapshot_path:
+            return
+        try:
+            with open(self._snapshot_path, "rb") as f:
+                snapshot = msgspec.msgpack.decode(f.read(), type=_Snapshot)
+        except FileNotFoundError:
+            return
+        except (OSError, msgspec.DecodeError, msgspec.ValidationError) as e:
+            self._logger.warning(
+                "Ignoring unreadable security snapshot %s: %s", self._snapshot_path, e
+            )
+            return
+        self._ids = {
+            symbol: uuid.UUID(bytes=raw) for symbol, raw, _ in snapshot.securities
+        }
+        self._timezones = {symbol: tz for symbol, _, tz in snapshot.securities}
+        self._watermark = snapshot.watermark
+        self._logger.info("Loaded %d securities from snapshot", len(self._ids))
+
+    def _save_snapshot(self) -> None:
+        if not self._snapshot_path:
+            return
+        snapshot = _Snapshot(
+            watermark=self._watermark,
+            securities=[
+                (s, i.bytes, self._timezones.get(s)) for s, i in self._ids.items()
+            ],
+        )
+        try:
+            os.makedirs(os.path.dirname(self._snapshot_path) or ".", exist_ok=True)
+            tmp = self._snapshot_path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(msgspec.msgpack.encode(snapshot))
+            os.replace(tmp, self._snapshot_path)
+        except OSError as e:
+            self._logger.warning("Could not write security snapshot: %s", e)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "securities": len(self._ids),
+            "negative_cached": len(self._missing),
+            "pending_lookups": len(self._lookups),
+            "hits": self._hits,
+            "misses": self._misses,
+            "refreshes": self._refreshes,
+            "errors": self._errors,
+            "watermark": self._watermark.isoformat() if self._watermark else None,
+        }
@@ -0,0 +1,278 @@
+"""
+Compact L2 storage: one row per book side and update, as packed arrays.
+
+level_two_quotes stores one wide row per level (UUID, constraints, unique
+index), so a 10 level two-sided book costs 20 rows per update.
+level_two_snapshots stores one row per (symbol, book, side, update) with
+bigint[] prices (scaled by 10^4), sizes and order counts, best price first:
+
+- A keyframe holds the whole side. One is written for the first update of
+  a side, then every keyframe_interval seconds or max_deltas deltas, and
+  whenever a delta would not be smaller than the side itself.
+- A delta holds only the levels whose size or order count changed, with
+  size 0 (and count 0) for levels that left the book. Updates that change
+  nothing write no row.
+
+The book at time T is the latest keyframe at or before T with the deltas
+after it applied in order (load_book). L2SnapshotEncoder diffs the
+in-memory OrderBooks (axiom.mdata.books) the streaming service maintains.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from axiom.db.models.level_two_snapshot import LevelTwoSnapshot
+from axiom.mdata.books import OrderBook
+from axiom.mdata.columns import PRICE_SCALE
+
+__all__ = ["L2Snapshot", "L2SnapshotEncoder", "apply_snapshots", "load_book"]
+
+# Level key (scaled price) -> (size, order count)
+SideLevels = Dict[int, Tuple[int, int]]
+
+
+@dataclass(slots=True)
+class L2Snapshot:
+    symbol: str
+    book: str
+    side: str
+    timestamp: datetime
+    is_keyframe: bool
+    prices: List[int] = field(default_factory=list)
+    sizes: List[int] = field(default_factory=list)
+    order_counts: List[int] = field(default_factory=list)
+
+
+class _SideState:
+    __slots__ = ("levels", "timestamp", "keyframe_at", "deltas")
+
+    def __init__(self) -> None:
+        self.levels: SideLevels = {}
+        self.timestamp: Optional[datetime] = None
+        self.keyframe_at = 0.0
+        self.deltas = 0
+
+
+class L2SnapshotEncoder:
+    """
+    Turns book updates into keyframe/delta rows:
+
+        encoder = L2SnapshotEncoder()
+        rows = encoder.encode(order_books.get("AAPL", "NASDAQ"))
+    """
+
+    def __init__(
+        self,
+        *,
+        keyframe_interval: float = 60.0,
+        max_deltas: int = 120,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._keyframe_interval = keyframe_interval
+        self._max_deltas = max_deltas
+        self._clock = clock
+        self._sides: Dict[Tuple[str, str, str], _SideState] = {}
+        self._keyframes = 0
+        self._deltas = 0
+        self._levels = 0
+        self._unchanged = 0
+
+    def encode(self, order_book: OrderBook) -> List[L2Snapshot]:
+        """Rows for the sides of order_book that changed since last time."""
+        now = self._clock()
+        timestamp = datetime.fromtimestamp(now, tz=timezone.utc)
+        rows = []
+        for side, book_side, sign in (
+            ("BID", order_book.bids, -1),
+            ("ASK", order_book.asks, 1),
+        ):
+            levels: SideLevels = {
+                sign * key: (int(size), count)
+                for key, size, count in book_side.iter_levels()
+            }
+            key = (order_book.symbol, order_book.book, side)
+            row = self._encode_side(key, levels, now, timestamp, sign)
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    def forget(self, symbol: str, book: Optional[str] = None) -> None:
+        """
+        Drop symbol's state; its next update is written as a keyframe. Call
+        it when rows of the book could not be stored, since the deltas after
+        them would not apply to what the table holds.
+        """
+        symbol = symbol.upper()
+        for key in [k for k in self._sides if k[0] == symbol]:
+            if book is None or key[1] == book.upper():
+                del self._sides[key]
+
+    def _encode_side(
+        self,
+        key: Tuple[str, str, str],
+        levels: SideLevels,
+        now: float,
+        timestamp: datetime,
+        sign: int,
+    ) -> Optional[L2Snapshot]:
+        state = self._sides.get(key)
+        if state is None:
+            state = self._sides[key] = _SideState()
+        previous = state.levels
+        changed: SideLevels = {
+            price: level
+            for price, level in levels.items()
+            if previous.get(price) != level
+        }
+        for price in previous.keys() - levels.keys():
+            changed[price] = (0, 0)
+        keyframe = (
+            state.timestamp is None
+            or now - state.keyframe_at >= self._keyframe_interval
+            or state.deltas >= self._max_deltas
+            or (changed and len(changed) >= len(levels))
+        )
+        if not changed and not keyframe:
+            self._unchanged += 1
+            return None
+
+        # Rows of a side are keyed by timestamp; keep them strictly increasing
+        if state.timestamp is not None and timestamp <= state.timestamp:
+            timestamp = state.timestamp + timedelta(microseconds=1)
+        state.timestamp = timestamp
+        state.levels = levels
+        if keyframe:
+            state.keyframe_at = now
+            state.deltas = 0
+            self._keyframes += 1
+            written = levels
+        else:
+            state.deltas += 1
+            self._deltas += 1
+            written = changed
+        self._levels += len(written)
+
+        # Best price first: ascending asks, descending bids
+        prices = sorted(written, key=lambda price: sign * price)
+        symbol, book, side = key
+        return L2Snapshot(
+            symbol,
+            book,
+            side,
+            timestamp,
+            keyframe,
+            prices,
+            [written[p][0] for p in prices],
+            [written[p][1] for p in prices],
+        )
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sides": len(self._sides),
+            "keyframes": self._keyframes,
+            "deltas": self._deltas,
+            "levels_written": self._levels,
+            "unchanged_updates": self._unchanged,
+        }
+
+
+def apply_snapshots(
+    rows: Iterable[Tuple[str, str, bool, List[int], List[int], List[int]]],
+) -> Dict[str, Dict[str, SideLevels]]:
+    """
+    Fold (book, side, is_keyframe, prices, sizes, order_counts) rows, in
+    timestamp order, into {book: {side: {price: (size, order_count)}}}.
+    Deltas before a side's first keyframe are ignored.
+    """
+    books: Dict[str, Dict[str, SideLevels]] = {}
+    for book, side, is_keyframe, prices, sizes, counts in rows:
+        sides = books.setdefault(book, {})
+        if is_keyframe:
+            sides[side] = dict(zip(prices, zip(sizes, counts)))
+            continue
+        levels = sides.get(side)
+        if levels is None:
+            continue
+        for price, size, count in zip(prices, sizes, counts):
+            if size > 0:
+                levels[price] = (size, count)
+            else:
+                levels.pop(price, None)
+    return books
+
+
+async def load_book(
+    db: AsyncSession,
+    security_id: UUID,
+    at: datetime,
+    *,
+    book: Optional[str] = None,
+    depth: Optional[int] = None,
+    lookback: timedelta = timedelta(days=1),
+) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """
+    The book(s) of a security as of at, rebuilt from level_two_snapshots:
+    {book: {"bids": [...], "asks": [...]}} with levels best price first.
+    Only keyframes within lookback of at are considered.
+    """
+    s = LevelTwoSnapshot
+    k = aliased(LevelTwoSnapshot)
+    since = at - lookback
+    keyframe_at = (
+        select(func.max(k.timestamp))
+        .where(
+            k.security_id == s.security_id,
+            k.book == s.book,
+            k.side == s.side,
+            k.is_keyframe,
+            k.timestamp <= at,
+            k.timestamp >= since,
+        )
+        .correlate(s)
+        .scalar_subquery()
+    )
+    query = select(
+        s.book, s.side, s.is_keyframe, s.prices, s.sizes, s.order_counts
+    ).where(
+        s.security_id == security_id,
+        s.timestamp <= at,
+        s.timestamp >= since,
+        s.timestamp >= keyframe_at,
+    )
+    if book is not None:
+        query = query.where(s.book == book.upper())
+    query = query.order_by(s.book, s.side, s.timestamp)
+
+    result = await db.execute(query)
+    books = apply_snapshots(tuple(row) for row in result)
+    return {
+        name: {
+            "bids": _levels(sides.get("BID", {}), depth, reverse=True),
+            "asks": _levels(sides.get("ASK", {}), depth, reverse=False),
+        }
+        for name, sides in books.items()
+    }
+
+
+def _levels(
+    levels: SideLevels, depth: Optional[int], *, reverse: bool
+) -> List[Dict[str, Any]]:
+    prices = sorted(levels, reverse=reverse)[:depth]
+    return [
+        {
+            "price": price / PRICE_SCALE,
+            "size": levels[price][0],
+            "order_count": levels[price][1],
+        }
+        for price in prices
+    ]
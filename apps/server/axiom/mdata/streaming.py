@@ -1,28 +1,214 @@
 from __future__ import annotations
 
 import asyncio
+import os
+import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Union
 
+import asyncpg
+import numpy as np
+from sqlalchemy import exc as sa_exc
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from axiom.db.client import AsyncSessionLocal
-from axiom.db.models import (
-    Chart,
-    InstrumentType,
-    LevelOne,
-    LevelTwo,
-    OrderSide,
-    Security,
-)
+from axiom.db.bulk import copy_records, upsert_records
+from axiom.db.client import AsyncSessionLocal, engine
+from axiom.db.models import InstrumentType, OrderSide
 from axiom.db.models.enums import Timeframe
-from axiom.lib.beque import Beque
+from axiom.db.partitions import PartitionManager
+from axiom.env import env
+from axiom.lib.beque import Beque, CoalescingBeque, OverflowPolicy
+from axiom.lib.deadletter import DeadLetterFile
+from axiom.lib.journal import SpillJournal
+from axiom.lib.scheduler import BequeScheduler
 from axiom.mdata.auth import SchwabAuthService
+from axiom.mdata.bars import BarAggregator
+from axiom.mdata.books import OrderBookStore, order_books
+from axiom.mdata.columns import Column, ColumnBatch
+from axiom.mdata.decoders import book_levels, chart_decoder, l1_decoder, l2_decoder
+from axiom.mdata.distribution import LivePublisher
+from axiom.mdata.frames import FrameDecodeError, FrameDecoder
+from axiom.mdata.live import LiveHub, live_hub
+from axiom.mdata.metrics import BookMetricsSampler
+from axiom.mdata.persistence import L1PersistenceFilter
+from axiom.mdata.quotes import LatestQuoteStore, latest_quotes
+from axiom.mdata.records import (
+    BookMetric,
+    ChartBar,
+    L1Quote,
+    L2Level,
+    merge_non_null,
+)
+from axiom.mdata.resolver import SecurityResolver
+from axiom.mdata.snapshots import L2Snapshot, L2SnapshotEncoder
 from axiom.mdata.subscriptions import SubscriptionService
+from axiom.mdata.ticks import TickBarAggregator
+
+# Flush slots shared by the batchers. The engine's default pool holds 5
+# connections, which leaves one for API requests.
+_FLUSH_CONNECTIONS = 4
+
+# Column order of the tuples written by the COPY-based flush consumers
+_L1_COPY_COLUMNS = (
+    "id",
+    "security_id",
+    "timestamp",
+    "instrument_type",
+    "bid_price",
+    "bid_size",
+    "ask_price",
+    "ask_size",
+    "last_price",
+    "last_size",
+    "mark_price",
+    "daily_high",
+    "daily_low",
+    "daily_open",
+    "prev_close",
+    "daily_volume",
+    "quote_time",
+    "trade_time",
+    "is_realtime",
+    "created_at",
+)
+_L2_COPY_COLUMNS = (
+    "id",
+    "security_id",
+    "timestamp",
+    "instrument_type",
+    "side",
+    "price_level",
+    "size",
+    "order_count",
+    "level_index",
+    "market_maker_id",
+    "mic_id",
+    "quote_time",
+    "created_at",
+)
+_L2_SNAPSHOT_COPY_COLUMNS = (
+    "security_id",
+    "timestamp",
+    "book",
+    "side",
+    "is_keyframe",
+    "prices",
+    "sizes",
+    "order_counts",
+)
+_BOOK_METRICS_COPY_COLUMNS = (
+    "security_id",
+    "timestamp",
+    "mid_price",
+    "microprice",
+    "spread_ticks",
+    "imbalance",
+    "bid_depth",
+    "ask_depth",
+    "bid_added",
+    "bid_canceled",
+    "ask_added",
+    "ask_canceled",
+)
+# Record fields converted column-wise at flush time (see ColumnBatch)
+_L1_NUMERIC_FIELDS = (
+    "bid_price",
+    "ask_price",
+    "last_price",
+    "bid_size",
+    "ask_size",
+    "last_size",
+    "mark_price",
+    "daily_high",
+    "daily_low",
+    "daily_open",
+    "prev_close",
+    "daily_volume",
+    "quote_time",
+    "trade_time",
+)
+_L2_NUMERIC_FIELDS = ("price_level", "size", "order_count", "level_index", "quote_time")
+_BOOK_METRICS_NUMERIC_FIELDS = _BOOK_METRICS_COPY_COLUMNS[2:]
+_CHART_NUMERIC_FIELDS = (
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+    "volume",
+    "trade_count",
+    "vwap",
+)
+# Column names and Postgres types for the unnest-based chart upsert
+_CHART_UPSERT_COLUMNS = (
+    ("id", "uuid"),
+    ("security_id", "uuid"),
+    ("timestamp", "timestamptz"),
+    ("timeframe", "varchar"),
+    ("instrument_type", "varchar"),
+    ("open_price", "bigint"),
+    ("high_price", "bigint"),
+    ("low_price", "bigint"),
+    ("close_price", "bigint"),
+    ("volume", "bigint"),
+    ("trade_count", "integer"),
+    ("vwap", "bigint"),
+    ("is_regular_hours", "boolean"),
+    ("created_at", "timestamptz"),
+)
+_CHART_CONFLICT_COLUMNS = ("security_id", "timestamp", "timeframe")
+_CHART_UPDATE_COLUMNS = (
+    "open_price",
+    "high_price",
+    "low_price",
+    "close_price",
+    "volume",
+    "trade_count",
+    "vwap",
+    "is_regular_hours",
+)
+
+
+def _is_poison_error(error: BaseException) -> bool:
+    """
+    True if the database rejected the rows themselves (constraint violation,
+    invalid value) rather than failing transiently. COPY runs on the raw
+    asyncpg connection, so its errors are not wrapped by SQLAlchemy.
+    """
+    return isinstance(
+        error,
+        (
+            sa_exc.IntegrityError,
+            sa_exc.DataError,
+            asyncpg.IntegrityConstraintViolationError,
+            asyncpg.DataError,
+        ),
+    )
+
+
+def _supports_raw_frames(stream: Any) -> bool:
+    """Whether stream has the StreamClient internals _handle_frame relies on."""
+    return (
+        hasattr(stream, "_overflow_items")
+        and hasattr(stream, "_socket")
+        and hasattr(stream, "_lock")
+        and callable(getattr(stream, "handle_message", None))
+        and callable(
+            getattr(getattr(stream, "json_decoder", None), "decode_json_string", None)
+        )
+    )
 
 
 class MarketDataStreamingService:
-    def __init__(self, auth: Optional[SchwabAuthService] = None):
+    def __init__(
+        self,
+        auth: Optional[SchwabAuthService] = None,
+        quote_store: Optional[LatestQuoteStore] = None,
+        hub: Optional[LiveHub] = None,
+        books: Optional[OrderBookStore] = None,
+        publisher: Optional[LivePublisher] = None,
+        securities: Optional[SecurityResolver] = None,
+        partitions: Optional[PartitionManager] = None,
+    ):
         import logging
 
         self.logger = logging.getLogger(__name__)
@@ -30,10 +216,60 @@ class MarketDataStreamingService:
         self.subscription_service = SubscriptionService()
         self._stream = None
         self._lock = asyncio.Lock()
-        self._l1_batcher: Optional[Beque[dict]] = None
-        self._l2_batcher: Optional[Beque[dict]] = None
-        self._chart_batcher: Optional[Beque[dict]] = None
-        self._security_cache: dict[str, Optional[Any]] = {}
+        self._l1_batcher: Optional[Beque[L1Quote]] = None
+        self._l1_row_batcher: Optional[Beque[L1Quote]] = None
+        self._l2_batcher: Optional[Beque[L2Level]] = None
+        self._chart_batcher: Optional[Beque[ChartBar]] = None
+        self._metrics_batcher: Optional[Beque[BookMetric]] = None
+        self._l2_snapshot_batcher: Optional[Beque[L2Snapshot]] = None
+        # Decoders resolve the feed's key spellings on first use
+        self._l1_decoder = l1_decoder()
+        self._l2_decoder = l2_decoder()
+        self._chart_decoder = chart_decoder()
+        # Raw-frame fast path: service -> fn(records, raw), set by start_*
+        self._frame_decoder = FrameDecoder()
+        self._frame_handlers: Dict[str, Any] = {}
+        # Set per StreamClient: whether its internals match the fast path's
+        self._fast_decode = False
+        # Latest L1 state per symbol, served by the API without a DB query
+        self.latest_quotes = quote_store if quote_store is not None else latest_quotes
+        # Current order book per symbol and venue, rebuilt from L2
+        self.order_books = books if books is not None else order_books
+        # L2 is persisted as per-level rows, packed keyframe/delta
+        # snapshots of the books, or both (L2_STORAGE)
+        self._l2_rows = env.L2_STORAGE in ("rows", "both")
+        self.l2_snapshots = (
+            L2SnapshotEncoder() if env.L2_STORAGE in ("snapshots", "both") else None
+        )
+        # Imbalance, microprice, depth and order flow sampled from the books
+        self.book_metrics = BookMetricsSampler(
+            self.order_books, on_metrics=self._enqueue_metrics_batch
+        )
+        # Fan-out to live WebSocket clients; publishing never blocks on them
+        self.live_hub = hub if hub is not None else live_hub
+        # Other processes (API workers) get live data via Postgres NOTIFY
+        if publisher is None and env.LIVE_DISTRIBUTION:
+            publisher = LivePublisher(channel=env.LIVE_CHANNEL)
+        self._publisher = publisher
+        # Which L1 updates get written, per symbol (every tick, on change, sampled)
+        self._l1_persistence = L1PersistenceFilter.from_spec(
+            env.L1_PERSIST_POLICY, on_samples=self._enqueue_l1_rows
+        )
+        self._flush_scheduler = BequeScheduler(
+            budget=_FLUSH_CONNECTIONS, name="Flush_Scheduler"
+        )
+        # Symbol -> security_id, preloaded so flushes never wait on a lookup
+        self.securities = securities or SecurityResolver(
+            snapshot_path=os.path.join(env.DATA_DIR, "securities.snapshot")
+        )
+        # Higher-timeframe bars, bucketed by each exchange's session
+        self.bars = BarAggregator(timezone_for=self.securities.timezone)
+        # 5s/15s bars, VWAP and trade counts built from L1 trades
+        self.ticks = TickBarAggregator()
+        # Daily partitions are created ahead of time; flushes run no DDL
+        self.partitions = partitions or PartitionManager(engine)
+        # stream -> rows dropped because their symbol has no security
+        self._unresolved_rows: Dict[str, int] = {}
         self._message_count = 0
         self._last_message_time = None
         # Store connection state for reconnection
@@ -73,6 +309,14 @@ class MarketDataStreamingService:
                 account_id = None
 
             self._stream = StreamClient(client, account_id=account_id)
+            self._fast_decode = env.STREAM_FAST_DECODE and _supports_raw_frames(
+                self._stream
+            )
+            if env.STREAM_FAST_DECODE and not self._fast_decode:
+                self.logger.warning(
+                    "schwab-py StreamClient internals changed, "
+                    "decoding frames with handle_message()"
+                )
             return self._stream
 
     async def login(self, user_id: str) -> None:
@@ -154,7 +398,7 @@ class MarketDataStreamingService:
         )
         await stream.level_one_equity_subs(symbols_list)
 
-        def handler(msg):
+        def on_quotes(entities: List[L1Quote], msg: Any) -> None:
             from datetime import datetime, timezone
 
             self._message_count += 1
@@ -163,17 +407,34 @@ class MarketDataStreamingService:
             if self._message_count % 100 == 0:  # Log every 100th message
                 self.logger.info(f"Processed {self._message_count} L1 messages")
 
-            entities = self._extract_l1_entities(msg)
             if not entities:
                 if self._message_count % 10 == 0:  # Log empty messages occasionally
                     self.logger.warning(f"Received L1 message with no entities: {msg}")
                 return
 
             self.logger.debug(f"L1 handler processing {len(entities)} entities")
-            # Use background task with proper error handling
-            asyncio.create_task(self._enqueue_l1_batch(entities))
+            self.latest_quotes.update(entities)
+            self.live_hub.publish_l1(entities)
+            if self._publisher is not None:
+                self._publisher.offer_quotes(entities)
+            bars = self.ticks.update(entities)
+            if bars:
+                self.live_hub.publish_bars(bars)
+                if self._publisher is not None:
+                    self._publisher.offer_bars(bars)
+                self._enqueue_chart_batch(bars)
+            latest, rows = self._l1_persistence.filter(entities)
+            # Enqueue synchronously; no per-message task or lock
+            if latest:
+                self._enqueue_l1_batch(latest)
+            if rows:
+                self._enqueue_l1_rows(rows)
+
+        def handler(msg):
+            on_quotes(self._extract_l1_entities(msg), msg)
 
         stream.add_level_one_equity_handler(handler)
+        self._frame_handlers["LEVELONE_EQUITIES"] = on_quotes
         self.logger.info(f"Level 1 handler registered for {len(symbols_list)} symbols")
 
     async def start_level_one(
@@ -212,13 +473,12 @@ class MarketDataStreamingService:
         else:
             await stream.nasdaq_book_subs(symbols_list)
 
-        def handler(msg):
+        def on_levels(entities: List[L2Level], msg: Any) -> None:
             from datetime import datetime, timezone
 
             self._message_count += 1
             self._last_message_time = datetime.now(timezone.utc)
 
-            entities = self._extract_l2_entities(msg)
             if not entities:
                 if self._message_count % 10 == 0:  # Log empty messages occasionally
                     self.logger.warning(f"Received L2 message with no entities: {msg}")
@@ -227,13 +487,30 @@ class MarketDataStreamingService:
             self.logger.debug(
                 f"L2 handler processing {len(entities)} entities for {book}"
             )
-            # Use background task with proper error handling
-            asyncio.create_task(self._enqueue_l2_batch(entities))
+            self.order_books.apply(book, entities)
+            self.live_hub.publish_l2(book, entities)
+            if self._publisher is not None:
+                self._publisher.offer_books(book, entities)
+            # Enqueue synchronously; no per-message task or lock
+            if self._l2_rows:
+                self._enqueue_l2_batch(entities)
+            if self.l2_snapshots is not None:
+                snapshots: List[L2Snapshot] = []
+                for symbol in dict.fromkeys(e.symbol for e in entities):
+                    order_book = self.order_books.get(symbol, book)
+                    if order_book is not None:
+                        snapshots += self.l2_snapshots.encode(order_book)
+                self._enqueue_l2_snapshot_batch(snapshots)
+
+        def handler(msg):
+            on_levels(self._extract_l2_entities(msg), msg)
 
         if book.upper() == "NYSE":
             stream.add_nyse_book_handler(handler)
+            self._frame_handlers["NYSE_BOOK"] = on_levels
         else:
             stream.add_nasdaq_book_handler(handler)
+            self._frame_handlers["NASDAQ_BOOK"] = on_levels
 
         self.logger.info(
             f"Level 2 handler registered for {len(symbols_list)} symbols on {book}"
@@ -259,7 +536,7 @@ class MarketDataStreamingService:
         )
         await stream.chart_equity_subs(symbols_list)
 
-        def handler(msg):
+        def on_bars(entities: List[ChartBar], msg: Any) -> None:
             from datetime import datetime, timezone
 
             self._message_count += 1
@@ -268,7 +545,6 @@ class MarketDataStreamingService:
             if self._message_count % 100 == 0:  # Log every 100th message
                 self.logger.info(f"Processed {self._message_count} chart messages")
 
-            entities = self._extract_chart_entities(msg)
             if not entities:
                 if self._message_count % 10 == 0:  # Log empty messages occasionally
                     self.logger.warning(
@@ -277,10 +553,20 @@ class MarketDataStreamingService:
                 return
 
             self.logger.debug(f"Chart handler processing {len(entities)} entities")
-            # Use background task with proper error handling
-            asyncio.create_task(self._enqueue_chart_batch(entities))
+            self.ticks.enrich(entities)
+            # 5m..1d bars rolled up from these 1m bars, written the same way
+            entities = entities + self.bars.update(entities)
+            self.live_hub.publish_bars(entities)
+            if self._publisher is not None:
+                self._publisher.offer_bars(entities)
+            # Enqueue synchronously; no per-message task or lock
+            self._enqueue_chart_batch(entities)
+
+        def handler(msg):
+            on_bars(self._extract_chart_entities(msg), msg)
 
         stream.add_chart_equity_handler(handler)
+        self._frame_handlers["CHART_EQUITY"] = on_bars
         self.logger.info(f"Chart handler registered for {len(symbols_list)} symbols")
 
     async def add_symbols(
@@ -291,6 +577,7 @@ class MarketDataStreamingService:
         symbols: Iterable[str],
         book: Optional[str] = None,
     ) -> None:
+        symbols = list(symbols)
         await self.subscription_service.add_symbols(
             db, user_id, stream_type, symbols, book
         )
@@ -313,19 +600,34 @@ class MarketDataStreamingService:
         symbols: Iterable[str],
         book: Optional[str] = None,
     ) -> None:
+        symbols = list(symbols)
         await self.subscription_service.remove_symbols(
             db, user_id, stream_type, symbols, book
         )
         stream = await self._ensure_stream(user_id)
         if stream_type == "quotes":
             await stream.level_one_equity_unsubs(list(symbols))
+            for symbol in symbols:
+                self._l1_persistence.forget(symbol)
+                self.ticks.forget(symbol)
+                if self._publisher is not None:
+                    self._publisher.forget(symbol)
         elif stream_type == "level2":
             if (book or "NASDAQ").upper() == "NYSE":
                 await stream.nyse_book_unsubs(list(symbols))
             else:
                 await stream.nasdaq_book_unsubs(list(symbols))
+            for symbol in symbols:
+                self.order_books.forget(symbol, book or "NASDAQ")
+                self.book_metrics.forget(symbol)
+                if self.l2_snapshots is not None:
+                    self.l2_snapshots.forget(symbol, book or "NASDAQ")
+                if self._publisher is not None:
+                    self._publisher.forget_book(symbol, book or "NASDAQ")
         elif stream_type == "ohlcv":
             await stream.chart_equity_unsubs(list(symbols))
+            for symbol in symbols:
+                self.bars.forget(symbol)
 
     async def set_level_one_stream(self, user_id: str, symbols: Iterable[str]) -> None:
         """Replace the Level 1 subscription set on the wire without touching DB."""
@@ -347,6 +649,41 @@ class MarketDataStreamingService:
         stream = await self._ensure_stream(user_id)
         await stream.chart_equity_subs(list(symbols))
 
+    async def _handle_frame(self, stream) -> None:
+        """
+        Receive one websocket frame and decode our services' data straight
+        from the raw text into records, skipping schwab-py's dict parsing
+        and relabeling. Anything else in the frame (responses, notifications,
+        other services), and frames that don't match the schemas, go through
+        schwab-py's handle_message via its overflow queue, so its own checks
+        and handlers still run.
+
+        This reaches into StreamClient internals (checked once per client by
+        _supports_raw_frames), so schwab-py is pinned in pyproject.toml.
+        """
+        if stream._overflow_items:
+            # Messages queued by schwab-py itself (e.g. during a request)
+            await stream.handle_message()
+            return
+        if stream._socket is None:
+            raise ValueError("Socket not open. Did you forget to call login()?")
+
+        async with stream._lock:
+            raw = await stream._socket.recv()
+
+        try:
+            records, rest = self._frame_decoder.decode(raw, self._frame_handlers.keys())
+        except FrameDecodeError as e:
+            self.logger.debug(f"Frame fast decode failed, using schwab-py: {e}")
+            records, rest = [], stream.json_decoder.decode_json_string(raw)
+
+        for service, entities in records:
+            self._frame_handlers[service](entities, raw)
+
+        if rest is not None:
+            stream._overflow_items.append(rest)
+            await stream.handle_message()
+
     async def pump_messages_forever(self, stop_event: asyncio.Event) -> None:
         from datetime import datetime, timezone
 
@@ -363,7 +700,10 @@ class MarketDataStreamingService:
 
         while not stop_event.is_set():
             try:
-                await self._stream.handle_message()
+                if self._fast_decode and self._frame_handlers:
+                    await self._handle_frame(self._stream)
+                else:
+                    await self._stream.handle_message()
                 consecutive_errors = 0  # Reset on successful message
 
                 # Periodic health check logging
@@ -469,11 +809,18 @@ class MarketDataStreamingService:
         """Gracefully stop the streaming service and flush all pending data."""
         self.logger.info("Stopping streaming service...")
 
+        await self.book_metrics.stop()
+        # Hands the pending L1 samples to the row batcher before it stops
+        await self._l1_persistence.stop()
+
         # Stop batchers and ensure all data is flushed
         batchers = [
             ("L1", self._l1_batcher),
+            ("L1 row", self._l1_row_batcher),
             ("L2", self._l2_batcher),
             ("Chart", self._chart_batcher),
+            ("Book metrics", self._metrics_batcher),
+            ("L2 snapshot", self._l2_snapshot_batcher),
         ]
 
         for name, batcher in batchers:
@@ -487,8 +834,20 @@ class MarketDataStreamingService:
 
         # Clear batcher references
         self._l1_batcher = None
+        self._l1_row_batcher = None
         self._l2_batcher = None
         self._chart_batcher = None
+        self._metrics_batcher = None
+        self._l2_snapshot_batcher = None
+
+        await self.securities.stop()
+        await self.partitions.stop()
+
+        if self._publisher is not None:
+            try:
+                await self._publisher.stop()
+            except Exception as e:
+                self.logger.error(f"Error stopping live publisher: {e}")
 
         # Logout stream
         try:
@@ -522,244 +881,296 @@ class MarketDataStreamingService:
         # Add batcher health information
         for name, batcher in [
             ("l1", self._l1_batcher),
+            ("l1_row", self._l1_row_batcher),
             ("l2", self._l2_batcher),
             ("chart", self._chart_batcher),
+            ("book_metrics", self._metrics_batcher),
+            ("l2_snapshot", self._l2_snapshot_batcher),
         ]:
             if batcher:
                 stats[f"{name}_batcher"] = batcher.stats
+        stats["flush_scheduler"] = self._flush_scheduler.stats
+        stats["l1_persistence"] = self._l1_persistence.stats
+        stats["securities"] = self.securities.stats
+        stats["unresolved_rows"] = dict(self._unresolved_rows)
+        stats["partitions"] = self.partitions.stats
+        stats["bars"] = self.bars.stats
+        stats["ticks"] = self.ticks.stats
+        stats["order_books"] = self.order_books.stats
+        stats["book_metrics"] = self.book_metrics.stats
+        if self.l2_snapshots is not None:
+            stats["l2_snapshots"] = self.l2_snapshots.stats
+        stats["live_hub"] = self.live_hub.stats
+        if self._publisher is not None:
+            stats["live_publisher"] = self._publisher.stats
 
         return stats
 
     async def _ensure_batchers(self) -> None:
+        await self.partitions.start()
+        await self.securities.start()
+        if self._publisher is not None:
+            await self._publisher.start()
         if self._l1_batcher is None:
-            self._l1_batcher = Beque(
+            # Symbols on the latest policy: only the newest snapshot per
+            # symbol matters within a flush window; partial updates are
+            # folded into the pending snapshot
+            self._l1_batcher = CoalescingBeque(
+                key=lambda e: e.symbol,
+                merge=merge_non_null,
                 max_batch_size=100,
                 flush_interval=10.0,
                 on_flush=self._flush_level_one,
                 name="L1_Batcher",
+                # Starting points only: retuned from arrival rate and flush
+                # latency so quiet pre-market and the open both land near
+                # target_latency
+                adaptive=True,
+                target_latency=2.0,
+                batch_size_bounds=(10, 5_000),
+                flush_interval_bounds=(0.25, 10.0),
+                # Memory is bounded; past the bound, or while the DB is down,
+                # items spill to the on-disk journal and replay in order later.
+                # The overflow policy only applies to re-queued failed batches.
+                max_queue_size=50_000,
+                overflow=OverflowPolicy.DROP_OLDEST,
+                journal=self._spill_journal("l1"),
+                # Rows rejected by constraints are isolated instead of
+                # blocking the queue
+                is_poison=_is_poison_error,
+                dead_letter=self._dead_letter("l1"),
+                # Connection slots are shared with L2 and charts; quotes get
+                # twice L2's share and jump the line after waiting 1s
+                scheduler=self._flush_scheduler,
+                weight=2.0,
+                latency_target=1.0,
             )
             await self._l1_batcher.start()
+        if self._l1_row_batcher is None:
+            # Rows picked by the every_tick, on_change and sample policies
+            # are each written; no coalescing
+            self._l1_row_batcher = Beque(
+                max_batch_size=100,
+                flush_interval=10.0,
+                on_flush=self._flush_level_one,
+                name="L1_Row_Batcher",
+                adaptive=True,
+                target_latency=2.0,
+                batch_size_bounds=(10, 10_000),
+                flush_interval_bounds=(0.25, 10.0),
+                max_queue_size=100_000,
+                overflow=OverflowPolicy.DROP_OLDEST,
+                journal=self._spill_journal("l1_row"),
+                is_poison=_is_poison_error,
+                dead_letter=self._dead_letter("l1_row"),
+                scheduler=self._flush_scheduler,
+                weight=2.0,
+                latency_target=1.0,
+            )
+            await self._l1_row_batcher.start()
         if self._l2_batcher is None:
             self._l2_batcher = Beque(
                 max_batch_size=100,
                 flush_interval=10.0,
                 on_flush=self._flush_level_two,
                 name="L2_Batcher",
+                adaptive=True,
+                target_latency=2.0,
+                batch_size_bounds=(50, 10_000),
+                flush_interval_bounds=(0.25, 10.0),
+                max_queue_size=200_000,
+                overflow=OverflowPolicy.DROP_OLDEST,
+                # Pipeline flushes over several pooled connections; a symbol's
+                # levels stay in one in-flight batch so they are never reordered
+                max_inflight=3,
+                order_key=lambda e: e.symbol,
+                journal=self._spill_journal("l2"),
+                is_poison=_is_poison_error,
+                dead_letter=self._dead_letter("l2"),
+                # Book traffic is the heaviest; it gets the base share
+                scheduler=self._flush_scheduler,
+                weight=1.0,
             )
             await self._l2_batcher.start()
         if self._chart_batcher is None:
-            self._chart_batcher = Beque(
+            # In-progress higher-timeframe bars are re-sent on every 1m bar;
+            # only the latest version of each bar is kept pending
+            self._chart_batcher = CoalescingBeque(
                 max_batch_size=50,  # Charts might be larger/less frequent
                 flush_interval=30.0,  # Charts can be batched longer
                 on_flush=self._flush_charts,
                 name="Chart_Batcher",
+                adaptive=True,
+                target_latency=10.0,
+                batch_size_bounds=(10, 2_000),
+                flush_interval_bounds=(1.0, 30.0),
+                max_queue_size=20_000,
+                overflow=OverflowPolicy.COALESCE,
+                key=lambda e: (e.symbol, e.timestamp, e.timeframe),
+                journal=self._spill_journal("chart"),
+                is_poison=_is_poison_error,
+                dead_letter=self._dead_letter("chart"),
+                # Downstream jobs depend on bars, so they are served first
+                scheduler=self._flush_scheduler,
+                weight=3.0,
+                latency_target=2.0,
             )
             await self._chart_batcher.start()
-
-    # ---------- Parsing helpers ----------
-    def _extract_l1_entities(self, msg: Any) -> List[Dict[str, Any]]:
-        content = []
-        if isinstance(msg, dict) and msg.get("content"):
-            raw = msg.get("content")
-            content = raw if isinstance(raw, list) else [raw]
-        elif isinstance(msg, list):
-            content = msg
-        elif isinstance(msg, dict):
-            content = [msg]
-
-        entities: List[Dict[str, Any]] = []
-        for item in content:
-            if not isinstance(item, dict):
-                continue
-            symbol = (
-                item.get("symbol")
-                or item.get("SYMBOL")
-                or item.get("key")
-                or item.get("KEY")
+        if self._metrics_batcher is None:
+            self._metrics_batcher = Beque(
+                max_batch_size=500,
+                flush_interval=5.0,
+                on_flush=self._flush_book_metrics,
+                name="Book_Metrics_Batcher",
+                adaptive=True,
+                target_latency=5.0,
+                batch_size_bounds=(50, 10_000),
+                flush_interval_bounds=(1.0, 30.0),
+                max_queue_size=50_000,
+                overflow=OverflowPolicy.DROP_OLDEST,
+                journal=self._spill_journal("book_metrics"),
+                is_poison=_is_poison_error,
+                dead_letter=self._dead_letter("book_metrics"),
+                # Derived data, rebuilt from the books; lowest share
+                scheduler=self._flush_scheduler,
+                weight=0.5,
             )
-            if not symbol:
-                continue
+            await self._metrics_batcher.start()
+        if self._l2_snapshot_batcher is None and self.l2_snapshots is not None:
+            dead_letter = self._dead_letter("l2_snapshot")
 
-            def _num(*keys: str) -> Optional[float]:
-                for k in keys:
-                    v = item.get(k)
-                    if v is not None:
-                        try:
-                            return float(v)
-                        except Exception:
-                            return None
-                return None
-
-            ent = {
-                "symbol": str(symbol).upper(),
-                "bid_price": _num("bidPrice", "BID_PRICE", "BID"),
-                "ask_price": _num("askPrice", "ASK_PRICE", "ASK"),
-                "last_price": _num("lastPrice", "LAST_PRICE", "LAST"),
-                "bid_size": _num("bidSize", "BID_SIZE"),
-                "ask_size": _num("askSize", "ASK_SIZE"),
-                "last_size": _num("lastSize", "LAST_SIZE"),
-                "mark_price": _num("mark", "MARK", "MARK_PRICE"),
-                "daily_high": _num("highPrice", "HIGH_PRICE", "HIGH"),
-                "daily_low": _num("lowPrice", "LOW_PRICE", "LOW"),
-                "daily_open": _num("openPrice", "OPEN_PRICE", "OPEN"),
-                "prev_close": _num("closePrice", "PREV_CLOSE", "CLOSE"),
-                "daily_volume": _num("totalVolume", "VOLUME", "TOTAL_VOLUME"),
-                "quote_time": item.get("quoteTime", item.get("QUOTE_TIME")),
-                "trade_time": item.get("tradeTime", item.get("TRADE_TIME")),
-                "is_realtime": bool(
-                    item.get("isRealtime", item.get("IS_REAL_TIME", True))
-                ),
-            }
-            entities.append(ent)
-        return entities
-
-    def _extract_l2_entities(self, msg: Any) -> List[Dict[str, Any]]:
-        content = []
-        if isinstance(msg, dict) and msg.get("content"):
-            raw = msg.get("content")
-            content = raw if isinstance(raw, list) else [raw]
-        elif isinstance(msg, list):
-            content = msg
-        elif isinstance(msg, dict):
-            content = [msg]
-
-        entities: List[Dict[str, Any]] = []
-        for item in content:
-            if not isinstance(item, dict):
-                continue
-            symbol = (
-                item.get("symbol")
-                or item.get("SYMBOL")
-                or item.get("key")
-                or item.get("KEY")
-            )
-            if not symbol:
-                continue
-            side_raw = (item.get("side") or item.get("SIDE") or "").upper()
-            side = side_raw if side_raw in ("BID", "ASK") else None
-
-            # Price level and size can appear in various keys
-            def _num(*keys: str) -> Optional[float]:
-                for k in keys:
-                    v = item.get(k)
-                    if v is not None:
-                        try:
-                            return float(v)
-                        except Exception:
-                            return None
-                return None
-
-            ent = {
-                "symbol": str(symbol).upper(),
-                "side": side,
-                "price_level": _num("price", "PRICE", "priceLevel", "PRICE_LEVEL"),
-                "size": _num("size", "SIZE"),
-                "order_count": int(_num("orderCount", "ORDER_COUNT") or 0),
-                "level_index": int(_num("levelIndex", "LEVEL_INDEX") or 0),
-                "market_maker_id": item.get("marketMaker", item.get("MMID")),
-                "mic_id": item.get("micId", item.get("MIC")),
-                "quote_time": item.get("quoteTime", item.get("QUOTE_TIME")),
-            }
-            entities.append(ent)
-        return entities
-
-    def _extract_chart_entities(self, msg: Any) -> List[Dict[str, Any]]:
-        content = []
-        if isinstance(msg, dict) and msg.get("content"):
-            raw = msg.get("content")
-            content = raw if isinstance(raw, list) else [raw]
-        elif isinstance(msg, list):
-            content = msg
-        elif isinstance(msg, dict):
-            content = [msg]
-
-        entities: List[Dict[str, Any]] = []
-        for item in content:
-            if not isinstance(item, dict):
-                continue
-            symbol = (
-                item.get("symbol")
-                or item.get("SYMBOL")
-                or item.get("key")
-                or item.get("KEY")
+            async def dead_letter_snapshots(
+                items: List[L2Snapshot], error: BaseException
+            ) -> None:
+                self._forget_snapshot_books(items)
+                await dead_letter(items, error)
+
+            self._l2_snapshot_batcher = Beque(
+                max_batch_size=100,
+                flush_interval=5.0,
+                on_flush=self._flush_level_two_snapshots,
+                name="L2_Snapshot_Batcher",
+                adaptive=True,
+                target_latency=2.0,
+                batch_size_bounds=(20, 5_000),
+                flush_interval_bounds=(0.25, 10.0),
+                # A lost delta corrupts every book rebuilt from it until the
+                # next keyframe, so rows are never dropped: past the bound
+                # they spill to the journal, and re-queued batches stay whole
+                max_queue_size=100_000,
+                overflow=OverflowPolicy.BLOCK,
+                # Deltas only make sense in order: one batch per symbol in
+                # flight, and the journal replays in order
+                max_inflight=3,
+                order_key=lambda e: e.symbol,
+                journal=self._spill_journal("l2_snapshot"),
+                # Rejected rows are set aside together with every later row
+                # of their book, which would be a delta on top of them; the
+                # book restarts from a keyframe
+                is_poison=_is_poison_error,
+                dead_letter=dead_letter_snapshots,
+                poison_key=lambda e: (e.symbol, e.book),
+                scheduler=self._flush_scheduler,
+                weight=1.0,
             )
-            if not symbol:
-                continue
+            await self._l2_snapshot_batcher.start()
+        await self.book_metrics.start()
+        await self._l1_persistence.start()
+
+    def _spill_journal(self, stream: str) -> SpillJournal[Any]:
+        return SpillJournal(
+            os.path.join(env.DATA_DIR, "spill", stream),
+            name=f"{stream.upper()}_Journal",
+        )
 
-            def _num(*keys: str) -> Optional[float]:
-                for k in keys:
-                    v = item.get(k)
-                    if v is not None:
-                        try:
-                            return float(v)
-                        except Exception:
-                            return None
-                return None
-
-            # Chart data often comes with OHLCV fields
-            ent = {
-                "symbol": str(symbol).upper(),
-                "open_price": _num("openPrice", "OPEN_PRICE", "OPEN", "open"),
-                "high_price": _num("highPrice", "HIGH_PRICE", "HIGH", "high"),
-                "low_price": _num("lowPrice", "LOW_PRICE", "LOW", "low"),
-                "close_price": _num("closePrice", "CLOSE_PRICE", "CLOSE", "close"),
-                "volume": _num("volume", "VOLUME", "totalVolume", "TOTAL_VOLUME"),
-                "trade_count": _num("tradeCount", "TRADE_COUNT"),
-                "vwap": _num("vwap", "VWAP"),
-                "timestamp": item.get("timestamp", item.get("TIMESTAMP")),
-                "timeframe": item.get("timeframe", item.get("TIMEFRAME", "1MIN")),
-            }
-            entities.append(ent)
-        return entities
+    def _dead_letter(self, stream: str) -> DeadLetterFile:
+        return DeadLetterFile(
+            os.path.join(env.DATA_DIR, "dead_letter", f"{stream}.jsonl"),
+            name=f"{stream.upper()}_DeadLetter",
+        )
+
+    # ---------- Parsing helpers ----------
+    def _extract_l1_entities(self, msg: Any) -> List[L1Quote]:
+        return self._l1_decoder.decode_message(msg)
+
+    def _extract_l2_entities(self, msg: Any) -> List[L2Level]:
+        return self._l2_decoder.decode_message(book_levels(msg))
+
+    def _extract_chart_entities(self, msg: Any) -> List[ChartBar]:
+        return self._chart_decoder.decode_message(msg)
 
     # ---------- Flush consumers ----------
-    async def _flush_level_one(self, batch: List[Dict[str, Any]]) -> None:
+    async def _flush_level_one(self, batch: List[L1Quote]) -> None:
         if not batch:
             return
 
         self.logger.info(f"Flushing L1 batch with {len(batch)} items")
 
         # Resolve symbols to security IDs in bulk
-        symbols = sorted({b["symbol"] for b in batch if b.get("symbol")})
+        symbols = sorted({b.symbol for b in batch})
         async with AsyncSessionLocal() as db:
-            symbol_to_id = await self._resolve_security_ids(db, symbols)
+            symbol_to_id = await self.securities.lookup(symbols)
             missing_symbols = [s for s in symbols if not symbol_to_id.get(s)]
             if missing_symbols:
                 self.logger.warning(
                     f"Missing security IDs for symbols: {missing_symbols}"
                 )
 
-            objs: List[LevelOne] = []
             now = datetime.now(timezone.utc)
-            for b in batch:
-                sec_id = symbol_to_id.get(b.get("symbol"))
-                if not sec_id:
-                    continue
-                obj = LevelOne(
-                    security_id=sec_id,
-                    timestamp=now,
-                    instrument_type=InstrumentType.EQUITY,
-                    bid_price=self._to_price_int(b.get("bid_price")),
-                    bid_size=self._to_int(b.get("bid_size")),
-                    ask_price=self._to_price_int(b.get("ask_price")),
-                    ask_size=self._to_int(b.get("ask_size")),
-                    last_price=self._to_price_int(b.get("last_price")),
-                    last_size=self._to_int(b.get("last_size")),
-                    mark_price=self._to_price_int(b.get("mark_price")),
-                    daily_high=self._to_price_int(b.get("daily_high")),
-                    daily_low=self._to_price_int(b.get("daily_low")),
-                    daily_open=self._to_price_int(b.get("daily_open")),
-                    prev_close=self._to_price_int(b.get("prev_close")),
-                    daily_volume=self._to_int(b.get("daily_volume")),
-                    quote_time=self._to_int(b.get("quote_time")),
-                    trade_time=self._to_int(b.get("trade_time")),
-                    is_realtime=bool(b.get("is_realtime", True)),
+            cols = ColumnBatch(batch, _L1_NUMERIC_FIELDS)
+            sec_ids = [symbol_to_id.get(b.symbol) for b in batch]
+            cols.require(np.array([s is not None for s in sec_ids]), "no security")
+
+            bid, ask = cols.price("bid_price"), cols.price("ask_price")
+            sizes = [
+                cols.integer(name)
+                for name in ("bid_size", "ask_size", "last_size", "daily_volume")
+            ]
+            # Model check constraints, over the whole batch
+            cols.require(
+                ~(bid.valid & ask.valid & (ask.values < bid.values)), "ask < bid"
+            )
+            for size in sizes:
+                cols.require(~(size.valid & (size.values < 0)), "negative size")
+
+            bid_size, ask_size, last_size, daily_volume = (
+                cols.nullable(size) for size in sizes
+            )
+            kept = cols.kept
+            equity = InstrumentType.EQUITY.value
+            rows = list(
+                zip(
+                    [uuid.uuid4() for _ in range(kept)],
+                    cols.select(sec_ids),
+                    [now] * kept,
+                    [equity] * kept,
+                    cols.nullable(bid),
+                    bid_size,
+                    cols.nullable(ask),
+                    ask_size,
+                    cols.nullable(cols.price("last_price")),
+                    last_size,
+                    cols.nullable(cols.price("mark_price")),
+                    cols.nullable(cols.price("daily_high")),
+                    cols.nullable(cols.price("daily_low")),
+                    cols.nullable(cols.price("daily_open")),
+                    cols.nullable(cols.price("prev_close")),
+                    daily_volume,
+                    cols.nullable(cols.integer("quote_time")),
+                    cols.nullable(cols.integer("trade_time")),
+                    cols.select([bool(b.is_realtime) for b in batch]),
+                    [now] * kept,
                 )
-                objs.append(obj)
+            )
+            self._count_unresolved("l1", cols)
+            if cols.rejected:
+                self.logger.debug(f"Skipped L1 rows: {cols.rejected}")
 
-            if objs:
-                self.logger.info(f"Saving {len(objs)} L1 records to database")
-                db.add_all(objs)
+            if rows:
+                self.logger.info(
+                    f"Saving {len(rows)} L1 records to database (skipped {cols.skipped} invalid)"
+                )
+                await copy_records(db, "level_one_quotes", _L1_COPY_COLUMNS, rows)
                 await db.commit()
                 self.logger.debug("L1 batch commit successful")
             else:
@@ -767,71 +1178,68 @@ class MarketDataStreamingService:
                     f"No valid L1 objects created from batch of {len(batch)} items"
                 )
 
-    async def _flush_level_two(self, batch: List[Dict[str, Any]]) -> None:
+    async def _flush_level_two(self, batch: List[L2Level]) -> None:
         if not batch:
             return
 
         self.logger.info(f"Flushing L2 batch with {len(batch)} items")
 
-        symbols = sorted({b["symbol"] for b in batch if b.get("symbol")})
+        symbols = sorted({b.symbol for b in batch})
         async with AsyncSessionLocal() as db:
-            symbol_to_id = await self._resolve_security_ids(db, symbols)
+            symbol_to_id = await self.securities.lookup(symbols)
             missing_symbols = [s for s in symbols if not symbol_to_id.get(s)]
             if missing_symbols:
                 self.logger.warning(
                     f"Missing security IDs for L2 symbols: {missing_symbols}"
                 )
 
-            objs: List[LevelTwo] = []
             now = datetime.now(timezone.utc)
-            skipped_count = 0
-
-            for b in batch:
-                sec_id = symbol_to_id.get(b.get("symbol"))
-                if not sec_id:
-                    skipped_count += 1
-                    continue
-
-                side_str = b.get("side") or ""
-                side_val = (
-                    OrderSide(side_str) if side_str in ("BID", "ASK") else OrderSide.BID
+            cols = ColumnBatch(batch, _L2_NUMERIC_FIELDS)
+            sec_ids = [symbol_to_id.get(b.symbol) for b in batch]
+            cols.require(np.array([s is not None for s in sec_ids]), "no security")
+
+            price = cols.price("price_level")
+            size = cols.integer("size")
+            order_count = cols.integer("order_count")
+            level_index = cols.integer("level_index")
+            # Model check constraints (> 0, index >= 0), over the whole batch
+            cols.require(price.valid & (price.values > 0), "price <= 0")
+            cols.require(size.valid & (size.values > 0), "size <= 0")
+            cols.require(order_count.values > 0, "order_count <= 0")
+            cols.require(level_index.values >= 0, "level_index < 0")
+            skipped_count = cols.skipped
+
+            kept = cols.kept
+            equity = InstrumentType.EQUITY.value
+            bid = OrderSide.BID.value
+            rows = list(
+                zip(
+                    [uuid.uuid4() for _ in range(kept)],
+                    cols.select(sec_ids),
+                    [now] * kept,
+                    [equity] * kept,
+                    cols.select(
+                        [b.side if b.side in ("BID", "ASK") else bid for b in batch]
+                    ),
+                    cols.nullable(price),
+                    cols.nullable(size),
+                    cols.nullable(order_count),
+                    cols.nullable(level_index),
+                    cols.select([b.market_maker_id or None for b in batch]),
+                    cols.select([b.mic_id or None for b in batch]),
+                    cols.nullable(cols.integer("quote_time")),
+                    [now] * kept,
                 )
-                price_level_int = self._to_price_int(b.get("price_level"))
-                size_int = self._to_int(b.get("size"))
-                order_count_val = int(b.get("order_count") or 0)
-                level_index_val = int(b.get("level_index") or 0)
-
-                # Enforce model constraints (>0) to avoid DB errors
-                if not price_level_int or price_level_int <= 0:
-                    skipped_count += 1
-                    continue
-                if not size_int or size_int <= 0:
-                    skipped_count += 1
-                    continue
-                if order_count_val <= 0:
-                    skipped_count += 1
-                    continue
-
-                obj = LevelTwo(
-                    security_id=sec_id,
-                    timestamp=now,
-                    instrument_type=InstrumentType.EQUITY,
-                    side=side_val,
-                    price_level=price_level_int,
-                    size=size_int,
-                    order_count=order_count_val,
-                    level_index=level_index_val,
-                    market_maker_id=(b.get("market_maker_id") or None),
-                    mic_id=(b.get("mic_id") or None),
-                    quote_time=self._to_int(b.get("quote_time")),
-                )
-                objs.append(obj)
+            )
+            self._count_unresolved("l2", cols)
+            if cols.rejected:
+                self.logger.debug(f"Skipped L2 rows: {cols.rejected}")
 
-            if objs:
+            if rows:
                 self.logger.info(
-                    f"Saving {len(objs)} L2 records to database (skipped {skipped_count} invalid)"
+                    f"Saving {len(rows)} L2 records to database (skipped {skipped_count} invalid)"
                 )
-                db.add_all(objs)
+                await copy_records(db, "level_two_quotes", _L2_COPY_COLUMNS, rows)
                 await db.commit()
                 self.logger.debug("L2 batch commit successful")
             else:
@@ -839,15 +1247,97 @@ class MarketDataStreamingService:
                     f"No valid L2 objects created from batch of {len(batch)} items (skipped {skipped_count})"
                 )
 
-    async def _flush_charts(self, batch: List[Dict[str, Any]]) -> None:
+    async def _flush_level_two_snapshots(self, batch: List[L2Snapshot]) -> None:
+        if not batch:
+            return
+
+        symbols = sorted({b.symbol for b in batch})
+        async with AsyncSessionLocal() as db:
+            symbol_to_id = await self.securities.lookup(symbols)
+            missing_symbols = [s for s in symbols if not symbol_to_id.get(s)]
+            if missing_symbols:
+                self.logger.warning(
+                    f"Missing security IDs for L2 snapshot symbols: {missing_symbols}"
+                )
+                unresolved = [b for b in batch if b.symbol in missing_symbols]
+                self._count_unresolved("l2_snapshot", len(unresolved))
+                self._forget_snapshot_books(unresolved)
+            rows = [
+                (
+                    symbol_to_id[b.symbol],
+                    b.timestamp,
+                    b.book,
+                    b.side,
+                    b.is_keyframe,
+                    b.prices,
+                    b.sizes,
+                    b.order_counts,
+                )
+                for b in batch
+                if symbol_to_id.get(b.symbol)
+            ]
+            if rows:
+                await copy_records(
+                    db, "level_two_snapshots", _L2_SNAPSHOT_COPY_COLUMNS, rows
+                )
+                await db.commit()
+
+    async def _flush_book_metrics(self, batch: List[BookMetric]) -> None:
+        if not batch:
+            return
+
+        symbols = sorted({b.symbol for b in batch})
+        async with AsyncSessionLocal() as db:
+            symbol_to_id = await self.securities.lookup(symbols)
+            cols = ColumnBatch(batch, _BOOK_METRICS_NUMERIC_FIELDS)
+            sec_ids = [symbol_to_id.get(b.symbol) for b in batch]
+            cols.require(np.array([s is not None for s in sec_ids]), "no security")
+
+            mid_price, microprice = cols.price("mid_price"), cols.price("microprice")
+            spread_ticks = cols.integer("spread_ticks")
+            imbalance = cols.values("imbalance")
+            depths = [cols.integer("bid_depth"), cols.integer("ask_depth")]
+            cols.require(mid_price.valid & microprice.valid, "no mid")
+            cols.require(spread_ticks.valid & np.isfinite(imbalance), "no spread")
+            for depth in depths:
+                cols.require(depth.valid, "no depth")
+
+            rows = list(
+                zip(
+                    cols.select(sec_ids),
+                    cols.select([b.timestamp for b in batch]),
+                    cols.nullable(mid_price),
+                    cols.nullable(microprice),
+                    cols.nullable(spread_ticks),
+                    imbalance[cols.keep].tolist(),
+                    *(cols.nullable(depth) for depth in depths),
+                    *(
+                        cols.nullable(cols.integer(name))
+                        for name in (
+                            "bid_added",
+                            "bid_canceled",
+                            "ask_added",
+                            "ask_canceled",
+                        )
+                    ),
+                )
+            )
+            self._count_unresolved("book_metrics", cols)
+            if cols.rejected:
+                self.logger.debug(f"Skipped book metric rows: {cols.rejected}")
+            if rows:
+                await copy_records(db, "book_metrics", _BOOK_METRICS_COPY_COLUMNS, rows)
+                await db.commit()
+
+    async def _flush_charts(self, batch: List[ChartBar]) -> None:
         if not batch:
             return
 
         self.logger.info(f"Flushing chart batch with {len(batch)} items")
 
-        symbols = sorted({b["symbol"] for b in batch if b.get("symbol")})
+        symbols = sorted({b.symbol for b in batch})
         async with AsyncSessionLocal() as db:
-            symbol_to_id = await self._resolve_security_ids(db, symbols)
+            symbol_to_id = await self.securities.lookup(symbols)
             missing_symbols = [s for s in symbols if not symbol_to_id.get(s)]
             if missing_symbols:
                 self.logger.warning(
@@ -855,8 +1345,6 @@ class MarketDataStreamingService:
                 )
 
             # Prepare normalized rows keyed by (security_id, timestamp, timeframe)
-            from sqlalchemy import select, tuple_, update
-
             def parse_chart_timestamp(raw_ts: Any) -> datetime:
                 if raw_ts is None:
                     return datetime.now(timezone.utc)
@@ -882,50 +1370,57 @@ class MarketDataStreamingService:
                     pass
                 return datetime.now(timezone.utc)
 
+            cols = ColumnBatch(batch, _CHART_NUMERIC_FIELDS)
+            sec_ids = [symbol_to_id.get(b.symbol) for b in batch]
+            cols.require(np.array([s is not None for s in sec_ids]), "no security")
+
+            ohlc = [
+                cols.price(name)
+                for name in ("open_price", "high_price", "low_price", "close_price")
+            ]
+            # Skip missing or invalid OHLC (model check constraints)
+            for price in ohlc:
+                cols.require(price.valid & (price.values > 0), "price <= 0")
+            high, low = ohlc[1], ohlc[2]
+            cols.require(high.values >= low.values, "high < low")
+            # Missing or negative volume is stored as 0
+            volume = cols.integer("volume")
+            volume = Column(
+                np.where(volume.valid & (volume.values >= 0), volume.values, 0),
+                np.ones(len(cols), dtype=bool),
+            )
+            skipped_count = cols.skipped
+            self._count_unresolved("chart", cols)
+            if cols.rejected:
+                self.logger.debug(f"Skipped chart rows: {cols.rejected}")
+
             normalized: Dict[tuple, Dict[str, Any]] = {}
-            skipped_count = 0
-
-            for b in batch:
-                sec_id = symbol_to_id.get(b.get("symbol"))
-                if not sec_id:
-                    skipped_count += 1
-                    continue
-
-                open_price_int = self._to_price_int(b.get("open_price"))
-                high_price_int = self._to_price_int(b.get("high_price"))
-                low_price_int = self._to_price_int(b.get("low_price"))
-                close_price_int = self._to_price_int(b.get("close_price"))
-                volume_int = self._to_int(b.get("volume"))
-
-                # Skip if missing critical OHLC data or invalid values
-                if not all(
-                    [open_price_int, high_price_int, low_price_int, close_price_int]
-                ):
-                    skipped_count += 1
-                    continue
-                if any(
-                    p <= 0
-                    for p in [
-                        open_price_int,
-                        high_price_int,
-                        low_price_int,
-                        close_price_int,
-                    ]
-                ):
-                    skipped_count += 1
-                    continue
-
-                if volume_int is None or volume_int < 0:
-                    volume_int = 0
-
-                timeframe_raw = b.get("timeframe", "1m")
+            for (
+                b,
+                sec_id,
+                open_price_int,
+                high_price_int,
+                low_price_int,
+                close_price_int,
+                volume_int,
+                trade_count,
+                vwap,
+            ) in zip(
+                cols.select(batch),
+                cols.select(sec_ids),
+                *(cols.nullable(price) for price in ohlc),
+                cols.nullable(volume),
+                cols.nullable(cols.integer("trade_count")),
+                cols.nullable(cols.price("vwap")),
+            ):
+                timeframe_raw = b.timeframe
                 try:
                     timeframe_enum = Timeframe(timeframe_raw)
                 except ValueError:
                     timeframe_enum = Timeframe.ONE_MINUTE
                 timeframe_val = timeframe_enum.value
 
-                ts = parse_chart_timestamp(b.get("timestamp"))
+                ts = parse_chart_timestamp(b.timestamp)
 
                 key = (sec_id, ts, timeframe_val)
                 normalized[key] = {
@@ -938,8 +1433,8 @@ class MarketDataStreamingService:
                     "low_price": low_price_int,
                     "close_price": close_price_int,
                     "volume": volume_int,
-                    "trade_count": self._to_int(b.get("trade_count")),
-                    "vwap": self._to_price_int(b.get("vwap")),
+                    "trade_count": trade_count,
+                    "vwap": vwap,
                     "is_regular_hours": True,
                 }
 
@@ -949,143 +1444,125 @@ class MarketDataStreamingService:
                 )
                 return
 
-            keys = list(normalized.keys())
-            # Find which keys already exist
-            existing_keys: set[tuple] = set()
-            if keys:
-                result = await db.execute(
-                    select(Chart.security_id, Chart.timestamp, Chart.timeframe).where(
-                        tuple_(Chart.security_id, Chart.timestamp, Chart.timeframe).in_(
-                            keys
-                        )
-                    )
+            # One set-based upsert per batch; keys are already unique in normalized
+            created_at = datetime.now(timezone.utc)
+            rows = [
+                (
+                    uuid.uuid4(),
+                    row["security_id"],
+                    row["timestamp"],
+                    row["timeframe"],
+                    row["instrument_type"].value,
+                    row["open_price"],
+                    row["high_price"],
+                    row["low_price"],
+                    row["close_price"],
+                    row["volume"],
+                    row["trade_count"],
+                    row["vwap"],
+                    row["is_regular_hours"],
+                    created_at,
                 )
-                existing_keys = set(result.fetchall())
-
-            # Split into inserts and updates
-            inserts: List[Chart] = []
-            updates: List[Dict[str, Any]] = []
-
-            for key, row in normalized.items():
-                if key in existing_keys:
-                    updates.append(row)
-                else:
-                    inserts.append(
-                        Chart(
-                            security_id=row["security_id"],
-                            timestamp=row["timestamp"],
-                            timeframe=row["timeframe"],
-                            instrument_type=row["instrument_type"],
-                            open_price=row["open_price"],
-                            high_price=row["high_price"],
-                            low_price=row["low_price"],
-                            close_price=row["close_price"],
-                            volume=row["volume"],
-                            trade_count=row["trade_count"],
-                            vwap=row["vwap"],
-                            is_regular_hours=row["is_regular_hours"],
-                        )
-                    )
-
-            # Perform updates
-            updated_count = 0
-            for row in updates:
-                await db.execute(
-                    update(Chart)
-                    .where(
-                        (Chart.security_id == row["security_id"])
-                        & (Chart.timestamp == row["timestamp"])
-                        & (Chart.timeframe == row["timeframe"])
-                    )
-                    .values(
-                        open_price=row["open_price"],
-                        high_price=row["high_price"],
-                        low_price=row["low_price"],
-                        close_price=row["close_price"],
-                        volume=row["volume"],
-                        trade_count=row["trade_count"],
-                        vwap=row["vwap"],
-                        is_regular_hours=row["is_regular_hours"],
-                    )
-                )
-                updated_count += 1
-
-            # Perform inserts (triggers partition ensure via ORM event)
-            if inserts:
-                db.add_all(inserts)
-
+                for row in normalized.values()
+            ]
+            await upsert_records(
+                db,
+                "charts",
+                _CHART_UPSERT_COLUMNS,
+                rows,
+                conflict_columns=_CHART_CONFLICT_COLUMNS,
+                update_columns=_CHART_UPDATE_COLUMNS,
+            )
             await db.commit()
 
             self.logger.info(
-                f"Charts upserted: {len(inserts)} inserted, {updated_count} updated (skipped {skipped_count})"
+                f"Charts upserted: {len(rows)} bars (skipped {skipped_count})"
             )
 
-    async def _resolve_security_ids(
-        self, db: AsyncSession, symbols: List[str]
-    ) -> Dict[str, Optional[Any]]:
-        # Use cache when available
-        missing = [s for s in symbols if s not in self._security_cache]
-        if missing:
-            from sqlalchemy import select
-
-            result = await db.execute(
-                select(Security.symbol, Security.id).where(Security.symbol.in_(missing))
-            )
-            found: Dict[str, Any] = {row[0]: row[1] for row in result.fetchall()}
-            for s in missing:
-                self._security_cache[s] = found.get(s)
-        return {s: self._security_cache.get(s) for s in symbols}
-
-    def _to_price_int(self, value: Any) -> Optional[int]:
-        if value is None:
-            return None
-        try:
-            # Store prices with 1e4 precision to preserve sub-cent decimals
-            return int(round(float(value) * 10_000))
-        except Exception:
-            return None
-
-    def _to_int(self, value: Any) -> Optional[int]:
-        if value is None:
-            return None
-        try:
-            return int(float(value))
-        except Exception:
-            return None
-
     # ---------- Error-handling enqueue methods ----------
-    async def _enqueue_l1_batch(self, entities: List[Dict[str, Any]]) -> None:
+    def _enqueue_l1_batch(self, entities: List[L1Quote]) -> None:
         """Safely enqueue L1 entities with error handling."""
         if not self._l1_batcher:
             self.logger.error("L1 batcher is None, cannot enqueue entities")
             return
         try:
-            for ent in entities:
-                await self._l1_batcher.add(ent)
+            self._l1_batcher.extend_nowait(entities)
         except Exception as e:
             self.logger.error(f"Failed to enqueue L1 entities: {type(e).__name__}: {e}")
             # Don't re-raise to avoid breaking the message handler
 
-    async def _enqueue_l2_batch(self, entities: List[Dict[str, Any]]) -> None:
+    def _enqueue_l1_rows(self, entities: List[L1Quote]) -> None:
+        """Safely enqueue L1 rows that must not be coalesced."""
+        if not self._l1_row_batcher:
+            self.logger.error("L1 row batcher is None, cannot enqueue entities")
+            return
+        try:
+            self._l1_row_batcher.extend_nowait(entities)
+        except Exception as e:
+            self.logger.error(f"Failed to enqueue L1 rows: {type(e).__name__}: {e}")
+            # Don't re-raise to avoid breaking the message handler
+
+    def _enqueue_l2_batch(self, entities: List[L2Level]) -> None:
         """Safely enqueue L2 entities with error handling."""
         if not self._l2_batcher:
             self.logger.error("L2 batcher is None, cannot enqueue entities")
             return
         try:
-            for ent in entities:
-                await self._l2_batcher.add(ent)
+            self._l2_batcher.extend_nowait(entities)
         except Exception as e:
             self.logger.error(f"Failed to enqueue L2 entities: {type(e).__name__}: {e}")
             # Don't re-raise to avoid breaking the message handler
 
-    async def _enqueue_chart_batch(self, entities: List[Dict[str, Any]]) -> None:
+    def _enqueue_l2_snapshot_batch(self, entities: List[L2Snapshot]) -> None:
+        if not entities:
+            return
+        if not self._l2_snapshot_batcher:
+            self._forget_snapshot_books(entities)
+            return
+        try:
+            self._l2_snapshot_batcher.extend_nowait(entities)
+        except Exception as e:
+            self.logger.error(
+                f"Failed to enqueue L2 snapshots: {type(e).__name__}: {e}"
+            )
+            self._forget_snapshot_books(entities)
+
+    def _count_unresolved(self, stream: str, dropped: Union[ColumnBatch, int]) -> None:
+        if isinstance(dropped, ColumnBatch):
+            dropped = dropped.rejected.get("no security", 0)
+        if dropped:
+            self._unresolved_rows[stream] = (
+                self._unresolved_rows.get(stream, 0) + dropped
+            )
+
+    def _forget_snapshot_books(self, rows: Iterable[L2Snapshot]) -> None:
+        """
+        Rows that will never be stored: later deltas of their books would
+        describe a state the table does not have, so the next row of each
+        book is forced to be a keyframe.
+        """
+        if self.l2_snapshots is None:
+            return
+        for symbol, book in {(r.symbol, r.book) for r in rows}:
+            self.l2_snapshots.forget(symbol, book)
+
+    def _enqueue_metrics_batch(self, entities: List[BookMetric]) -> None:
+        if not self._metrics_batcher:
+            return
+        try:
+            self._metrics_batcher.extend_nowait(entities)
+        except Exception as e:
+            self.logger.error(
+                f"Failed to enqueue book metrics: {type(e).__name__}: {e}"
+            )
+
+    def _enqueue_chart_batch(self, entities: List[ChartBar]) -> None:
         """Safely enqueue chart entities with error handling."""
         if not self._chart_batcher:
             self.logger.error("Chart batcher is None, cannot enqueue entities")
             return
         try:
-            for ent in entities:
-                await self._chart_batcher.add(ent)
+            self._chart_batcher.extend_nowait(entities)
         except Exception as e:
             self.logger.error(
                 f"Failed to enqueue chart entities: {type(e).__name__}: {e}"
@@ -0,0 +1,289 @@
+"""
+Bars built from the trades seen on the level one stream.
+
+The chart stream carries neither VWAP nor trade counts, and nothing below
+one minute. TickBarAggregator derives them from L1 updates:
+
+- A trade is an L1 update whose trade_time differs from the symbol's
+  previous one. Its price and size are the update's last_price/last_size,
+  or the previous values when the update leaves them out. The first update
+  per symbol only initializes that state. L1 is conflated upstream, so
+  trade_count counts the prints observed, not every print.
+- Each trade updates open/high/low/close, volume, sum(price * size) and the
+  trade count of its bucket in every timeframe, in O(1).
+- Late trades are handled with a per-symbol watermark: the newest trade
+  time seen minus allowed_lateness. Older trades are dropped. Every
+  timeframe is wider than allowed_lateness, so an accepted trade always
+  falls into the current or the previous bucket. Each symbol keeps a
+  two-slot ring per timeframe, one slot per bucket parity, and a late
+  trade still updates its bar.
+
+State lives in flat array.array columns indexed by symbol slot, so it
+costs a few dozen bytes per symbol and timeframe. forget() frees a symbol's
+slot for the next new symbol, so the columns only grow with the number of
+symbols tracked at once.
+
+update() returns the 5s/15s bars touched by the batch, for the chart sink.
+1 minute buckets are tracked as well. enrich() uses them to fill in the
+VWAP and trade count of the chart stream's 1 minute bars.
+"""
+
+from __future__ import annotations
+
+import math
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from axiom.db.models.enums import Timeframe
+from axiom.mdata.bars import epoch_ms
+from axiom.mdata.records import ChartBar, L1Quote
+
+__all__ = ["TICK_TIMEFRAMES", "TickBarAggregator"]
+
+# Bucket width in milliseconds of the timeframes built from ticks
+TICK_TIMEFRAMES: Dict[Timeframe, int] = {
+    Timeframe.FIVE_SECOND: 5_000,
+    Timeframe.FIFTEEN_SECOND: 15_000,
+    Timeframe.ONE_MINUTE: 60_000,
+}
+
+_NAN = float("nan")
+_NO_TIME = -1
+
+
+class _Columns:
+    """Bucket state of one timeframe, two slots per symbol."""
+
+    __slots__ = (
+        "start",
+        "first",
+        "last",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+        "pv",
+        "count",
+    )
+
+    def __init__(self) -> None:
+        self.start = array("q")
+        # Times of the earliest and latest trade folded into the bucket
+        self.first = array("q")
+        self.last = array("q")
+        self.open = array("d")
+        self.high = array("d")
+        self.low = array("d")
+        self.close = array("d")
+        self.volume = array("d")
+        self.pv = array("d")
+        self.count = array("q")
+
+    def grow(self) -> None:
+        for _ in range(2):
+            for column in (self.start, self.first, self.last):
+                column.append(_NO_TIME)
+            for column in (self.open, self.high, self.low, self.close):
+                column.append(_NAN)
+            self.volume.append(0.0)
+            self.pv.append(0.0)
+            self.count.append(0)
+
+    def reset(self, slot: int) -> None:
+        for i in (2 * slot, 2 * slot + 1):
+            self.start[i] = self.first[i] = self.last[i] = _NO_TIME
+            self.open[i] = self.high[i] = self.low[i] = self.close[i] = _NAN
+            self.volume[i] = self.pv[i] = 0.0
+            self.count[i] = 0
+
+    def add(self, i: int, start: int, ts: int, price: float, size: float) -> None:
+        if self.start[i] != start:
+            self.start[i] = start
+            self.first[i] = self.last[i] = ts
+            self.open[i] = self.high[i] = self.low[i] = self.close[i] = price
+            self.volume[i] = self.pv[i] = 0.0
+            self.count[i] = 0
+        else:
+            if price > self.high[i]:
+                self.high[i] = price
+            elif price < self.low[i]:
+                self.low[i] = price
+            if ts < self.first[i]:
+                self.first[i] = ts
+                self.open[i] = price
+            if ts >= self.last[i]:
+                self.last[i] = ts
+                self.close[i] = price
+        self.volume[i] += size
+        self.pv[i] += price * size
+        self.count[i] += 1
+
+    def vwap(self, i: int) -> Optional[float]:
+        volume = self.volume[i]
+        return self.pv[i] / volume if volume else None
+
+
+class TickBarAggregator:
+    """
+    Builds bars from L1 trades:
+
+        ticks = TickBarAggregator()
+        bars = ticks.update(quotes)     # 5s/15s bars touched
+        ticks.enrich(minute_bars)       # fills vwap/trade_count of 1m bars
+    """
+
+    def __init__(
+        self,
+        timeframes: Sequence[Timeframe] = (
+            Timeframe.FIVE_SECOND,
+            Timeframe.FIFTEEN_SECOND,
+        ),
+        *,
+        allowed_lateness: float = 2.0,
+    ) -> None:
+        self._lateness = int(allowed_lateness * 1000)
+        tracked = list(dict.fromkeys([*timeframes, Timeframe.ONE_MINUTE]))
+        for tf in tracked:
+            if TICK_TIMEFRAMES[tf] <= self._lateness:
+                raise ValueError(
+                    f"allowed_lateness must be shorter than the {tf.value} timeframe"
+                )
+        self._widths: List[Tuple[Timeframe, int, bool]] = [
+            (tf, TICK_TIMEFRAMES[tf], tf in timeframes) for tf in tracked
+        ]
+        self._columns = [_Columns() for _ in tracked]
+        self._minute = tracked.index(Timeframe.ONE_MINUTE)
+        # Per-symbol trade state; slots of forgotten symbols are reused
+        self._slots: Dict[str, int] = {}
+        self._symbols: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._trade_time = array("q")
+        self._last_price = array("d")
+        self._last_size = array("d")
+        self._high_water = array("q")
+        self._trades = 0
+        self._late = 0
+        self._enriched = 0
+
+    def update(self, quotes: Iterable[L1Quote]) -> List[ChartBar]:
+        """Fold L1 updates in; returns the emitted-timeframe bars they touched."""
+        touched: Set[Tuple[int, int]] = set()
+        for q in quotes:
+            if q.trade_time is None and q.last_price is None and q.last_size is None:
+                continue
+            symbol = q.symbol.upper()
+            slot = self._slots.get(symbol)
+            if slot is None:
+                slot = self._add_symbol(symbol)
+            if q.last_price is not None:
+                self._last_price[slot] = q.last_price
+            if q.last_size is not None:
+                self._last_size[slot] = q.last_size
+
+            ts = epoch_ms(q.trade_time) if q.trade_time is not None else None
+            previous = self._trade_time[slot]
+            if ts is None or ts == previous:
+                continue
+            self._trade_time[slot] = ts
+            price = self._last_price[slot]
+            size = self._last_size[slot]
+            if (
+                previous == _NO_TIME
+                or math.isnan(price)
+                or math.isnan(size)
+                or size <= 0
+            ):
+                continue
+
+            high_water = self._high_water[slot]
+            if ts < high_water - self._lateness:
+                self._late += 1
+                continue
+            if ts > high_water:
+                self._high_water[slot] = ts
+            self._trades += 1
+
+            for k, (_tf, width, emit) in enumerate(self._widths):
+                bucket = ts // width
+                i = 2 * slot + (bucket & 1)
+                self._columns[k].add(i, bucket * width, ts, price, size)
+                if emit:
+                    touched.add((k, i))
+
+        return [self._bar(k, i) for k, i in sorted(touched)]
+
+    def enrich(self, bars: Iterable[ChartBar]) -> None:
+        """Fill in missing vwap/trade_count of 1 minute bars, in place."""
+        columns = self._columns[self._minute]
+        for bar in bars:
+            if bar.vwap is not None and bar.trade_count is not None:
+                continue
+            slot = self._slots.get(bar.symbol.upper())
+            ts = epoch_ms(bar.timestamp)
+            if slot is None or ts is None:
+                continue
+            bucket = ts // 60_000
+            i = 2 * slot + (bucket & 1)
+            if columns.start[i] != bucket * 60_000:
+                continue
+            if bar.vwap is None:
+                bar.vwap = columns.vwap(i)
+            if bar.trade_count is None:
+                bar.trade_count = columns.count[i]
+            self._enriched += 1
+
+    def forget(self, symbol: str) -> None:
+        """Drop the state kept for symbol (e.g. after unsubscribing)."""
+        slot = self._slots.pop(symbol.upper(), None)
+        if slot is not None:
+            self._symbols[slot] = None
+            self._free.append(slot)
+
+    def _add_symbol(self, symbol: str) -> int:
+        if self._free:
+            slot = self._free.pop()
+            self._slots[symbol] = slot
+            self._symbols[slot] = symbol
+            self._trade_time[slot] = _NO_TIME
+            self._last_price[slot] = _NAN
+            self._last_size[slot] = _NAN
+            self._high_water[slot] = _NO_TIME
+            for columns in self._columns:
+                columns.reset(slot)
+            return slot
+        slot = len(self._symbols)
+        self._slots[symbol] = slot
+        self._symbols.append(symbol)
+        self._trade_time.append(_NO_TIME)
+        self._last_price.append(_NAN)
+        self._last_size.append(_NAN)
+        self._high_water.append(_NO_TIME)
+        for columns in self._columns:
+            columns.grow()
+        return slot
+
+    def _bar(self, k: int, i: int) -> ChartBar:
+        c = self._columns[k]
+        return ChartBar(
+            self._symbols[i // 2],
+            open_price=c.open[i],
+            high_price=c.high[i],
+            low_price=c.low[i],
+            close_price=c.close[i],
+            volume=c.volume[i],
+            trade_count=c.count[i],
+            vwap=c.vwap(i),
+            timestamp=c.start[i],
+            timeframe=self._widths[k][0].value,
+        )
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "symbols": len(self._slots),
+            "timeframes": [tf.value for tf, _, emit in self._widths if emit],
+            "trades": self._trades,
+            "late_trades": self._late,
+            "enriched_bars": self._enriched,
+        }
@@ -0,0 +1,389 @@
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from schwab.streaming import StreamClient, _Handler
+
+from axiom.mdata.decoders import book_levels, chart_decoder, l1_decoder, l2_decoder
+from axiom.mdata.frames import FrameDecoder
+
+SYMBOLS = ["AAPL", "MSFT", "NVDA", "SPY", "QQQ", "TSLA", "AMZN", "META"]
+
+
+# ---------- Baseline: the per-item closure extractor decoders replaced ----------
+def _legacy_content(msg: Any) -> List[Any]:
+    if isinstance(msg, dict) and msg.get("content"):
+        raw = msg.get("content")
+        return raw if isinstance(raw, list) else [raw]
+    if isinstance(msg, list):
+        return msg
+    if isinstance(msg, dict):
+        return [msg]
+    return []
+
+
+def _legacy_symbol(item: Dict[str, Any]) -> Any:
+    return (
+        item.get("symbol") or item.get("SYMBOL") or item.get("key") or item.get("KEY")
+    )
+
+
+def _num(item: Dict[str, Any], *keys: str) -> Optional[float]:
+    for k in keys:
+        v = item.get(k)
+        if v is not None:
+            try:
+                return float(v)
+            except Exception:
+                return None
+    return None
+
+
+def legacy_l1(msg: Any) -> List[Dict[str, Any]]:
+    entities = []
+    for item in _legacy_content(msg):
+        if not isinstance(item, dict):
+            continue
+        symbol = _legacy_symbol(item)
+        if not symbol:
+            continue
+
+        entities.append(
+            {
+                "symbol": str(symbol).upper(),
+                "bid_price": _num(item, "bidPrice", "BID_PRICE", "BID"),
+                "ask_price": _num(item, "askPrice", "ASK_PRICE", "ASK"),
+                "last_price": _num(item, "lastPrice", "LAST_PRICE", "LAST"),
+                "bid_size": _num(item, "bidSize", "BID_SIZE"),
+                "ask_size": _num(item, "askSize", "ASK_SIZE"),
+                "last_size": _num(item, "lastSize", "LAST_SIZE"),
+                "mark_price": _num(item, "mark", "MARK", "MARK_PRICE"),
+                "daily_high": _num(item, "highPrice", "HIGH_PRICE", "HIGH"),
+                "daily_low": _num(item, "lowPrice", "LOW_PRICE", "LOW"),
+                "daily_open": _num(item, "openPrice", "OPEN_PRICE", "OPEN"),
+                "prev_close": _num(item, "closePrice", "PREV_CLOSE", "CLOSE"),
+                "daily_volume": _num(item, "totalVolume", "VOLUME", "TOTAL_VOLUME"),
+                "quote_time": item.get("quoteTime", item.get("QUOTE_TIME")),
+                "trade_time": item.get("tradeTime", item.get("TRADE_TIME")),
+                "is_realtime": bool(
+                    item.get("isRealtime", item.get("IS_REAL_TIME", True))
+                ),
+            }
+        )
+    return entities
+
+
+def legacy_l2(msg: Any) -> List[Dict[str, Any]]:
+    entities = []
+    for item in _legacy_content(msg):
+        if not isinstance(item, dict):
+            continue
+        symbol = _legacy_symbol(item)
+        if not symbol:
+            continue
+        side_raw = (item.get("side") or item.get("SIDE") or "").upper()
+        side = side_raw if side_raw in ("BID", "ASK") else None
+
+        entities.append(
+            {
+                "symbol": str(symbol).upper(),
+                "side": side,
+                "price_level": _num(
+                    item, "price", "PRICE", "priceLevel", "PRICE_LEVEL"
+                ),
+                "size": _num(item, "size", "SIZE"),
+                "order_count": int(_num(item, "orderCount", "ORDER_COUNT") or 0),
+                "level_index": int(_num(item, "levelIndex", "LEVEL_INDEX") or 0),
+                "market_maker_id": item.get("marketMaker", item.get("MMID")),
+                "mic_id": item.get("micId", item.get("MIC")),
+                "quote_time": item.get("quoteTime", item.get("QUOTE_TIME")),
+            }
+        )
+    return entities
+
+
+def legacy_chart(msg: Any) -> List[Dict[str, Any]]:
+    entities = []
+    for item in _legacy_content(msg):
+        if not isinstance(item, dict):
+            continue
+        symbol = _legacy_symbol(item)
+        if not symbol:
+            continue
+
+        entities.append(
+            {
+                "symbol": str(symbol).upper(),
+                "open_price": _num(item, "openPrice", "OPEN_PRICE", "OPEN", "open"),
+                "high_price": _num(item, "highPrice", "HIGH_PRICE", "HIGH", "high"),
+                "low_price": _num(item, "lowPrice", "LOW_PRICE", "LOW", "low"),
+                "close_price": _num(
+                    item, "closePrice", "CLOSE_PRICE", "CLOSE", "close"
+                ),
+                "volume": _num(item, "volume", "VOLUME", "totalVolume", "TOTAL_VOLUME"),
+                "trade_count": _num(item, "tradeCount", "TRADE_COUNT"),
+                "vwap": _num(item, "vwap", "VWAP"),
+                "timestamp": item.get("timestamp", item.get("TIMESTAMP")),
+                "timeframe": item.get("timeframe", item.get("TIMEFRAME", "1MIN")),
+            }
+        )
+    return entities
+
+
+# ---------- Synthetic messages in schwab-py's relabeled format ----------
+def make_l1_message(rng: random.Random, items: int) -> Dict[str, Any]:
+    content = []
+    for symbol in rng.sample(SYMBOLS, min(items, len(SYMBOLS))):
+        bid = round(rng.uniform(50, 500), 2)
+        content.append(
+            {
+                "key": symbol,
+                "BID_PRICE": bid,
+                "ASK_PRICE": round(bid + 0.01, 2),
+                "LAST_PRICE": bid,
+                "BID_SIZE": rng.randint(1, 50),
+                "ASK_SIZE": rng.randint(1, 50),
+                "LAST_SIZE": rng.randint(1, 500),
+                "TOTAL_VOLUME": rng.randint(1_000, 50_000_000),
+                "QUOTE_TIME_MILLIS": 1_736_000_000_000,
+            }
+        )
+    return {"service": "LEVELONE_EQUITIES", "content": content}
+
+
+def make_l2_message(rng: random.Random, levels: int) -> Dict[str, Any]:
+    symbol = rng.choice(SYMBOLS)
+    mid = rng.uniform(50, 500)
+    content = []
+    for i in range(levels):
+        side = "BID" if i % 2 == 0 else "ASK"
+        content.append(
+            {
+                "key": symbol,
+                "SIDE": side,
+                "PRICE": round(
+                    mid + (i // 2 + 1) * (0.01 if side == "ASK" else -0.01), 2
+                ),
+                "SIZE": rng.randint(100, 5_000),
+                "ORDER_COUNT": rng.randint(1, 20),
+                "LEVEL_INDEX": i // 2,
+                "MMID": "NSDQ",
+            }
+        )
+    return {"service": "NASDAQ_BOOK", "content": content}
+
+
+def make_chart_message(rng: random.Random, items: int) -> Dict[str, Any]:
+    content = []
+    for symbol in rng.sample(SYMBOLS, min(items, len(SYMBOLS))):
+        o = rng.uniform(50, 500)
+        content.append(
+            {
+                "key": symbol,
+                "OPEN_PRICE": o,
+                "HIGH_PRICE": o * 1.01,
+                "LOW_PRICE": o * 0.99,
+                "CLOSE_PRICE": o,
+                "VOLUME": rng.randint(100, 100_000),
+                "TIMESTAMP": 1_736_000_000_000,
+            }
+        )
+    return {"service": "CHART_EQUITY", "content": content}
+
+
+# ---------- Raw frames in the streamer's wire format (numeric field keys) ----------
+def make_l1_frame(rng: random.Random, items: int) -> str:
+    content = []
+    for symbol in rng.sample(SYMBOLS, min(items, len(SYMBOLS))):
+        bid = round(rng.uniform(50, 500), 2)
+        content.append(
+            {
+                "key": symbol,
+                "delayed": False,
+                "1": bid,
+                "2": round(bid + 0.01, 2),
+                "3": bid,
+                "4": rng.randint(1, 50),
+                "5": rng.randint(1, 50),
+                "8": rng.randint(1_000, 50_000_000),
+                "9": rng.randint(1, 500),
+                "34": 1_736_000_000_000,
+            }
+        )
+    return json.dumps({"data": [{"service": "LEVELONE_EQUITIES", "content": content}]})
+
+
+def make_book_frame(rng: random.Random, levels: int) -> str:
+    mid = rng.uniform(50, 500)
+
+    def side(sign: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                "0": round(mid + sign * (i + 1) * 0.01, 2),
+                "1": rng.randint(100, 5_000),
+                "2": 1,
+                "3": [{"0": "NSDQ", "1": 100, "2": 1_736_000_000_000}],
+            }
+            for i in range(levels // 2)
+        ]
+
+    content = [
+        {
+            "key": rng.choice(SYMBOLS),
+            "1": 1_736_000_000_000,
+            "2": side(-1),
+            "3": side(1),
+        }
+    ]
+    return json.dumps({"data": [{"service": "NASDAQ_BOOK", "content": content}]})
+
+
+def make_chart_frame(rng: random.Random, items: int) -> str:
+    content = []
+    for symbol in rng.sample(SYMBOLS, min(items, len(SYMBOLS))):
+        o = rng.uniform(50, 500)
+        content.append(
+            {
+                "seq": 1,
+                "key": symbol,
+                "1": 1,
+                "2": o,
+                "3": o * 1.01,
+                "4": o * 0.99,
+                "5": o,
+                "6": rng.randint(100, 100_000),
+                "7": 1_736_000_000_000,
+                "8": 20_000,
+            }
+        )
+    return json.dumps({"data": [{"service": "CHART_EQUITY", "content": content}]})
+
+
+def schwab_path(handler: Any, decode: Callable[[Any], Any]) -> Callable[[str], Any]:
+    """json parse + schwab-py relabel + dict decoder, as the handlers run it."""
+
+    def run(raw: str) -> None:
+        for d in json.loads(raw)["data"]:
+            decode(handler.label_message(d))
+
+    return run
+
+
+def frame_path(service: str) -> Callable[[str], Any]:
+    decoder = FrameDecoder()
+    services = {service}
+    return lambda raw: decoder.decode(raw, services)
+
+
+def bench(fn: Callable[[Any], Any], messages: List[Any], repeat: int) -> float:
+    """Best-of-repeat microseconds per message."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for msg in messages:
+            fn(msg)
+        best = min(best, time.perf_counter() - start)
+    return best / len(messages) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Microbenchmark stream entity extraction (legacy vs decoders, "
+            "schwab-py dicts vs raw frames)"
+        )
+    )
+    parser.add_argument(
+        "--messages",
+        type=int,
+        default=20_000,
+        help="Messages per stream type (default: 20000)",
+    )
+    parser.add_argument(
+        "--items",
+        type=int,
+        default=5,
+        help="Items per L1/chart message (default: 5)",
+    )
+    parser.add_argument(
+        "--levels",
+        type=int,
+        default=20,
+        help="Book levels per L2 message (default: 20)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Timing repetitions (default: 5)"
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    cases = [
+        (
+            "L1",
+            [make_l1_message(rng, args.items) for _ in range(args.messages)],
+            legacy_l1,
+            l1_decoder().decode_message,
+        ),
+        (
+            "L2",
+            [make_l2_message(rng, args.levels) for _ in range(args.messages)],
+            legacy_l2,
+            l2_decoder().decode_message,
+        ),
+        (
+            "Chart",
+            [make_chart_message(rng, args.items) for _ in range(args.messages)],
+            legacy_chart,
+            chart_decoder().decode_message,
+        ),
+    ]
+
+    print(f"{'stream':<8}{'legacy us/msg':>16}{'decoder us/msg':>17}{'speedup':>10}")
+    for name, messages, legacy, decoder in cases:
+        before = bench(legacy, messages, args.repeat)
+        after = bench(decoder, messages, args.repeat)
+        print(f"{name:<8}{before:>16.2f}{after:>17.2f}{before / after:>9.2f}x")
+
+    l2 = l2_decoder()
+    frames = [
+        (
+            "L1",
+            [make_l1_frame(rng, args.items) for _ in range(args.messages)],
+            schwab_path(
+                _Handler(None, StreamClient.LevelOneEquityFields),
+                l1_decoder().decode_message,
+            ),
+            frame_path("LEVELONE_EQUITIES"),
+        ),
+        (
+            "L2",
+            [make_book_frame(rng, args.levels) for _ in range(args.messages)],
+            schwab_path(
+                StreamClient._BookHandler(None, StreamClient.BookFields),
+                lambda msg: l2.decode_message(book_levels(msg)),
+            ),
+            frame_path("NASDAQ_BOOK"),
+        ),
+        (
+            "Chart",
+            [make_chart_frame(rng, args.items) for _ in range(args.messages)],
+            schwab_path(
+                _Handler(None, StreamClient.ChartEquityFields),
+                chart_decoder().decode_message,
+            ),
+            frame_path("CHART_EQUITY"),
+        ),
+    ]
+
+    print()
+    print(f"{'frame':<8}{'schwab us/msg':>16}{'raw us/msg':>17}{'speedup':>10}")
+    for name, raws, schwab, fast in frames:
+        before = bench(schwab, raws, args.repeat)
+        after = bench(fast, raws, args.repeat)
+        print(f"{name:<8}{before:>16.2f}{after:>17.2f}{before / after:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+
+from axiom.db.client import engine
+from axiom.db.partitions import PARTITIONED_TABLES, PartitionManager
+
+
+async def main_async() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Create upcoming daily partitions and move stray rows out of the "
+            "DEFAULT partitions (the streamer also does this hourly)"
+        )
+    )
+    parser.add_argument(
+        "--days-ahead",
+        type=int,
+        default=3,
+        help="Create partitions this many days ahead (default: 3)",
+    )
+    parser.add_argument(
+        "--days-behind",
+        type=int,
+        default=1,
+        help="Also ensure partitions this many days back (default: 1)",
+    )
+    parser.add_argument(
+        "--table",
+        action="append",
+        choices=PARTITIONED_TABLES,
+        help="Only maintain this table (repeatable; default: all)",
+    )
+    args = parser.parse_args()
+
+    manager = PartitionManager(
+        engine,
+        args.table or PARTITIONED_TABLES,
+        days_ahead=args.days_ahead,
+        days_behind=args.days_behind,
+    )
+    try:
+        await manager.run_once()
+    finally:
+        await engine.dispose()
+    stats = manager.stats
+    print(
+        f"Created {stats['created']} partitions, moved {stats['moved_rows']} rows "
+        f"out of DEFAULT partitions."
+    )
+
+
+def main() -> None:
+    asyncio.run(main_async())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import asyncio
+import os
+
+from axiom.db.client import engine
+from axiom.db.retention import PartitionArchiver, parse_retention
+from axiom.env import env
+
+
+async def main_async() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Archive daily partitions older than each table's retention to "
+            "zstd Parquet files, then drop them from Postgres"
+        )
+    )
+    parser.add_argument(
+        "--policy",
+        default=env.RETENTION_POLICY,
+        help=f"Days kept per table (default: {env.RETENTION_POLICY!r})",
+    )
+    parser.add_argument(
+        "--archive-dir",
+        default=os.path.join(env.DATA_DIR, "archive"),
+        help="Directory for Parquet files and manifest.json (default: DATA_DIR/archive)",
+    )
+    args = parser.parse_args()
+
+    archiver = PartitionArchiver(engine, parse_retention(args.policy), args.archive_dir)
+    try:
+        await archiver.run_once()
+    finally:
+        await engine.dispose()
+    stats = archiver.stats
+    print(
+        f"Archived {stats['archived_partitions']} partitions "
+        f"({stats['archived_rows']} rows, {stats['archived_bytes']} bytes) "
+        f"to {args.archive_dir}."
+    )
+
+
+def main() -> None:
+    asyncio.run(main_async())
+
+
+if __name__ == "__main__":
+    main()
@@ -269,8 +269,9 @@ async def supervisor(
                         failed_flushes = batcher.get("failed_flushes", 0)
                         since_last_flush = batcher.get("seconds_since_last_flush")
                         running = batcher.get("is_running", False)
+                        dropped = batcher.get("dropped_items", 0)
 
-                        status = f"{batcher_type.upper()}: queue={queue_size}, flushes={total_flushes}, items={total_items}, failures={failed_flushes}, running={running}"
+                        status = f"{batcher_type.upper()}: queue={queue_size}, flushes={total_flushes}, items={total_items}, failures={failed_flushes}, dropped={dropped}, running={running}"
                         if since_last_flush is not None:
                             status += f", last_flush={since_last_flush:.1f}s_ago"
                         print(f"  {status}")
@@ -287,7 +288,7 @@ async def supervisor(
                     if batcher_key in stats:
                         batcher = stats[batcher_key]
                         since_last_flush = batcher.get("seconds_since_last_flush")
-                        expected_interval = (
+                        expected_interval = batcher.get("flush_interval") or (
                             10.0 if batcher_type in ["l1", "l2"] else 30.0
                         )
                         if (
@@ -295,7 +296,7 @@ async def supervisor(
                             and since_last_flush > expected_interval * 2
                         ):
                             print(
-                                f"WARNING: {batcher_type.upper()} batcher hasn't flushed in {since_last_flush:.1f}s (expected every {expected_interval}s)"
+                                f"WARNING: {batcher_type.upper()} batcher hasn't flushed in {since_last_flush:.1f}s (expected every {expected_interval:.1f}s)"
                             )
 
             new_quotes, new_level2, new_ohlcv = await fetch_current_subscriptions(
@@ -0,0 +1,15 @@
+import os
+
+# axiom.env validates these at import time; the tests never reach the
+# services they configure
+for name, value in {
+    "SUPABASE_URL": "http://localhost:54321",
+    "SUPABASE_SERVICE_KEY": "test",
+    "SUPABASE_ANON_KEY": "test",
+    "SUPABASE_JWT_SECRET": "test",
+    "SUPABASE_PROJECT_ID": "test",
+    "SCHWAB_API_KEY": "test",
+    "SCHWAB_APP_SECRET": "test",
+    "OWNER_ID": "test",
+}.items():
+    os.environ.setdefault(name, value)
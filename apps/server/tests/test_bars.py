@@ -0,0 +1,68 @@
+from axiom.mdata.bars import BarAggregator
+from axiom.mdata.records import ChartBar
+
+OPEN = 1_736_173_800_000  # 2025-01-06 09:30 America/New_York
+MINUTE = 60_000
+
+
+def minute(symbol, n, close, volume=100.0):
+    return ChartBar(
+        symbol,
+        open_price=close,
+        high_price=close + 1,
+        low_price=close - 1,
+        close_price=close,
+        volume=volume,
+        timestamp=OPEN + n * MINUTE,
+        timeframe="1m",
+    )
+
+
+def five_minute(bars, start):
+    (bar,) = [b for b in bars if b.timeframe == "5m" and b.timestamp == start]
+    return bar
+
+
+def test_minutes_roll_up_into_session_aligned_buckets():
+    agg = BarAggregator()
+    agg.update([minute("AAPL", n, 100.0 + n) for n in range(5)])
+    bars = agg.update([minute("AAPL", 5, 110.0)])
+
+    assert {b.timeframe for b in bars} == {"5m", "15m", "30m", "1h", "4h", "1d"}
+    assert five_minute(bars, OPEN + 5 * MINUTE).close_price == 110.0
+    day = next(b for b in bars if b.timeframe == "1d")
+    assert day.open_price == 100.0 and day.volume == 600.0
+
+
+def test_revised_minute_replaces_its_previous_version():
+    agg = BarAggregator()
+    agg.update([minute("AAPL", 0, 100.0), minute("AAPL", 1, 101.0)])
+    bars = agg.update([minute("AAPL", 1, 105.0, volume=50.0)])
+
+    bucket = five_minute(bars, OPEN)
+    assert bucket.volume == 150.0
+    assert (bucket.high_price, bucket.close_price) == (106.0, 105.0)
+    assert agg.stats["revisions"] == 1
+
+
+def test_late_minute_rebuilds_the_earlier_bucket():
+    agg = BarAggregator()
+    agg.update([minute("AAPL", 0, 100.0), minute("AAPL", 6, 106.0)])
+    bars = agg.update([minute("AAPL", 3, 90.0)])
+
+    late = five_minute(bars, OPEN)
+    assert late.low_price == 89.0 and late.close_price == 90.0
+    assert late.volume == 200.0
+    assert [b.timestamp for b in bars if b.timeframe == "5m"] == [OPEN]
+    assert agg.stats["late_minutes"] == 1
+
+
+def test_forget_accepts_any_case():
+    agg = BarAggregator()
+    agg.update([minute("aapl", 0, 100.0)])
+    agg.forget("AAPL")
+    assert agg.stats["symbols"] == 0
+
+    bars = agg.update([minute("aapl", 1, 101.0)])
+    assert five_minute(bars, OPEN).volume == 100.0
+    assert {b.symbol for b in bars} == {"AAPL"}
@@ -0,0 +1,137 @@
+import asyncio
+
+from axiom.lib.beque import Beque, OverflowPolicy
+from axiom.lib.journal import SpillJournal
+
+
+def test_add_many_spills_when_full_with_journal(tmp_path):
+    async def scenario():
+        gate = asyncio.Event()
+        flushed = []
+
+        async def on_flush(batch):
+            await gate.wait()
+            flushed.extend(batch)
+
+        q = Beque(
+            on_flush=on_flush,
+            max_batch_size=5,
+            max_queue_size=10,
+            flush_interval=60.0,
+            overflow=OverflowPolicy.BLOCK,
+            journal=SpillJournal(str(tmp_path)),
+        )
+        await q.start()
+        q.extend_nowait(range(5))
+        await asyncio.sleep(0.01)  # the consumer takes them and waits on gate
+        q.extend_nowait(range(5, 15))
+        assert q.size() == 10
+
+        await asyncio.wait_for(q.add_many(list(range(15, 20))), timeout=1.0)
+        assert q.stats["spilled_items"] == 5
+
+        gate.set()
+        await q.stop()
+        return flushed
+
+    assert asyncio.run(scenario()) == list(range(20))
+
+
+class Poison(ValueError):
+    pass
+
+
+def _poison_beque(flushed, dead, *, transient=0, poison_key=None):
+    async def on_flush(batch):
+        nonlocal transient
+        if any(item < 0 for item in batch):
+            raise Poison("bad row")
+        if transient:
+            transient -= 1
+            raise ConnectionError("connection reset")
+        flushed.extend(batch)
+
+    async def dead_letter(items, error):
+        dead.append((items, type(error)))
+
+    return Beque(
+        on_flush=on_flush,
+        max_batch_size=100,
+        flush_interval=60.0,
+        is_poison=lambda e: isinstance(e, Poison),
+        dead_letter=dead_letter,
+        poison_key=poison_key,
+    )
+
+
+def test_poison_items_are_bisected_out():
+    flushed, dead = [], []
+
+    async def scenario():
+        q = _poison_beque(flushed, dead)
+        await q.start()
+        q.extend_nowait([0, 1, -2, 3, 4, 5, -6, -7, 8, 9])
+        await q.flush()
+        await q.stop()
+        return q.stats
+
+    stats = asyncio.run(scenario())
+    assert flushed == [0, 1, 3, 4, 5, 8, 9]
+    assert dead == [([-2], Poison), ([-6], Poison), ([-7], Poison)]
+    assert stats["dead_lettered_items"] == 3
+    assert stats["failed_flushes"] == 0
+
+
+def test_isolate_poison_returns_remainder_on_transient_error():
+    flushed, dead = [], []
+
+    async def scenario():
+        # The first half fails with a non-poison error: nothing is flushed
+        q = _poison_beque(flushed, dead, transient=1)
+        batch = [0, 1, 2, 3, -4, 5, 6, 7]
+        return await q._isolate_poison(batch, Poison("bad row"))
+
+    remaining, error = asyncio.run(scenario())
+    assert isinstance(error, ConnectionError)
+    assert remaining == [0, 1, 2, 3, -4, 5, 6, 7]
+    assert flushed == [] and dead == []
+
+
+def test_isolate_poison_keeps_order_of_unflushed_items():
+    flushed, dead = [], []
+
+    async def scenario():
+        q = _poison_beque(flushed, dead)
+        on_flush = q._on_flush
+
+        async def flaky(batch):
+            if batch == [6, 7]:
+                raise ConnectionError("connection reset")
+            await on_flush(batch)
+
+        q._on_flush = flaky
+        return await q._isolate_poison([0, 1, 2, 3, -4, 5, 6, 7], Poison("bad row"))
+
+    remaining, error = asyncio.run(scenario())
+    assert isinstance(error, ConnectionError)
+    assert remaining == [6, 7]
+    assert flushed == [0, 1, 2, 3, 5]
+    assert dead == [([-4], Poison)]
+
+
+def test_poison_key_dead_letters_the_rest_of_its_key():
+    flushed, dead = [], []
+
+    async def scenario():
+        q = _poison_beque(flushed, dead, poison_key=abs)
+        q._queue.extend([2, 9])
+        # -2 poisons key 2: its later items in the batch and queue go too
+        batch = [1, -2, 3, 2, 4, 2, 5, 6]
+        remaining, _ = await q._isolate_poison(batch, Poison("bad row"))
+        return remaining, list(q._queue)
+
+    remaining, queued = asyncio.run(scenario())
+    assert remaining == []
+    assert flushed == [1, 3, 4, 5, 6]
+    assert sorted(x for items, _ in dead for x in items) == [-2, 2, 2, 2]
+    assert queued == [9]
@@ -0,0 +1,36 @@
+from axiom.mdata.columns import ColumnBatch
+from axiom.mdata.records import L1Quote
+
+
+def test_prices_round_like_the_per_value_conversion():
+    numbers = [1.23456, 0.00005, 0.00015, 187.12345, -3.33335]
+    prices = [*numbers, None, float("nan"), float("inf"), "12.5"]
+    cols = ColumnBatch([L1Quote("X", bid_price=p) for p in prices], ("bid_price",))
+
+    expected = [round(p * 10_000) for p in numbers] + [None, None, None, 125000]
+    assert cols.nullable(cols.price("bid_price")) == expected
+
+
+def test_require_drops_and_counts_rows():
+    quotes = [
+        L1Quote("A", bid_price=1.0, ask_price=1.1, bid_size=5.9),
+        L1Quote("B", bid_price=1.2, ask_price=1.1),
+        L1Quote("C", bid_price=None, ask_price=1.0, bid_size=-1.0),
+    ]
+    cols = ColumnBatch(quotes, ("bid_price", "ask_price", "bid_size"))
+    bid, ask = cols.price("bid_price"), cols.price("ask_price")
+    size = cols.integer("bid_size")
+
+    cols.require(~(bid.valid & ask.valid & (ask.values < bid.values)), "ask<bid")
+    cols.require(~size.valid | (size.values >= 0), "size<0")
+    cols.require(~(bid.valid & ask.valid & (ask.values < bid.values)), "ask<bid")
+
+    assert cols.rejected == {"ask<bid": 1, "size<0": 1}
+    assert (cols.kept, cols.skipped) == (1, 2)
+    assert cols.select([q.symbol for q in quotes]) == ["A"]
+    assert cols.nullable(size) == [5]
+
+
+def test_empty_batch():
+    cols = ColumnBatch([], ("bid_price",))
+    assert len(cols) == 0 and cols.nullable(cols.price("bid_price")) == []
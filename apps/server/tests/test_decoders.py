@@ -0,0 +1,69 @@
+from axiom.mdata.decoders import (
+    book_levels,
+    chart_decoder,
+    l1_decoder,
+    l2_decoder,
+    to_realtime,
+)
+from axiom.mdata.records import ChartBar, L1Quote, L2Level
+
+
+def test_l1_partial_updates_resolve_spellings_as_they_appear():
+    decoder = l1_decoder()
+    first = decoder.decode_message(
+        {"content": [{"key": "aapl", "BID_PRICE": "1.5", "ASK_PRICE": 2}]}
+    )
+    later = decoder.decode_message(
+        {"content": [{"key": "AAPL", "LAST_PRICE": 3, "LAST_SIZE": 100.0}]}
+    )
+
+    assert first == [L1Quote("AAPL", bid_price=1.5, ask_price=2.0)]
+    assert later == [L1Quote("AAPL", last_price=3.0, last_size=100.0)]
+    assert isinstance(first[0].ask_price, float)
+
+
+def test_is_realtime_defaults_only_when_the_key_is_absent():
+    decoder = l1_decoder()
+    quotes = decoder.decode_message(
+        [
+            {"key": "AAPL", "BID_PRICE": 1.0},
+            {"key": "AAPL", "IS_REAL_TIME": None},
+            {"key": "AAPL", "IS_REAL_TIME": False},
+            {"key": "AAPL", "BID_PRICE": 1.0},
+        ]
+    )
+
+    assert [q.is_realtime for q in quotes] == [True, False, False, True]
+    assert to_realtime(None) is False
+
+
+def test_l2_levels_are_converted_and_sides_normalized():
+    msg = {
+        "content": [
+            {
+                "key": "MSFT",
+                "BOOK_TIME": 5,
+                "BIDS": [{"BID_PRICE": "400.1", "TOTAL_VOLUME": 200, "NUM_BIDS": 2.0}],
+                "ASKS": [{"ASK_PRICE": 400.2, "TOTAL_VOLUME": 300, "NUM_ASKS": 1}],
+            }
+        ]
+    }
+    levels = l2_decoder().decode_message(book_levels(msg))
+
+    assert levels == [
+        L2Level("MSFT", "BID", 400.1, 200.0, 2, 0, quote_time=5),
+        L2Level("MSFT", "ASK", 400.2, 300.0, 1, 0, quote_time=5),
+    ]
+    assert l2_decoder().decode_message([{"key": "X", "side": "bid"}])[0].side == "BID"
+
+
+def test_items_without_a_symbol_are_skipped():
+    decoder = chart_decoder()
+    bars = decoder.decode_message(
+        [{"key": "SPY", "OPEN_PRICE": 1}, {"OPEN_PRICE": 2}, "junk", {"symbol": "QQQ"}]
+    )
+
+    assert bars == [
+        ChartBar("SPY", open_price=1.0, timeframe="1MIN"),
+        ChartBar("QQQ", timeframe="1MIN"),
+    ]
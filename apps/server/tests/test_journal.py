@@ -0,0 +1,118 @@
+import asyncio
+import os
+
+from axiom.lib.beque import Beque
+from axiom.lib.journal import SpillJournal
+
+
+def test_read_is_oldest_first_across_segments(tmp_path):
+    journal = SpillJournal(str(tmp_path), segment_bytes=64)
+    journal.append_many(range(50))
+    journal.append(50)
+
+    assert journal.read(20) == list(range(20))
+    journal.append_many(range(51, 60))
+    assert journal.read(100) == list(range(20, 60))
+    assert len(journal) == 0
+    journal.ack(journal.unacked)
+    assert os.listdir(tmp_path) == ["checkpoint"]
+    journal.close()
+
+
+def test_replay_resumes_from_checkpoint_after_reopen(tmp_path):
+    journal = SpillJournal(str(tmp_path), segment_bytes=64)
+    journal.append_many(range(30))
+    assert journal.read(12) == list(range(12))
+    journal.ack(12)
+    journal.close()
+
+    reopened = SpillJournal(str(tmp_path), segment_bytes=64)
+    assert len(reopened) == 18
+    assert reopened.read(100) == list(range(12, 30))
+    reopened.close()
+
+
+def test_unacked_records_are_read_again_after_reopen(tmp_path):
+    journal = SpillJournal(str(tmp_path), segment_bytes=64)
+    journal.append_many(range(30))
+    assert journal.read(20) == list(range(20))
+    journal.ack(5)
+    journal.close()
+
+    reopened = SpillJournal(str(tmp_path), segment_bytes=64)
+    assert len(reopened) == 25
+    assert reopened.read(100) == list(range(5, 30))
+    reopened.close()
+
+
+def test_failed_replay_is_not_lost_on_crash(tmp_path):
+    async def scenario():
+        journal = SpillJournal(str(tmp_path), segment_bytes=64)
+        journal.append_many(range(10))
+
+        async def on_flush(batch):
+            raise ConnectionError("database unavailable")
+
+        q = Beque(on_flush=on_flush, max_batch_size=4, journal=journal)
+        # The process dies after a failed flush, without stop()
+        await q.flush()
+        assert q.stats["replayed_items"] == 10
+        assert q.stats["journal_unacked"] == 10
+        journal.close()
+
+    asyncio.run(scenario())
+    reopened = SpillJournal(str(tmp_path), segment_bytes=64)
+    assert reopened.read(100) == list(range(10))
+
+
+def test_beque_acks_replayed_items_once_flushed(tmp_path):
+    async def scenario():
+        journal = SpillJournal(str(tmp_path), segment_bytes=64)
+        journal.append_many(range(10))
+        flushed = []
+
+        async def on_flush(batch):
+            flushed.extend(batch)
+
+        q = Beque(on_flush=on_flush, max_batch_size=4, journal=journal)
+        await q.start()
+        await q.flush()
+        assert flushed == list(range(10))
+        assert q.stats["journal_unacked"] == 0
+        await q.stop()
+
+    asyncio.run(scenario())
+    assert len(SpillJournal(str(tmp_path), segment_bytes=64)) == 0
+
+
+def test_beque_replays_spilled_items_in_order(tmp_path):
+    async def scenario():
+        failures = 2
+        flushed = []
+
+        async def on_flush(batch):
+            nonlocal failures
+            if failures:
+                failures -= 1
+                raise ConnectionError("database unavailable")
+            flushed.extend(batch)
+
+        q = Beque(
+            on_flush=on_flush,
+            max_batch_size=4,
+            flush_interval=0.05,
+            journal=SpillJournal(str(tmp_path), segment_bytes=64),
+        )
+        await q.start()
+        for i in range(40):
+            q.put_nowait(i)
+            if i % 5 == 0:
+                await asyncio.sleep(0.01)
+        # Items that arrive while the sink fails go to disk
+        assert q.stats["spilled_items"] > 0
+        while len(flushed) < 40:
+            await asyncio.sleep(0.05)
+        await q.stop()
+        return flushed
+
+    assert asyncio.run(asyncio.wait_for(scenario(), timeout=10.0)) == list(range(40))
@@ -0,0 +1,90 @@
+import pytest
+
+from axiom.mdata.live import LiveHub
+from axiom.mdata.records import L2Level
+
+
+def _book(symbol, side, prices):
+    return [
+        L2Level(symbol, side, price, 100.0, 1, index)
+        for index, price in enumerate(prices)
+    ]
+
+
+def _subscribed(hub):
+    client = hub.connect(_noop)
+    hub.subscribe(client, "l2", ["AAPL"])
+    return client
+
+
+async def _noop(_message):
+    pass
+
+
+def _drain(client):
+    updates = list(client._pending.values())
+    client._pending.clear()
+    return updates
+
+
+def test_levels_missing_from_a_book_message_are_removed():
+    hub = LiveHub()
+    client = _subscribed(hub)
+    hub.publish_l2("NASDAQ", _book("AAPL", "BID", [10.0, 9.9, 9.8, 9.7]))
+    _drain(client)
+
+    hub.publish_l2("NASDAQ", _book("AAPL", "BID", [10.0, 9.9]))
+    removed = _drain(client)
+
+    assert sorted(u["level"] for u in removed) == [2, 3]
+    assert all(u["price_level"] is None and u["size"] is None for u in removed)
+    # A late subscriber only sees the levels still in the book
+    late = _subscribed(hub)
+    assert sorted(u["level"] for u in _drain(late)) == [0, 1]
+
+
+def test_books_of_other_venues_are_left_alone():
+    hub = LiveHub()
+    client = _subscribed(hub)
+    hub.publish_l2("NASDAQ", _book("AAPL", "BID", [10.0, 9.9, 9.8]))
+    hub.publish_l2("NYSE", _book("AAPL", "BID", [10.01]))
+    _drain(client)
+
+    hub.publish_l2("NYSE", _book("AAPL", "BID", [10.02]))
+    updates = _drain(client)
+
+    assert updates == [
+        {
+            "channel": "l2",
+            "symbol": "AAPL",
+            "book": "NYSE",
+            "side": "BID",
+            "level": 0,
+            "price_level": 10.02,
+        }
+    ]
+    assert hub.stats["tracked_keys"] == 4
+
+
+def test_a_level_that_returns_is_published_in_full():
+    hub = LiveHub()
+    client = _subscribed(hub)
+    hub.publish_l2("NASDAQ", _book("AAPL", "ASK", [10.1, 10.2]))
+    hub.publish_l2("NASDAQ", _book("AAPL", "ASK", [10.1]))
+    hub.publish_l2("NASDAQ", _book("AAPL", "ASK", [10.1, 10.3]))
+
+    pending = {u["level"]: u for u in _drain(client)}
+    assert pending[1]["price_level"] == 10.3
+    assert pending[1]["size"] == 100.0
+
+
+def test_a_single_symbol_string_is_one_symbol():
+    hub = LiveHub()
+    client = hub.connect(_noop)
+    hub.subscribe(client, "l1", "aapl")
+    assert client.subscriptions["l1"] == {"AAPL"}
+
+    hub.unsubscribe(client, "l1", "AAPL")
+    assert client.subscriptions["l1"] == set()
+    with pytest.raises(ValueError):
+        hub.subscribe(client, "l1", 5)
@@ -0,0 +1,115 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date
+
+from axiom.db.partitions import PartitionManager, partition_day, partition_name
+
+
+class Result:
+    def __init__(self, rows=(), rowcount=0):
+        self._rows = list(rows)
+        self.rowcount = rowcount
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def scalar(self):
+        return self._rows[0][0] if self._rows else None
+
+
+class FakeEngine:
+    """Answers the manager's catalog queries from in-memory state."""
+
+    def __init__(self, partitions=(), default_rows=(), fail=()):
+        # table -> days with a partition / days of rows in DEFAULT
+        self.partitions = {t: set(days) for t, days in partitions}
+        self.default_rows = {t: list(days) for t, days in default_rows}
+        self.fail = set(fail)
+        self.sql = []
+
+    @asynccontextmanager
+    async def begin(self):
+        yield self
+
+    async def exec_driver_sql(self, sql):
+        self.sql.append(sql)
+        table = sql.split('"')[1] if '"' in sql else None
+        if "pg_inherits" in sql:
+            table = sql.rsplit("'", 2)[1]
+            if table in self.fail:
+                raise RuntimeError("permission denied")
+            return Result(
+                (partition_name(table, d),) for d in self.partitions.get(table, ())
+            )
+        if sql.startswith("SELECT DISTINCT"):
+            table = table[: -len("_default")]
+            return Result((d,) for d in set(self.default_rows.get(table, ())))
+        if "to_regclass" in sql:
+            return Result([(False,)])
+        if sql.startswith("SELECT EXISTS"):
+            table = table[: -len("_default")]
+            day = date.fromisoformat(sql.split("'")[1][:10])
+            return Result([(day in self.default_rows.get(table, ()),)])
+        if sql.startswith("WITH moved"):
+            table = table[: -len("_default")]
+            day = date.fromisoformat(sql.split("'")[1][:10])
+            rows = self.default_rows.get(table, [])
+            moved = rows.count(day)
+            self.default_rows[table] = [d for d in rows if d != day]
+            return Result(rowcount=moved)
+        if "FOR VALUES" in sql:
+            quoted = sql.split('"')
+            if sql.startswith("CREATE"):
+                name, base = quoted[1], quoted[3]
+            else:
+                base, name = quoted[1], quoted[3]
+            self.partitions.setdefault(base, set()).add(partition_day(base, name))
+        return Result()
+
+
+def _statements(engine, prefix):
+    return [sql for sql in engine.sql if sql.startswith(prefix)]
+
+
+def test_window_day_with_default_rows_is_moved_not_created():
+    today = date(2025, 3, 10)
+    engine = FakeEngine(
+        partitions=[("charts", [date(2025, 3, 9)])],
+        # Rows for today arrived before its partition existed
+        default_rows=[("charts", [today, today, date(2025, 3, 1)])],
+    )
+    manager = PartitionManager(engine, ["charts"], days_ahead=1, days_behind=1)
+    asyncio.run(manager.run_once(today))
+
+    assert engine.partitions["charts"] == {
+        date(2025, 3, 1),
+        date(2025, 3, 9),
+        today,
+        date(2025, 3, 11),
+    }
+    assert engine.default_rows["charts"] == []
+    attached = _statements(engine, "ALTER TABLE")
+    assert [partition_day("charts", sql.split('"')[3]) for sql in attached] == [
+        date(2025, 3, 1),
+        today,
+    ]
+    # Only the empty day is created directly as a partition
+    created = [
+        sql for sql in _statements(engine, "CREATE TABLE") if "PARTITION OF" in sql
+    ]
+    assert len(created) == 2  # charts_default and 2025-03-11
+    assert manager.stats["moved_rows"] == 3
+    assert manager.stats["errors"] == 0
+
+
+def test_failing_table_does_not_stop_the_others():
+    today = date(2025, 3, 10)
+    engine = FakeEngine(fail=["level_one_quotes"])
+    manager = PartitionManager(
+        engine, ["level_one_quotes", "charts"], days_ahead=0, days_behind=0
+    )
+    asyncio.run(manager.run_once(today))
+
+    assert engine.partitions == {"charts": {today}}
+    assert manager.stats["errors"] == 1
+    assert manager.stats["last_run"] is not None
@@ -0,0 +1,94 @@
+import asyncio
+
+from axiom.mdata.persistence import L1PersistenceFilter
+from axiom.mdata.records import L1Quote
+
+
+def test_latest_symbols_are_left_for_coalescing():
+    persist = L1PersistenceFilter.from_spec("latest; SPY=every_tick")
+    quotes = [L1Quote("AAPL", bid_price=1.0), L1Quote("AAPL", ask_price=1.1)]
+
+    latest, rows = persist.filter(quotes)
+    assert latest == quotes
+    assert rows == []
+
+
+def test_every_tick_writes_each_update_as_a_full_row():
+    persist = L1PersistenceFilter.from_spec("latest; SPY,QQQ=every_tick")
+    latest, rows = persist.filter(
+        [
+            L1Quote("SPY", bid_price=500.0, ask_price=500.02),
+            L1Quote("AAPL", bid_price=1.0),
+            L1Quote("SPY", bid_price=500.01),
+            L1Quote("SPY", last_price=500.01, last_size=100),
+        ]
+    )
+
+    assert [q.symbol for q in latest] == ["AAPL"]
+    assert [(q.bid_price, q.ask_price, q.last_price) for q in rows] == [
+        (500.0, 500.02, None),
+        (500.01, 500.02, None),
+        (500.01, 500.02, 500.01),
+    ]
+
+
+def test_on_change_rows_bypass_coalescing():
+    persist = L1PersistenceFilter.from_spec("on_change:0.01")
+    _, rows = persist.filter(
+        [
+            L1Quote("MSFT", bid_price=400.0),
+            L1Quote("MSFT", bid_price=400.005),
+            L1Quote("MSFT", bid_price=400.02),
+        ]
+    )
+
+    assert [(q.symbol, q.bid_price) for q in rows] == [
+        ("MSFT", 400.0),
+        ("MSFT", 400.02),
+    ]
+
+
+def test_sample_writes_the_last_state_of_each_interval():
+    now = [0.2]
+    persist = L1PersistenceFilter.from_spec(
+        "latest; AAPL=sample:1", clock=lambda: now[0]
+    )
+    latest, rows = persist.filter(
+        [L1Quote("AAPL", bid_price=200.0), L1Quote("AAPL", ask_price=200.5)]
+    )
+    assert latest == rows == []
+
+    # The first update is sampled at the next tick, merged
+    now[0] = 1.0
+    assert [(q.bid_price, q.ask_price) for q in persist.samples()] == [(200.0, 200.5)]
+
+    # Later updates wait for the end of their interval, then the last state
+    # is written even though no tick follows it
+    now[0] = 1.4
+    persist.filter([L1Quote("AAPL", bid_price=201.0)])
+    now[0] = 1.7
+    persist.filter([L1Quote("AAPL", bid_price=202.0)])
+    assert persist.samples() == []
+    now[0] = 2.0
+    assert [q.bid_price for q in persist.samples()] == [202.0]
+
+    # Quiet intervals write nothing
+    now[0] = 3.0
+    assert persist.samples() == []
+
+
+def test_sample_timer_hands_over_samples_and_flushes_on_stop():
+    written = []
+
+    async def scenario():
+        persist = L1PersistenceFilter.from_spec(
+            "sample:0.05", on_samples=written.extend
+        )
+        await persist.start()
+        persist.filter([L1Quote("AAPL", bid_price=1.0)])
+        await asyncio.sleep(0.12)
+        persist.filter([L1Quote("AAPL", bid_price=2.0)])
+        await persist.stop()
+
+    asyncio.run(scenario())
+    assert [q.bid_price for q in written] == [1.0, 2.0]
@@ -0,0 +1,25 @@
+from axiom.mdata.quotes import LatestQuoteStore
+from axiom.mdata.records import L1Quote
+
+
+def test_etag_follows_the_requested_symbols():
+    store = LatestQuoteStore()
+    store.update([L1Quote("AAPL", bid_price=1.0), L1Quote("MSFT", bid_price=2.0)])
+    aapl = store.etag(["AAPL"])
+
+    store.update([L1Quote("MSFT", bid_price=2.5)])
+    assert store.etag(["AAPL"]) == aapl
+    assert store.etag(["AAPL", "MSFT"]) != aapl
+
+
+def test_etag_changes_after_clear():
+    store = LatestQuoteStore()
+    seen = {store.etag(["AAPL"]), store.etag()}
+    store.update([L1Quote("AAPL", bid_price=1.0)])
+    seen |= {store.etag(["AAPL"]), store.etag(["NVDA"]), store.etag()}
+
+    store.clear()
+    # A poller holding any earlier tag must not get a 304 for the empty store
+    after = {store.etag(["AAPL"]), store.etag(["NVDA"]), store.etag()}
+    assert after.isdisjoint(seen)
+    assert store.get("AAPL") is None
@@ -0,0 +1,70 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+from axiom.mdata.resolver import SecurityResolver
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return list(self._rows)
+
+
+class FakeDatabase:
+    """Securities table; queries filtered by symbol return just those rows."""
+
+    def __init__(self, symbols):
+        self.rows = {
+            symbol: (symbol, uuid.uuid4(), True, None, "America/New_York")
+            for symbol in symbols
+        }
+        self.queries = 0
+
+    @asynccontextmanager
+    async def session(self):
+        yield self
+
+    async def execute(self, query):
+        self.queries += 1
+        wanted = set()
+        for value in query.compile().params.values():
+            if isinstance(value, list):
+                wanted.update(value)
+        return FakeResult(row for s, row in self.rows.items() if s in wanted)
+
+
+def test_lookup_queries_misses_right_away_and_caches_the_unknown():
+    db = FakeDatabase(["AAPL"])
+    resolver = SecurityResolver(session_factory=db.session)
+
+    async def scenario():
+        first = await resolver.lookup(["AAPL", "NOPE"])
+        queries = db.queries
+        second = await resolver.lookup(["AAPL", "NOPE"])
+        return first, second, queries
+
+    first, second, queries = asyncio.run(scenario())
+    assert first == {"AAPL": db.rows["AAPL"][1], "NOPE": None}
+    assert second == first
+    # The second call is served from memory and the negative cache
+    assert queries == 1 and db.queries == 1
+    assert resolver.timezone("AAPL") == "America/New_York"
+    assert resolver.stats["negative_cached"] == 1
+
+
+def test_failed_lookup_leaves_symbols_for_the_loop():
+    class Down:
+        @asynccontextmanager
+        async def session(self):
+            raise ConnectionError("database unavailable")
+            yield
+
+    resolver = SecurityResolver(session_factory=Down().session)
+    ids = asyncio.run(resolver.lookup(["AAPL"]))
+
+    assert ids == {"AAPL": None}
+    assert resolver.stats["pending_lookups"] == 1
+    assert resolver.stats["errors"] == 1
@@ -0,0 +1,57 @@
+import json
+from datetime import date, datetime, timezone
+
+from axiom.db.retention import ArchivedDay, ArchiveManifest
+
+DAY = date(2025, 1, 2)
+
+
+def _entry(path, rows):
+    return ArchivedDay(
+        path=path,
+        rows=rows,
+        bytes=100,
+        min_timestamp=None,
+        max_timestamp=None,
+        archived_at=datetime(2025, 1, 10, tzinfo=timezone.utc),
+    )
+
+
+def test_archiving_a_day_again_keeps_the_earlier_file(tmp_path):
+    manifest = ArchiveManifest(str(tmp_path))
+    manifest.add("level_one_quotes", DAY, _entry("a.parquet", 1_000))
+    manifest.add("level_one_quotes", DAY, _entry("a.1.parquet", 5))
+
+    reloaded = ArchiveManifest(str(tmp_path))
+    assert [e.path for e in reloaded.get("level_one_quotes", DAY)] == [
+        "a.parquet",
+        "a.1.parquet",
+    ]
+    assert reloaded.rows("level_one_quotes", DAY) == 1_005
+    assert reloaded.paths_for("level_one_quotes", DAY) == [
+        str(tmp_path / "a.parquet"),
+        str(tmp_path / "a.1.parquet"),
+    ]
+
+
+def test_single_file_manifests_are_still_read(tmp_path):
+    (tmp_path / ArchiveManifest.FILENAME).write_text(
+        json.dumps(
+            {
+                "level_one_quotes": {
+                    "2025-01-02": {
+                        "path": "a.parquet",
+                        "rows": 7,
+                        "bytes": 100,
+                        "min_timestamp": None,
+                        "max_timestamp": None,
+                        "archived_at": "2025-01-10T00:00:00Z",
+                    }
+                }
+            }
+        )
+    )
+
+    manifest = ArchiveManifest(str(tmp_path))
+    assert manifest.rows("level_one_quotes", DAY) == 7
+    assert manifest.get("level_two_quotes", DAY) == []
@@ -0,0 +1,135 @@
+import random
+from datetime import datetime, timezone
+
+from axiom.mdata.books import OrderBook
+from axiom.mdata.records import L2Level
+from axiom.mdata.snapshots import L2SnapshotEncoder, apply_snapshots
+
+T0 = datetime(2025, 1, 2, 14, 30, tzinfo=timezone.utc).timestamp()
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = T0
+
+    def __call__(self) -> float:
+        self.now += 0.1
+        return self.now
+
+
+def _book(bids, asks):
+    """OrderBook from {price: (size, count)} per side."""
+    book = OrderBook("AAPL", "NASDAQ")
+    book.replace(
+        [
+            L2Level("AAPL", side, price, size, count)
+            for side, levels in (("BID", bids), ("ASK", asks))
+            for price, (size, count) in levels.items()
+        ]
+    )
+    return book
+
+
+def _keys(levels):
+    return {
+        round(price * 10_000): (size, count) for price, (size, count) in levels.items()
+    }
+
+
+def _rebuild(rows):
+    books = apply_snapshots(
+        (r.book, r.side, r.is_keyframe, r.prices, r.sizes, r.order_counts) for r in rows
+    )
+    return books["NASDAQ"]
+
+
+BASE = {10.0 - i / 100: (100 * (i + 1), 1) for i in range(6)}
+
+
+def _with(levels, **changes):
+    """BASE-like levels; changes maps "p<cents>" to a level or None."""
+    levels = dict(levels)
+    for name, level in changes.items():
+        price = int(name[1:]) / 100
+        if level is None:
+            del levels[price]
+        else:
+            levels[price] = level
+    return levels
+
+
+def test_round_trip_with_changed_and_removed_levels():
+    encoder = L2SnapshotEncoder(clock=Clock())
+    asks = {10.01: (50, 1), 10.02: (60, 1), 10.03: (70, 1)}
+    bids_1 = _with(BASE, p1000=(150, 1), p999=None, p990=(10, 1))
+    states = [
+        (BASE, asks),
+        # size change, removed level and new level
+        (bids_1, asks),
+        # ask level removed
+        (bids_1, _with(asks, p1002=None)),
+        (_with(bids_1, p998=None), _with(asks, p1002=None, p1004=(5, 2))),
+    ]
+    rows = []
+    for bids, asks in states:
+        rows += encoder.encode(_book(bids, asks))
+        sides = _rebuild(rows)
+        assert sides["BID"] == _keys(bids)
+        assert sides["ASK"] == _keys(asks)
+
+    kinds = [(r.side, r.is_keyframe) for r in rows]
+    assert kinds[:2] == [("BID", True), ("ASK", True)]
+    assert not any(keyframe for _, keyframe in kinds[2:])
+    # Removed levels are deltas with size 0
+    removal = rows[2]
+    assert removal.order_counts[removal.sizes.index(0)] == 0
+
+
+def test_unchanged_updates_write_nothing():
+    encoder = L2SnapshotEncoder(clock=Clock())
+    book = _book({10.0: (100, 1)}, {10.01: (50, 1)})
+    assert len(encoder.encode(book)) == 2
+    assert encoder.encode(book) == []
+    assert encoder.stats["unchanged_updates"] == 2
+
+
+def test_random_walk_matches_the_book():
+    rng = random.Random(7)
+    encoder = L2SnapshotEncoder(clock=Clock(), max_deltas=15)
+    bids = {}
+    rows = []
+    for _ in range(200):
+        for _ in range(rng.randint(1, 3)):
+            price = round(10 - rng.randint(0, 20) / 100, 2)
+            if bids.get(price) and rng.random() < 0.3:
+                del bids[price]
+            else:
+                bids[price] = (rng.randint(1, 9) * 100, rng.randint(1, 4))
+        rows += encoder.encode(_book(bids, {}))
+        assert _rebuild(rows).get("BID", {}) == _keys(bids)
+
+
+def test_dropped_delta_corrupts_until_forget_forces_a_keyframe():
+    encoder = L2SnapshotEncoder(clock=Clock())
+    stored = encoder.encode(_book(BASE, {}))
+    lost = encoder.encode(_book(_with(BASE, p999=None), {}))
+    assert [r.is_keyframe for r in lost] == [False]
+
+    # Without the lost row the 9.99 level survives in the rebuilt book
+    bids = _with(BASE, p999=None, p1000=(120, 1))
+    stored += encoder.encode(_book(bids, {}))
+    assert _rebuild(stored)["BID"] == _keys(_with(bids, p999=BASE[9.99]))
+
+    encoder.forget("AAPL", "NASDAQ")
+    bids = _with(bids, p1000=(130, 1))
+    resync = encoder.encode(_book(bids, {}))
+    assert [(r.side, r.is_keyframe) for r in resync] == [("BID", True), ("ASK", True)]
+    assert _rebuild(stored + resync)["BID"] == _keys(bids)
+
+
+def test_deltas_before_the_first_keyframe_are_ignored():
+    encoder = L2SnapshotEncoder(clock=Clock())
+    keyframes = encoder.encode(_book({10.0: (100, 1)}, {}))
+    deltas = encoder.encode(_book({10.0: (100, 1), 9.99: (5, 1)}, {}))
+    assert _rebuild(deltas) == {}
+    assert _rebuild(keyframes + deltas)["BID"] == _keys({10.0: (100, 1), 9.99: (5, 1)})
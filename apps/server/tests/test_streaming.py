@@ -0,0 +1,62 @@
+import asyncio
+
+from axiom.mdata.books import OrderBookStore
+from axiom.mdata.persistence import L1PersistenceFilter
+from axiom.mdata.records import ChartBar, L1Quote, L2Level
+from axiom.mdata.resolver import SecurityResolver
+from axiom.mdata.streaming import MarketDataStreamingService
+
+
+class FakeStream:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        async def call(symbols):
+            self.calls.append((name, symbols))
+
+        return call
+
+
+class FakeSubscriptions:
+    def __init__(self):
+        self.removed = []
+
+    async def remove_symbols(self, db, user_id, stream_type, symbols, book):
+        self.removed.extend(symbols)
+
+
+def _service():
+    service = MarketDataStreamingService(
+        auth=object(),
+        books=OrderBookStore(),
+        securities=SecurityResolver(),
+        partitions=object(),
+    )
+    service._stream = FakeStream()
+    service.subscription_service = FakeSubscriptions()
+    service._l1_persistence = L1PersistenceFilter.from_spec("every_tick")
+    return service
+
+
+def test_remove_symbols_accepts_a_generator():
+    service = _service()
+    service._l1_persistence.filter(
+        [L1Quote("AAPL", bid_price=1.0), L1Quote("MSFT", bid_price=2.0)]
+    )
+    service.ticks.update([L1Quote("AAPL", last_price=1.0, trade_time=1.7e12)])
+    service.order_books.apply("NASDAQ", [L2Level("AAPL", "BID", 1.0, 100, 1)])
+    service.bars.update([ChartBar("AAPL", close_price=1.0, timestamp=1.7e12)])
+
+    async def scenario():
+        for stream_type in ("quotes", "level2", "ohlcv"):
+            symbols = (s for s in ["AAPL", "MSFT"])
+            await service.remove_symbols(None, "user", stream_type, symbols)
+
+    asyncio.run(scenario())
+    assert service.subscription_service.removed == ["AAPL", "MSFT"] * 3
+    assert [symbols for _, symbols in service._stream.calls] == [["AAPL", "MSFT"]] * 3
+    assert service._l1_persistence.stats["tracked_symbols"] == 0
+    assert service.ticks.stats["symbols"] == 0
+    assert len(service.order_books) == 0
+    assert service.bars.stats["symbols"] == 0
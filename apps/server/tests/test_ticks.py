@@ -0,0 +1,54 @@
+from axiom.mdata.records import L1Quote
+from axiom.mdata.ticks import TickBarAggregator
+
+T0 = 1_735_999_995_000  # on a 15s boundary
+
+
+def trade(symbol, ts, price, size=100.0):
+    return L1Quote(symbol, last_price=price, last_size=size, trade_time=ts)
+
+
+def test_trades_build_5s_and_15s_bars():
+    ticks = TickBarAggregator()
+    ticks.update([trade("AAPL", T0 - 1, 99.0)])  # only initializes state
+    bars = ticks.update(
+        [
+            trade("AAPL", T0 + 1_000, 100.0),
+            trade("AAPL", T0 + 2_000, 101.0, 300.0),
+            trade("AAPL", T0 + 6_000, 99.5),
+        ]
+    )
+
+    by_tf = {(b.timeframe, b.timestamp): b for b in bars}
+    first = by_tf[("5s", T0)]
+    assert (first.open_price, first.high_price, first.close_price) == (100, 101, 101)
+    assert first.volume == 400 and first.trade_count == 2
+    assert first.vwap == (100 * 100 + 101 * 300) / 400
+    assert by_tf[("15s", T0)].trade_count == 3
+    assert by_tf[("5s", T0 + 5_000)].low_price == 99.5
+
+
+def test_late_and_nan_trades_are_ignored():
+    ticks = TickBarAggregator(allowed_lateness=2.0)
+    ticks.update([trade("AAPL", T0, 100.0)])
+    ticks.update([trade("AAPL", T0 + 10_000, 100.0)])
+    assert ticks.update([trade("AAPL", T0 + 7_000, 100.0)]) == []
+    assert ticks.stats["late_trades"] == 1
+    nan = float("nan")
+    assert ticks.update([trade("AAPL", T0 + 11_000, nan)]) == []
+
+
+def test_forget_reuses_the_slot_with_fresh_state():
+    ticks = TickBarAggregator()
+    for symbol in ("AAPL", "MSFT"):
+        ticks.update([trade(symbol, T0, 100.0), trade(symbol, T0 + 1_000, 100.0)])
+    ticks.forget("aapl")
+    assert ticks.stats["symbols"] == 1
+
+    # NVDA takes AAPL's slot: its first update only initializes state
+    assert ticks.update([trade("NVDA", T0 + 2_000, 50.0)]) == []
+    bars = ticks.update([trade("NVDA", T0 + 3_000, 51.0)])
+    assert {b.symbol for b in bars} == {"NVDA"}
+    assert all(b.trade_count == 1 and b.open_price == 51.0 for b in bars)
+    assert len(ticks._trade_time) == 2
+    assert ticks.stats["symbols"] == 2